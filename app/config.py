@@ -15,10 +15,106 @@ class Config:
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", 8501))
     
+    # Analysis API Server
+    API_HOST = os.getenv("API_HOST", "0.0.0.0")
+    API_PORT = int(os.getenv("API_PORT", 8000))
+    ANALYSIS_API_URL = os.getenv("ANALYSIS_API_URL")  # e.g. http://analyzer:8000; unset = analyze in-process
+    ANALYSIS_API_TIMEOUT = float(os.getenv("ANALYSIS_API_TIMEOUT", 300))
+    ANALYSIS_API_MAX_BATCH = int(os.getenv("ANALYSIS_API_MAX_BATCH", 500))
+    
+    # HTTP Client
+    X_API_BASE_URL = os.getenv("X_API_BASE_URL", "https://api.twitter.com")
+    REDDIT_BASE_URL = os.getenv("REDDIT_BASE_URL", "https://www.reddit.com")
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 15))
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 20))
+    HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 2))
+    
     # Model Settings
     SENTIMENT_MODEL = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+    SENTIMENT_MODEL_REVISION = os.getenv("SENTIMENT_MODEL_REVISION", "main")
     EMOTION_MODEL = "j-hartmann/emotion-english-distilroberta-base"
+    EMOTION_MODEL_REVISION = os.getenv("EMOTION_MODEL_REVISION", "main")
     MAX_LENGTH = 512
+    BATCH_SIZE = int(os.getenv("BATCH_SIZE", 16))
+    LENGTH_BUCKETS = [int(edge) for edge in os.getenv("LENGTH_BUCKETS", "32,64,128,512").split(",")]
+    INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")  # torch | onnx | torch-int8
+    ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", os.path.join(os.getenv("TRANSFORMERS_CACHE", "models_cache"), "onnx"))
+    INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 0))  # forked inference processes; 0 = infer in-process
+    INFERENCE_THREADS_PER_WORKER = int(os.getenv("INFERENCE_THREADS_PER_WORKER", 0))  # 0 = cores / workers
+    INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", 300))  # seconds to wait for the workers before inferring in-process
+    
+    # Comment Processing
+    COMMENT_BUDGET = int(os.getenv("COMMENT_BUDGET", 200))  # max comments sent through the models per thread
+    COMMENT_PRIORITY = os.getenv("COMMENT_PRIORITY", "score")  # score | order
+    COMMENT_TRAVERSAL = os.getenv("COMMENT_TRAVERSAL", "dfs")  # dfs | bfs
+    DEDUP_COMMENTS = os.getenv("DEDUP_COMMENTS", "True").lower() == "true"  # infer each near-duplicate group once
+    DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.7))  # estimated Jaccard similarity of word bigrams
+    DEDUP_MIN_TOKENS = int(os.getenv("DEDUP_MIN_TOKENS", 4))  # shorter comments only collapse when identical
+    
+    # Reddit "more" comment expansion
+    REDDIT_EXPAND_MORE = os.getenv("REDDIT_EXPAND_MORE", "False").lower() == "true"
+    REDDIT_MORE_MAX_COMMENTS = int(os.getenv("REDDIT_MORE_MAX_COMMENTS", 2000))
+    REDDIT_MORE_TIME_BUDGET = float(os.getenv("REDDIT_MORE_TIME_BUDGET", 20))  # seconds
+    REDDIT_MORE_CONCURRENCY = int(os.getenv("REDDIT_MORE_CONCURRENCY", 4))
+    REDDIT_MORE_BATCH_SIZE = int(os.getenv("REDDIT_MORE_BATCH_SIZE", 100))
+    
+    # X tweet lookup
+    X_BULK_LOOKUP = os.getenv("X_BULK_LOOKUP", "True").lower() == "true"  # share /2/tweets?ids= calls across fetches
+    X_LOOKUP_WINDOW = float(os.getenv("X_LOOKUP_WINDOW", 0.02))  # seconds to wait for more ids before a lookup call
+    
+    # X conversation replies (recent search, last 7 days)
+    X_FETCH_REPLIES = os.getenv("X_FETCH_REPLIES", "True").lower() == "true"
+    X_REPLIES_MAX_COMMENTS = int(os.getenv("X_REPLIES_MAX_COMMENTS", 1000))
+    X_REPLIES_PAGE_SIZE = int(os.getenv("X_REPLIES_PAGE_SIZE", 100))  # recent search accepts 10-100
+    X_REPLIES_TIME_BUDGET = float(os.getenv("X_REPLIES_TIME_BUDGET", 20))  # seconds
+    
+    # Theme Analysis
+    THEME_MODE = os.getenv("THEME_MODE", "batch")  # batch | incremental
+    THEME_CLUSTERS = int(os.getenv("THEME_CLUSTERS", 6))
+    THEME_HASH_FEATURES = int(os.getenv("THEME_HASH_FEATURES", 2 ** 15))
+    THEME_MAX_STREAMS = int(os.getenv("THEME_MAX_STREAMS", 64))  # incremental models kept in memory
+    THEME_ENGINE = os.getenv("THEME_ENGINE", "tfidf")  # tfidf | embedding
+    THEME_KEYWORD_PACKS = os.getenv("THEME_KEYWORD_PACKS", "")  # comma-separated JSON files of {category: [keywords]}
+    THEME_MAX_CLUSTERS = int(os.getenv("THEME_MAX_CLUSTERS", 10))  # upper bound for the automatic cluster count
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    EMBEDDING_MODEL_REVISION = os.getenv("EMBEDDING_MODEL_REVISION", "main")
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 32))
+    EMBEDDING_MAX_LENGTH = int(os.getenv("EMBEDDING_MAX_LENGTH", 128))
+    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", 20000))
+    NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", 0.92))
+    
+    # Bulk Analysis
+    BULK_FETCH_CONCURRENCY = int(os.getenv("BULK_FETCH_CONCURRENCY", 8))
+    BULK_QUEUE_SIZE = int(os.getenv("BULK_QUEUE_SIZE", 16))
+    BULK_OUTPUT_DIR = os.getenv("BULK_OUTPUT_DIR", "bulk_results")
+    
+    # Inference Cache
+    CACHE_SIZE = int(os.getenv("CACHE_SIZE", 10000))
+    CACHE_DB_PATH = os.getenv("CACHE_DB_PATH")  # e.g. /app/models_cache/inference.sqlite
+    
+    # Fetch Cache
+    FETCH_CACHE_SIZE = int(os.getenv("FETCH_CACHE_SIZE", 256))  # posts kept in memory
+    FETCH_CACHE_TTL_REDDIT = float(os.getenv("FETCH_CACHE_TTL_REDDIT", 60))  # seconds before revalidating
+    FETCH_CACHE_TTL_TWITTER = float(os.getenv("FETCH_CACHE_TTL_TWITTER", 300))  # X rate limits are much tighter
+    FETCH_CACHE_DB_PATH = os.getenv("FETCH_CACHE_DB_PATH")  # e.g. /shared/fetch.sqlite, shared by app replicas
+    
+    # Live Monitoring
+    MONITOR_INTERVAL = float(os.getenv("MONITOR_INTERVAL", 60))  # seconds between polls
+    MONITOR_WINDOWS = [int(minutes) for minutes in os.getenv("MONITOR_WINDOWS", "5,15,60").split(",")]  # rolling windows, minutes
+    MONITOR_MAX_COMMENTS = int(os.getenv("MONITOR_MAX_COMMENTS", 5000))  # analyzed comments kept per watched thread
+    MONITOR_TIMELINE_SIZE = int(os.getenv("MONITOR_TIMELINE_SIZE", 300))
+    MONITOR_HISTORY = int(os.getenv("MONITOR_HISTORY", 100))  # poll snapshots kept per watched thread
+    MONITOR_MAX_POLLS = int(os.getenv("MONITOR_MAX_POLLS", 120))  # per watch session in the UI
+    MONITOR_MAX_WATCHES = int(os.getenv("MONITOR_MAX_WATCHES", 64))  # monitors kept by one analysis service
+    MONITOR_IDLE_TIMEOUT = float(os.getenv("MONITOR_IDLE_TIMEOUT", 1800))  # seconds without a poll before a monitor is dropped
+    MONITOR_UNREAD_TIMEOUT = float(os.getenv("MONITOR_UNREAD_TIMEOUT", 60))  # seconds a UI watch polls with nobody reading it
+    
+    # Analysis Store
+    ANALYSIS_STORE_PATH = os.getenv("ANALYSIS_STORE_PATH")  # e.g. /app/models_cache/analysis.sqlite
+    
+    # Metrics & Tracing
+    METRICS_PORT = int(os.getenv("METRICS_PORT", 0))  # Prometheus /metrics from the Streamlit process; 0 = off
+    OTEL_TRACING = os.getenv("OTEL_TRACING", "False").lower() == "true"  # mirror spans to OpenTelemetry
     
     # UI Settings
     PAGE_TITLE = "🌟 Social Analyzer Pro"
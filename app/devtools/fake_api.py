@@ -0,0 +1,548 @@
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+SAMPLE_PHRASES = [
+    "this is exactly what I was thinking",
+    "lol same",
+    "I love how this turned out, great work",
+    "honestly this is the worst update they have shipped",
+    "can someone explain why the api keeps returning errors",
+    "I remember when this happened to me last year",
+    "source? I'd like to read the official report",
+    "haha this made my day",
+    "I disagree, the numbers don't support that opinion",
+    "they should add an option to turn this feature off",
+    "I'm a bot, and this action was performed automatically",
+    "What a time to be alive",
+]
+
+class FakeRedditThread:
+    """Deterministic synthetic Reddit thread that mimics the comments and morechildren payloads"""
+
+    def __init__(self, post_id: str, num_comments: int, inline_limit: int = 50, seed: int = 0,
+                 top_level_ratio: float = 0.35):
+        rng = random.Random(seed)
+        self.rng = rng
+        self.post_id = post_id
+        self.comments: Dict[str, Dict[str, Any]] = {}
+        self.children: Dict[Optional[str], List[str]] = {None: []}
+        self.depth: Dict[str, int] = {}
+        created = 1_700_000_000
+
+        for i in range(num_comments):
+            comment_id = f"c{i}"
+            parent = None if i == 0 or rng.random() < top_level_ratio else f"c{rng.randrange(i)}"
+            phrases = rng.sample(SAMPLE_PHRASES, rng.randint(1, 3))
+            self.comments[comment_id] = {
+                'id': comment_id,
+                'body': '. '.join(phrases),
+                'score': rng.randint(-5, 500),
+                'author': f"user{rng.randrange(200)}",
+                'created_utc': created + i * 30,
+                'edited': False,
+                'permalink': f"/r/fake/comments/{post_id}/_/{comment_id}/",
+                'parent_id': f"t1_{parent}" if parent else f"t3_{post_id}",
+            }
+            self.children.setdefault(parent, []).append(comment_id)
+            self.children[comment_id] = []
+            self.depth[comment_id] = 0 if parent is None else self.depth[parent] + 1
+
+        self.inline = {f"c{i}" for i in range(min(inline_limit, num_comments))}
+        self.main_post = {
+            'id': post_id,
+            'title': f"Fake thread {post_id}",
+            'selftext': "Synthetic post served by the local fake API.",
+            'subreddit': 'fake',
+            'author': 'fake_op',
+            'score': 1234,
+            'upvote_ratio': 0.91,
+            'num_comments': num_comments,
+            'created_utc': created,
+        }
+
+    def add_comments(self, count: int) -> List[str]:
+        """Append new comments (replies to random existing ones), as a live thread would grow"""
+        added = []
+        for _ in range(count):
+            i = len(self.comments)
+            comment_id = f"c{i}"
+            parent = None if not self.comments or self.rng.random() < 0.35 else f"c{self.rng.randrange(i)}"
+            self.comments[comment_id] = {
+                'id': comment_id,
+                'body': '. '.join(self.rng.sample(SAMPLE_PHRASES, self.rng.randint(1, 3))),
+                'score': 1,
+                'author': f"user{self.rng.randrange(200)}",
+                'created_utc': self.main_post['created_utc'] + i * 30,
+                'edited': False,
+                'permalink': f"/r/fake/comments/{self.post_id}/_/{comment_id}/",
+                'parent_id': f"t1_{parent}" if parent else f"t3_{self.post_id}",
+            }
+            self.children.setdefault(parent, []).append(comment_id)
+            self.children[comment_id] = []
+            self.depth[comment_id] = 0 if parent is None else self.depth[parent] + 1
+            added.append(comment_id)
+        self.main_post['num_comments'] = len(self.comments)
+        return added
+
+    def edit_comment(self, comment_id: str, body: str) -> None:
+        self.comments[comment_id]['body'] = body
+        self.comments[comment_id]['edited'] = self.comments[comment_id]['created_utc'] + 60
+
+    def listing(self) -> List[Dict[str, Any]]:
+        """Payload of GET /comments/{id}.json"""
+        return [
+            {'kind': 'Listing', 'data': {'children': [{'kind': 't3', 'data': self.main_post}]}},
+            {'kind': 'Listing', 'data': {'children': self._children_things(None)}},
+        ]
+
+    def more_children(self, child_ids: List[str]) -> List[Dict[str, Any]]:
+        """Flat `things` list of POST/GET /api/morechildren"""
+        things = []
+        for comment_id in child_ids:
+            if comment_id not in self.comments:
+                continue
+            things.append({'kind': 't1', 'data': {**self.comments[comment_id], 'depth': self.depth[comment_id], 'replies': ''}})
+            if self.children[comment_id]:
+                things.append(self._more_stub(comment_id, self.children[comment_id]))
+        return things
+
+    def _children_things(self, parent: Optional[str]) -> List[Dict[str, Any]]:
+        things = []
+        hidden = []
+        for comment_id in self.children[parent]:
+            if comment_id in self.inline:
+                things.append(self._nested_thing(comment_id))
+            else:
+                hidden.append(comment_id)
+        if hidden:
+            things.append(self._more_stub(parent, hidden))
+        return things
+
+    def _nested_thing(self, comment_id: str) -> Dict[str, Any]:
+        replies = self._children_things(comment_id)
+        data = {**self.comments[comment_id], 'depth': self.depth[comment_id]}
+        data['replies'] = {'kind': 'Listing', 'data': {'children': replies}} if replies else ''
+        return {'kind': 't1', 'data': data}
+
+    def _more_stub(self, parent: Optional[str], child_ids: List[str]) -> Dict[str, Any]:
+        return {
+            'kind': 'more',
+            'data': {
+                'count': len(child_ids),
+                'children': list(child_ids),
+                'parent_id': f"t1_{parent}" if parent else f"t3_{self.post_id}",
+                'depth': 0 if parent is None else self.depth[parent] + 1,
+            }
+        }
+
+def fake_tweet(tweet_id: str, seed: int = 0) -> Dict[str, Any]:
+    """Payload of GET /2/tweets/{id} with the author and place expansions"""
+    rng = random.Random(f"{seed}:{tweet_id}")
+    return {
+        'data': {
+            'id': tweet_id,
+            'text': '. '.join(rng.sample(SAMPLE_PHRASES, 3)) + " #fake @someone",
+            'author_id': '1000',
+            'conversation_id': tweet_id,
+            'created_at': '2024-01-01T12:00:00.000Z',
+            'lang': 'en',
+            'public_metrics': {
+                'like_count': rng.randint(0, 5000),
+                'retweet_count': rng.randint(0, 1000),
+                'reply_count': rng.randint(0, 500),
+                'quote_count': rng.randint(0, 100)
+            }
+        },
+        'includes': {
+            'users': [{
+                'id': '1000',
+                'username': 'fake_author',
+                'name': 'Fake Author',
+                'location': 'Berlin, Germany',
+                'verified': False,
+                'description': 'Synthetic account served by the local fake API.',
+                'public_metrics': {'followers_count': 12000, 'following_count': 300}
+            }]
+        }
+    }
+
+class FakeXConversation:
+    """Deterministic synthetic X conversation served page by page through the recent-search endpoint"""
+
+    def __init__(self, conversation_id: str, num_replies: int, seed: int = 0, include_root: bool = False):
+        rng = random.Random(f"{seed}:{conversation_id}")
+        self.conversation_id = conversation_id
+        self.include_root = include_root  # search results also return the root tweet, as the real API can
+        self.replies: List[Dict[str, Any]] = []
+        created = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+        for i in range(num_replies):
+            reply_id = f"{conversation_id}{i:06d}"
+            parent = conversation_id if i == 0 or rng.random() < 0.6 else self.replies[rng.randrange(i)]['id']
+            self.replies.append({
+                'id': reply_id,
+                'text': '. '.join(rng.sample(SAMPLE_PHRASES, rng.randint(1, 3))),
+                'author_id': str(2000 + rng.randrange(200)),
+                'conversation_id': conversation_id,
+                'created_at': (created + timedelta(seconds=30 * (i + 1))).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                'lang': 'en',
+                'referenced_tweets': [{'type': 'replied_to', 'id': parent}],
+                'public_metrics': {'like_count': rng.randint(0, 300), 'retweet_count': rng.randint(0, 20),
+                                   'reply_count': 0, 'quote_count': 0}
+            })
+
+    def search_page(self, max_results: int, next_token: Optional[str]) -> Dict[str, Any]:
+        """Payload of GET /2/tweets/search/recent: newest first, continued through meta.next_token"""
+        newest_first = self.replies[::-1]
+        if self.include_root:
+            newest_first.append(fake_tweet(self.conversation_id)['data'])
+        offset = int(next_token, 16) if next_token else 0
+        page = newest_first[offset:offset + max_results]
+        meta: Dict[str, Any] = {'result_count': len(page)}
+        if page:
+            meta.update(newest_id=page[0]['id'], oldest_id=page[-1]['id'])
+        if offset + max_results < len(newest_first):
+            meta['next_token'] = format(offset + max_results, 'x')
+        if not page:
+            return {'meta': meta}
+        author_ids = dict.fromkeys(reply['author_id'] for reply in page)
+        return {
+            'data': page,
+            'includes': {'users': [{'id': author_id, 'username': f"x_user{author_id}"} for author_id in author_ids]},
+            'meta': meta
+        }
+
+class FakeAPIServer:
+    """Threaded local HTTP server that serves fake Reddit and X endpoints with rate-limit headers"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, default_comments: int = 500,
+                 inline_limit: int = 50, rate_limit: int = 60, rate_window: float = 60.0,
+                 throttle_every: int = 0, latency: float = 0.0):
+        self.host = host
+        self.port = port
+        self.default_comments = default_comments
+        self.inline_limit = inline_limit
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.throttle_every = throttle_every
+        self.latency = latency
+        self.reddit_threads: Dict[str, FakeRedditThread] = {}
+        self.x_conversations: Dict[str, FakeXConversation] = {}
+        self.deleted_tweets: set = set()
+        self.request_log: List[Tuple[float, str]] = []
+        self.throttled = 0
+        self.id_batches: List[Tuple[str, int]] = []  # (path, ids asked for) of each morechildren / tweet lookup call
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def add_reddit_thread(self, thread: FakeRedditThread) -> None:
+        self.reddit_threads[thread.post_id] = thread
+
+    def reddit_thread(self, post_id: str) -> FakeRedditThread:
+        if post_id not in self.reddit_threads:
+            self.add_reddit_thread(FakeRedditThread(post_id, self.default_comments, self.inline_limit))
+        return self.reddit_threads[post_id]
+
+    def x_conversation(self, conversation_id: str) -> FakeXConversation:
+        if conversation_id not in self.x_conversations:
+            self.x_conversations[conversation_id] = FakeXConversation(conversation_id, self.default_comments)
+        return self.x_conversations[conversation_id]
+
+    def tweet(self, tweet_id: str) -> Dict[str, Any]:
+        tweet = fake_tweet(tweet_id)
+        tweet['data']['public_metrics']['reply_count'] = len(self.x_conversation(tweet_id).replies)
+        return tweet
+
+    def tweet_lookup(self, tweet_ids: List[str]) -> Dict[str, Any]:
+        """Payload of GET /2/tweets?ids=: found tweets in `data`, the shared author once in `includes`"""
+        data, users, errors = [], {}, []
+        for tweet_id in tweet_ids:
+            if tweet_id in self.deleted_tweets:
+                errors.append({'value': tweet_id, 'resource_type': 'tweet', 'title': 'Not Found Error',
+                               'detail': f"Could not find tweet with ids: [{tweet_id}]."})
+                continue
+            tweet = self.tweet(tweet_id)
+            data.append(tweet['data'])
+            for user in tweet['includes']['users']:
+                users[user['id']] = user
+        payload: Dict[str, Any] = {'data': data, 'includes': {'users': list(users.values())}}
+        if errors:
+            payload['errors'] = errors
+        return payload
+
+    def start(self) -> str:
+        self._server = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        self.port = self._server.server_port
+        threading.Thread(target=self._server.serve_forever, name="fake-api", daemon=True).start()
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'FakeAPIServer':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def record_request(self, path: str) -> Tuple[int, Dict[str, str]]:
+        """Log the request and return (status, rate-limit headers) for it"""
+        now = time.monotonic()
+        with self._lock:
+            self.request_log.append((now, path))
+            window_start = now - self.rate_window
+            used = sum(1 for stamp, _ in self.request_log if stamp >= window_start)
+            count = len(self.request_log)
+        if path.startswith('/2/'):
+            # X sends the window reset as an epoch timestamp
+            headers = {
+                'x-rate-limit-limit': str(self.rate_limit),
+                'x-rate-limit-remaining': str(max(0, self.rate_limit - used)),
+                'x-rate-limit-reset': str(int(time.time() + self.rate_window)),
+            }
+        else:
+            headers = {
+                'x-ratelimit-used': str(used),
+                'x-ratelimit-remaining': str(max(0, self.rate_limit - used)),
+                'x-ratelimit-reset': str(int(self.rate_window)),
+            }
+        if self.throttle_every and count % self.throttle_every == 0:
+            with self._lock:
+                self.throttled += 1
+            headers['retry-after'] = '1'
+            return 429, headers
+        return 200, headers
+
+COMMENTS_PATH = re.compile(r'^(?:/r/\w+)?/comments/(\w+)(?:/[^/]*)?\.json$')
+TWEET_PATH = re.compile(r'^/2/tweets/(\w+)$')
+CONVERSATION_QUERY = re.compile(r'^conversation_id:(\w+)$')
+
+def _make_handler(server: FakeAPIServer):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+            if server.latency:
+                time.sleep(server.latency)
+            status, headers = server.record_request(parsed.path)
+            if status != 200:
+                return self._send(status, {'error': status}, headers)
+
+            match = COMMENTS_PATH.match(parsed.path)
+            if match:
+                # Real Reddit rarely honours If-None-Match; the fake does, so polling can be exercised
+                body = json.dumps(server.reddit_thread(match.group(1)).listing()).encode('utf-8')
+                etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+                if self.headers.get('If-None-Match') == etag:
+                    return self._send(304, None, {**headers, 'ETag': etag})
+                return self._send(200, body, {**headers, 'ETag': etag})
+
+            if parsed.path == '/2/tweets/search/recent':
+                match = CONVERSATION_QUERY.match(query.get('query', ''))
+                if not match:
+                    return self._send(400, {'errors': [{'message': 'only conversation_id queries are faked'}]}, headers)
+                max_results = int(query.get('max_results', 10))
+                if not 10 <= max_results <= 100:
+                    return self._send(400, {'errors': [{'message': 'max_results must be between 10 and 100'}]}, headers)
+                page = server.x_conversation(match.group(1)).search_page(max_results, query.get('next_token'))
+                return self._send(200, page, headers)
+
+            if parsed.path == '/2/tweets':
+                tweet_ids = [tweet_id for tweet_id in query.get('ids', '').split(',') if tweet_id]
+                server.id_batches.append((parsed.path, len(tweet_ids)))
+                if not 1 <= len(tweet_ids) <= 100:
+                    return self._send(400, {'errors': [{'message': 'ids must hold between 1 and 100 ids'}]}, headers)
+                return self._send(200, server.tweet_lookup(tweet_ids), headers)
+
+            match = TWEET_PATH.match(parsed.path)
+            if match:
+                if match.group(1) in server.deleted_tweets:
+                    return self._send(404, {'errors': [{'message': 'Not Found'}]}, headers)
+                return self._send(200, server.tweet(match.group(1)), headers)
+
+            if parsed.path == '/api/morechildren.json':
+                post_id = query.get('link_id', '').replace('t3_', '')
+                child_ids = [child for child in query.get('children', '').split(',') if child]
+                server.id_batches.append((parsed.path, len(child_ids)))
+                child_ids = child_ids[:100]
+                things = server.reddit_thread(post_id).more_children(child_ids)
+                return self._send(200, {'json': {'errors': [], 'data': {'things': things}}}, headers)
+
+            return self._send(404, {'error': 'not found'}, headers)
+
+        def _send(self, status: int, payload: Any, headers: Dict[str, str]) -> None:
+            if payload is None:
+                body = b''
+            elif isinstance(payload, bytes):
+                body = payload
+            else:
+                body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            if body:
+                self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+@contextmanager
+def config_overrides(**overrides: Any) -> Iterator[None]:
+    """Set Config attributes for the duration of a check and put the previous values back afterwards"""
+    from app.config import Config
+
+    saved = {name: getattr(Config, name) for name in overrides}
+    try:
+        for name, value in overrides.items():
+            setattr(Config, name, value)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(Config, name, value)
+
+def check_more_expansion(num_comments: int = 1500, inline_limit: int = 50) -> Dict[str, Any]:
+    """Fetch a large fake thread with "more" expansion on and report coverage and request count"""
+    from app.services.api_client import SocialAPIClient
+    from app.services.comment_stream import iter_reddit_comments
+
+    with FakeAPIServer(default_comments=num_comments, inline_limit=inline_limit, rate_limit=1000) as server, \
+            config_overrides(REDDIT_BASE_URL=server.base_url, REDDIT_EXPAND_MORE=True):
+        client = SocialAPIClient()
+        started = time.monotonic()
+        _, content = client.fetch_content(f"https://www.reddit.com/comments/fake{num_comments}")
+        elapsed = time.monotonic() - started
+        client.close()
+
+        inline = sum(1 for _ in iter_reddit_comments(content['comment_listing']))
+        expanded = content.get('expanded_comments', [])
+        unique_ids = {comment['id'] for comment in expanded} | {
+            comment['id'] for comment in iter_reddit_comments(content['comment_listing'])
+        }
+        return {
+            'thread_comments': num_comments,
+            'inline_comments': inline,
+            'expanded_comments': len(expanded),
+            'unique_comments': len(unique_ids),
+            'coverage': round(len(unique_ids) / num_comments, 3),
+            'requests': len(server.request_log),
+            'seconds': round(elapsed, 3),
+        }
+
+def check_reply_pagination(num_replies: int = 750, throttle_every: int = 0) -> Dict[str, Any]:
+    """Fetch a fake X conversation through search pagination and report coverage, pages and retries"""
+    from app.config import Config
+    from app.services.api_client import SocialAPIClient
+
+    with FakeAPIServer(default_comments=num_replies, rate_limit=1000, throttle_every=throttle_every) as server, \
+            config_overrides(X_API_BASE_URL=server.base_url, X_FETCH_REPLIES=True,
+                             X_REPLIES_MAX_COMMENTS=max(Config.X_REPLIES_MAX_COMMENTS, num_replies)):
+        client = SocialAPIClient()
+        client.x_bearer = client.x_bearer or 'fake-token'
+        started = time.monotonic()
+        _, content = client.fetch_content(f"https://x.com/fake/status/{num_replies}")
+        elapsed = time.monotonic() - started
+        client.close()
+
+        replies = content.get('replies', [])
+        unique_ids = {reply['id'] for reply in replies}
+        return {
+            'conversation_replies': num_replies,
+            'fetched_replies': len(replies),
+            'unique_replies': len(unique_ids),
+            'coverage': round(len(unique_ids) / num_replies, 3) if num_replies else 1.0,
+            'pages': content.get('replies_meta', {}).get('pages', 0),
+            'max_depth': max((reply['depth'] for reply in replies), default=0),
+            'requests': len(server.request_log),
+            'throttled': server.throttled,
+            'seconds': round(elapsed, 3),
+        }
+
+def check_bulk_lookup(num_tweets: int = 250, deleted: int = 3) -> Dict[str, Any]:
+    """Fetch many fake tweets concurrently and report how many lookup calls they took"""
+    import asyncio
+    from app.services.api_client import SocialAPIClient
+
+    with FakeAPIServer(default_comments=0, rate_limit=1000) as server, \
+            config_overrides(X_API_BASE_URL=server.base_url, X_BULK_LOOKUP=True, X_FETCH_REPLIES=False):
+        client = SocialAPIClient()
+        client.x_bearer = client.x_bearer or 'fake-token'
+        urls = [f"https://x.com/fake/status/{1700000000000000000 + i}" for i in range(num_tweets)]
+        server.deleted_tweets.update(url.rsplit('/', 1)[1] for url in urls[:deleted])
+
+        async def fetch_all():
+            client.prefetch_tweets(urls)
+            return await asyncio.gather(*(client.fetch_content_async(url) for url in urls))
+
+        started = time.monotonic()
+        results = client.run(fetch_all())
+        elapsed = time.monotonic() - started
+        client.close()
+
+        return {
+            'tweets': num_tweets,
+            'fetched': sum(1 for _, data in results if data),
+            'not_found': sum(1 for _, data in results if not data),
+            'lookup_calls': sum(1 for _, path in server.request_log if path == '/2/tweets'),
+            'requests': len(server.request_log),
+            'seconds': round(elapsed, 3),
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake Reddit / X API for development and testing")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--comments", type=int, default=500, help="Comments (or X replies) per generated thread")
+    parser.add_argument("--inline", type=int, default=50, help="Comments inlined before 'more' stubs")
+    parser.add_argument("--throttle-every", type=int, default=0, help="Answer every Nth request with 429")
+    parser.add_argument("--check-expansion", action="store_true",
+                        help="Run the 'more' expansion against a temporary server and print a report")
+    parser.add_argument("--check-replies", action="store_true",
+                        help="Page through a fake X conversation against a temporary server and print a report")
+    parser.add_argument("--check-lookup", type=int, default=0, metavar="N",
+                        help="Fetch N fake tweets through the bulk /2/tweets?ids= lookup and print a report")
+    args = parser.parse_args()
+
+    if args.check_expansion:
+        print(json.dumps(check_more_expansion(args.comments, args.inline), indent=2))
+        return
+    if args.check_replies:
+        print(json.dumps(check_reply_pagination(args.comments, args.throttle_every), indent=2))
+        return
+    if args.check_lookup:
+        print(json.dumps(check_bulk_lookup(args.check_lookup), indent=2))
+        return
+
+    server = FakeAPIServer(port=args.port, default_comments=args.comments, inline_limit=args.inline,
+                           throttle_every=args.throttle_every)
+    server.start()
+    print(f"🧪 Fake API listening on {server.base_url} (set REDDIT_BASE_URL / X_API_BASE_URL to use it)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
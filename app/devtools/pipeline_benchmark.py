@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import platform as host_platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from app.config import Config
+
+FIXTURE_SIZES = [10, 500, 5000]
+# Spans recorded by DataProcessor and TextAnalyzer, plus the benchmark's own parse and visualization
+STAGES = ['parse', 'comments.select', 'comments.features', 'dedup', 'inference.tokenize', 'inference.sentiment',
+          'inference.emotion', 'inference.workers', 'comments.store', 'themes', 'near_duplicates', 'visualization']
+TWEET_URL = "https://x.com/fake_author/status/1700000000000000000"
+
+def record_fixtures(fixtures_dir: str, sizes: Optional[List[int]] = None) -> List[str]:
+    """Fetch synthetic threads from the local fake API through SocialAPIClient and save the payloads"""
+    from app.devtools.fake_api import FakeAPIServer, FakeRedditThread
+    from app.services.api_client import SocialAPIClient
+
+    sizes = sizes or FIXTURE_SIZES
+    os.makedirs(fixtures_dir, exist_ok=True)
+    paths = []
+    with FakeAPIServer(rate_limit=100000, inline_limit=200) as server:
+        Config.REDDIT_BASE_URL = server.base_url
+        Config.X_API_BASE_URL = server.base_url
+        Config.X_BEARER_TOKEN = Config.X_BEARER_TOKEN or "fake-token"
+        Config.REDDIT_EXPAND_MORE = True
+        Config.REDDIT_MORE_MAX_COMMENTS = max(sizes)
+
+        targets = [('x_tweet', TWEET_URL)]
+        for size in sizes:
+            server.add_reddit_thread(FakeRedditThread(f"bench{size}", size, inline_limit=200, seed=size))
+            targets.append((f"reddit_{size}", f"https://www.reddit.com/comments/bench{size}"))
+
+        client = SocialAPIClient()
+        try:
+            for name, url in targets:
+                platform, data = client.fetch_content(url)
+                if not data:
+                    print(f"❌ Error recording fixture {name} from {url}")
+                    continue
+                path = os.path.join(fixtures_dir, f"{name}.json")
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump({'platform': platform, 'url': url, 'data': data}, f)
+                paths.append(path)
+        finally:
+            client.close()
+    return paths
+
+def benchmark_fixture(path: str, iterations: int = 5, budget: int = 0) -> Dict[str, Any]:
+    """End-to-end and per-stage timings for one fixture; budget=0 analyzes every comment in it"""
+    from app.services.data_processor import DataProcessor
+    from app.services.visualizer import Visualizer
+    from app.utils.cache import InferenceCache
+    from app.utils.metrics import span, trace
+
+    with open(path, encoding='utf-8') as f:
+        raw = f.read()
+    fixture = json.loads(raw)
+    platform = fixture['platform']
+
+    # Every iteration has to run the models: no stored results, no cached outputs
+    Config.ANALYSIS_STORE_PATH = None
+    processor = DataProcessor()
+    processor.registry.start_pool()  # no-op unless INFERENCE_WORKERS is set and no other thread runs yet
+    thread_comments = sum(1 for _ in processor.iter_comments(platform, fixture['data']))
+    Config.COMMENT_BUDGET = budget or max(thread_comments, 1)
+    uncached = InferenceCache(max_size=0)
+    processor.sentiment_analyzer.cache = uncached
+    processor.emotion_detector.cache = uncached
+    visualizer = Visualizer()
+    rss_after_load = peak_rss_mb()
+
+    # One untimed run pays for lazy imports and first-call allocations
+    _reset_theme_state(processor)
+    processor.process_content(platform, json.loads(raw)['data'])
+
+    end_to_end = []
+    stages: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    for _ in range(iterations):
+        _reset_theme_state(processor)
+        # Stage timings are the spans the pipeline records for itself, so they cannot drift from it
+        with trace('benchmark') as current:
+            started = time.perf_counter()
+            with span('parse'):
+                data = json.loads(raw)['data']
+            result = processor.process_content(platform, data)
+            end_to_end.append(time.perf_counter() - started)
+            with span('visualization'):
+                render_charts(visualizer, platform, result)
+
+        spans = {recorded['name']: recorded['seconds'] for recorded in current.to_dict()['spans']}
+        for stage in STAGES:
+            if stage in spans:
+                stages[stage].append(spans[stage])
+
+    analyzed = len(result.get('comments', {}).get('processed_comments', [])) + 1
+    p50 = statistics.median(end_to_end)
+    return {
+        'fixture': os.path.basename(path),
+        'platform': platform,
+        'thread_comments': thread_comments,
+        'texts_analyzed': analyzed,
+        'iterations': iterations,
+        'end_to_end': summarize(end_to_end),
+        'texts_per_second': round(analyzed / p50, 1) if p50 else 0.0,
+        'stages': {stage: summarize(samples) for stage, samples in stages.items() if samples},
+        'rss_after_load_mb': rss_after_load,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+def render_charts(visualizer, platform: str, result: Dict[str, Any]) -> None:
+    """Same charts the Streamlit results page draws, serialized the way st.plotly_chart ships them"""
+    analysis = result.get('analysis', {})
+    figures = [
+        visualizer.create_engagement_metrics(result.get('metrics', {}), platform),
+        visualizer.create_sentiment_gauge(analysis.get('sentiment', {})),
+        visualizer.create_emotion_radar(analysis.get('emotion', {})),
+        visualizer.create_metrics_dashboard(result)
+    ]
+    comments = result.get('comments', {}).get('processed_comments')
+    if comments:
+        figures.append(visualizer.create_theme_distribution(result['comments'].get('theme_analysis', {})))
+        figures.append(visualizer.create_sentiment_timeline(comments))
+    for figure in figures:
+        figure.to_json()
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    p95 = statistics.quantiles(ordered, n=20, method='inclusive')[18] if len(ordered) > 1 else ordered[0]
+    return {
+        'p50': round(statistics.median(ordered), 4),
+        'p95': round(p95, 4),
+        'mean': round(statistics.fmean(ordered), 4),
+        'min': round(ordered[0], 4),
+        'max': round(ordered[-1], 4)
+    }
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def run_suite(fixture_paths: List[str], iterations: int, budget: int, in_process: bool = False) -> Dict[str, Any]:
+    """Benchmark every fixture, each in a fresh interpreter so peak RSS is its own"""
+    fixtures = {}
+    for path in fixture_paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        if in_process:
+            fixtures[name] = benchmark_fixture(path, iterations, budget)
+            continue
+        output = subprocess.run(
+            [sys.executable, '-m', 'app.devtools.pipeline_benchmark', '--child', path,
+             '--iterations', str(iterations), '--budget', str(budget)],
+            capture_output=True, text=True
+        )
+        if output.returncode != 0:
+            print(f"❌ Error benchmarking {name}: {output.stderr.strip().splitlines()[-1:]}")
+            continue
+        fixtures[name] = json.loads(output.stdout.strip().splitlines()[-1])
+
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'commit': _git_commit(),
+        'python': sys.version.split()[0],
+        'machine': f"{host_platform.system()} {host_platform.machine()} ({os.cpu_count()} cpus)",
+        'config': {
+            'inference_backend': Config.INFERENCE_BACKEND,
+            'inference_workers': Config.INFERENCE_WORKERS,
+            'batch_size': Config.BATCH_SIZE,
+            'length_buckets': Config.LENGTH_BUCKETS,
+            'theme_engine': Config.THEME_ENGINE,
+            'theme_mode': Config.THEME_MODE,
+            'dedup_comments': Config.DEDUP_COMMENTS,
+            'comment_budget': budget or 'all'
+        },
+        'fixtures': fixtures
+    }
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """p50 changes per fixture and stage; positive percentages are slowdowns"""
+    lines = []
+    for name, result in current['fixtures'].items():
+        before = previous.get('fixtures', {}).get(name)
+        if not before:
+            continue
+        rows = [('end_to_end', before['end_to_end'], result['end_to_end'])]
+        rows += [(stage, before['stages'][stage], timing) for stage, timing in result['stages'].items()
+                 if stage in before.get('stages', {})]
+        for stage, old, new in rows:
+            change = (new['p50'] - old['p50']) / old['p50'] * 100 if old['p50'] else 0.0
+            lines.append(f"{name:<14} {stage:<14} {old['p50']:>9.4f}s -> {new['p50']:>9.4f}s  {change:+6.1f}%")
+        lines.append(f"{name:<14} {'peak_rss':<14} {before['peak_rss_mb']:>8.1f}MB -> {result['peak_rss_mb']:>8.1f}MB")
+    return lines
+
+def _reset_theme_state(processor) -> None:
+    # Incremental theme models and cached embeddings would make repeat runs cheaper than a first analysis
+    theme_analyzer = processor.theme_analyzer
+    theme_analyzer.streams.clear()
+    theme_analyzer.embedder.clear_cache()
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DataProcessor.process_content on recorded fixtures")
+    parser.add_argument("--fixtures-dir", default=os.path.join("benchmarks", "fixtures"))
+    parser.add_argument("--record", action="store_true", help="Re-record fixtures from the local fake API first")
+    parser.add_argument("--sizes", default=",".join(map(str, FIXTURE_SIZES)), help="Reddit fixture sizes to record")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--budget", type=int, default=0, help="Comment budget; 0 analyzes every comment")
+    parser.add_argument("--output", default=None, help="Results JSON (default: benchmarks/results/pipeline_<time>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to compare against")
+    parser.add_argument("--in-process", action="store_true", help="Run every fixture in this interpreter")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(benchmark_fixture(args.child, args.iterations, args.budget)))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    fixture_paths = [os.path.join(args.fixtures_dir, name) for name in
+                     ['x_tweet.json'] + [f"reddit_{size}.json" for size in sizes]]
+    if args.record or not all(os.path.exists(path) for path in fixture_paths):
+        fixture_paths = record_fixtures(args.fixtures_dir, sizes)
+
+    results = run_suite(fixture_paths, args.iterations, args.budget, args.in_process)
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    for name, result in results['fixtures'].items():
+        timing = result['end_to_end']
+        print(f"{name:<14} p50 {timing['p50']:.3f}s  p95 {timing['p95']:.3f}s  "
+              f"{result['texts_per_second']:>8.1f} texts/s  peak {result['peak_rss_mb']:.0f}MB")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print("\n".join(compare(json.load(f), results)))
+    print(f"📄 Results saved to {output}")
+
+if __name__ == "__main__":
+    main()
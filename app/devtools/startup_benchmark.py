@@ -0,0 +1,93 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Any, List
+
+# What app/main.py imports before the welcome screen renders
+UI_IMPORTS = [
+    'streamlit',
+    'app.config',
+    'app.services.analysis_service',
+    'app.services.batch_runner',
+    'app.utils.constants',
+    'app.utils.helpers',
+]
+HEAVY_MODULES = ['torch', 'transformers', 'sklearn', 'scipy', 'pandas', 'plotly']
+SAMPLE_TEXTS = [
+    "I love this so much, best update ever!",
+    "This is the worst thing I have read all week.",
+    "Why does the app crash every time I open settings?",
+    "Not bad at all, honestly better than I expected.",
+]
+
+def measure_startup() -> Dict[str, Any]:
+    """Time the import, model load and first inference phases in the current (fresh) process"""
+    import importlib
+
+    started = time.perf_counter()
+    for module in UI_IMPORTS:
+        importlib.import_module(module)
+    import_seconds = time.perf_counter() - started
+    heavy_after_import = [module for module in HEAVY_MODULES if module in sys.modules]
+
+    from app.models.registry import get_model_registry
+    registry = get_model_registry()
+    started = time.perf_counter()
+    text_analyzer = registry.get('text_analyzer')
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    text_analyzer.infer(SAMPLE_TEXTS)
+    first_inference_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    text_analyzer.infer(SAMPLE_TEXTS)
+    warm_inference_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    registry.get('theme_analyzer')
+    theme_load_seconds = time.perf_counter() - started
+
+    return {
+        'import_seconds': round(import_seconds, 3),
+        'heavy_modules_after_import': heavy_after_import,
+        'load_seconds': round(load_seconds, 3),
+        'model_load_seconds': {name: status['seconds'] for name, status in registry.status()['models'].items()},
+        'first_inference_seconds': round(first_inference_seconds, 3),
+        'warm_inference_seconds': round(warm_inference_seconds, 3),
+        'theme_load_seconds': round(theme_load_seconds, 3)
+    }
+
+def run_cold(runs: int) -> Dict[str, Any]:
+    """Each run is a new interpreter, so imports and model loads are really cold"""
+    samples: List[Dict[str, Any]] = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-m', 'app.devtools.startup_benchmark', '--child'],
+            capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    phases = ['import_seconds', 'load_seconds', 'first_inference_seconds', 'warm_inference_seconds', 'theme_load_seconds']
+    return {
+        'runs': runs,
+        'median': {phase: round(statistics.median(sample[phase] for sample in samples), 3) for phase in phases},
+        'heavy_modules_after_import': samples[-1]['heavy_modules_after_import'],
+        'samples': samples
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start timings: UI imports, model load and first inference")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to time")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_startup()))
+        return
+    print(json.dumps(run_cold(args.runs), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,17 @@
+import os
 import streamlit as st
 import time
+import uuid
 from datetime import datetime
-import pandas as pd
 from typing import Dict, Any
 
 from app.config import Config
-from app.services.api_client import SocialAPIClient
-from app.services.data_processor import DataProcessor
-from app.services.visualizer import Visualizer
+from app.services.analysis_service import create_analysis_service
+from app.services.batch_runner import load_urls
+from app.services.thread_monitor import BackgroundWatch
 from app.utils.constants import PLATFORM_EMOJIS, SENTIMENT_EMOJIS, EMOTION_EMOJIS
 from app.utils.helpers import format_number, get_time_ago
+from app.utils.metrics import end_trace, start_metrics_server, start_trace
 
 # Page configuration
 st.set_page_config(
@@ -208,14 +210,100 @@ st.markdown("""
 # Initialize components
 @st.cache_resource
 def initialize_components():
-    """Initialize all components with caching"""
-    api_client = SocialAPIClient()
-    data_processor = DataProcessor()
-    visualizer = Visualizer()
-    return api_client, data_processor, visualizer
+    """Create the analysis service; models load on first use or during warm-up"""
+    if Config.METRICS_PORT:
+        start_metrics_server(Config.METRICS_PORT)
+    return create_analysis_service()
+
+@st.cache_resource
+def get_visualizer():
+    """Plotly is only imported once there are results to chart"""
+    from app.services.visualizer import Visualizer
+    return Visualizer()
+
+def mark_watch_rerun():
+    """Watch widgets only change the monitor, so the rerun they trigger reuses the last analysis"""
+    st.session_state['watch_rerun'] = True
+
+def draw_watch(watch, visualizer, status, windows, chart):
+    """Redraws the watch panel placeholders in place from the latest poll"""
+    snapshot = watch.read()
+    if snapshot is None:
+        status.info("⏳ First poll in progress...")
+        return
+    if snapshot['error']:
+        status.warning(f"⚠️ Poll {snapshot['poll']} failed: {snapshot['error']}")
+    elif not snapshot['modified']:
+        status.info(f"🔁 Poll {snapshot['poll']} at {snapshot['polled_at'][11:19]}: no changes")
+    else:
+        status.success(
+            f"🆕 Poll {snapshot['poll']} at {snapshot['polled_at'][11:19]}: "
+            f"{snapshot['new_comments']} new, {snapshot['edited_comments']} edited comments "
+            f"({snapshot['seconds']:.1f}s)"
+        )
+    with windows.container():
+        window_cols = st.columns(len(snapshot['windows']))
+        for window_col, (window_name, window) in zip(window_cols, snapshot['windows'].items()):
+            window_col.metric(
+                f"Last {window_name}" if window_name != 'all' else "All tracked",
+                f"{window['mean_sentiment']:+.2f}",
+                f"{window['comments']} comments",
+                delta_color="off"
+            )
+    if snapshot['timeline']:
+        chart.plotly_chart(
+            visualizer.create_sentiment_timeline(snapshot['timeline']),
+            use_container_width=True, config={'displayModeBar': False}
+        )
+
+def follow_watch(watch, visualizer, status, windows, chart, clock):
+    """Keeps redrawing the panel as polls land; ends with the watch, or when a rerun or a closed tab stops the script"""
+    drawn = watch.polls
+    drawn_at = time.monotonic()
+    while watch.running:
+        # The caption is also what lets Streamlit interrupt this loop: it only stops a script at an st call
+        clock.caption(f"👀 Watching, updated {int(time.monotonic() - drawn_at)}s ago")
+        watch.wait_for_update(1.0)
+        if watch.polls != drawn:
+            draw_watch(watch, visualizer, status, windows, chart)
+            drawn = watch.polls
+            drawn_at = time.monotonic()
+        else:
+            watch.read()
+    clock.info("⏹️ Watch session ended; untick and tick the box again to keep watching.")
 
 # Load components
-api_client, data_processor, visualizer = initialize_components()
+analysis_service = initialize_components()
+live_watch = None
+
+# Bulk analysis (sidebar)
+with st.sidebar:
+    st.markdown("## 📂 Bulk Analysis")
+    url_file = st.file_uploader(
+        "Upload a URL list (.txt or .csv)",
+        type=["txt", "csv"],
+        help="One or more Reddit/X URLs per line; results are streamed to disk as they finish"
+    )
+    if url_file is not None:
+        bulk_urls = load_urls(url_file.getvalue().decode("utf-8", errors="ignore"))
+        st.write(f"Found **{len(bulk_urls)}** URLs")
+        if bulk_urls and st.button("🚀 Run Bulk Analysis", use_container_width=True):
+            os.makedirs(Config.BULK_OUTPUT_DIR, exist_ok=True)
+            bulk_output = os.path.join(
+                Config.BULK_OUTPUT_DIR, f"bulk_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+            )
+            with st.spinner(f"Fetching and analyzing {len(bulk_urls)} URLs..."):
+                bulk_report = analysis_service.analyze_urls(bulk_urls, bulk_output)
+            st.success(f"✅ Results saved to {bulk_output}")
+            st.json(bulk_report)
+            with open(bulk_output, encoding="utf-8") as f:
+                st.download_button(
+                    label="📥 Download Results (JSONL)",
+                    data=f.read(),
+                    file_name=os.path.basename(bulk_output),
+                    mime="application/jsonl",
+                    use_container_width=True
+                )
 
 # Main app header
 st.markdown("""
@@ -234,30 +322,38 @@ url_input = st.text_input(
 )
 
 if url_input:
-    # Extract platform and post ID
-    platform, post_data = api_client.fetch_content(url_input)
-    
-    if platform and post_data:
+    # Ticking the watch box or moving its slider must not fetch and analyze the whole thread again
+    last_analysis = st.session_state.get('last_analysis')
+    if st.session_state.pop('watch_rerun', False) and last_analysis and last_analysis[0] == url_input:
+        analysis = last_analysis[1]
+    else:
         # Show loading state
-        with st.container():
-            st.markdown("""
-            <div class="loading-container">
-                <div class="loading-spinner">🤖</div>
-                <h3>Analyzing with AI models...</h3>
-                <p>Processing content with advanced NLP and emotion detection</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Process data with AI models
-            with st.spinner("Running HuggingFace transformers..."):
-                processed_data = data_processor.process_content(platform, post_data)
-            
+        loading_placeholder = st.empty()
+        loading_placeholder.markdown("""
+        <div class="loading-container">
+            <div class="loading-spinner">🤖</div>
+            <h3>Analyzing with AI models...</h3>
+            <p>Processing content with advanced NLP and emotion detection</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Fetch and process data with AI models
+        with st.spinner("Running HuggingFace transformers..."):
+            analysis = analysis_service.analyze_url(url_input)
+        st.session_state['last_analysis'] = (url_input, analysis)
+        
         # Clear loading state
-        st.empty()
+        loading_placeholder.empty()
+    visualizer = get_visualizer()
+    platform = analysis.get('platform')
+    
+    if platform and analysis.get('fetched'):
+        processed_data = analysis.get('result')
         
         if processed_data:
+            render_trace, render_token = start_trace('render')
             # Platform header
-            platform_info = api_client.get_platform_info(platform)
+            platform_info = analysis_service.get_platform_info(platform)
             st.markdown(f"""
             <div class="content-card">
                 <div class="platform-badge">
@@ -438,14 +534,33 @@ if url_input:
                     """, unsafe_allow_html=True)
             
             with tab3:
-                # Comments analysis (Reddit only)
-                if platform == 'reddit':
-                    comments_data = processed_data.get('comments', {})
+                # Comments analysis (Reddit comments, X conversation replies)
+                comments_data = processed_data.get('comments')
+                if comments_data is not None:
                     processed_comments = comments_data.get('processed_comments', [])
                     theme_analysis = comments_data.get('theme_analysis', {})
                     
                     if processed_comments:
-                        st.markdown(f"### 💬 Comment Analysis ({len(processed_comments)} comments)")
+                        total_seen = comments_data.get('total_seen', len(processed_comments))
+                        st.markdown(f"### 💬 Comment Analysis ({len(processed_comments)} of {total_seen} comments)")
+                        if comments_data.get('truncated'):
+                            st.caption(f"📄 Stopped after {comments_data.get('pages', 0)} pages of replies (X_REPLIES_MAX_COMMENTS / X_REPLIES_TIME_BUDGET)")
+                        
+                        # Copypasta and repeated replies were inferred once per group
+                        collapsed = (comments_data.get('delta') or {}).get('collapsed', 0)
+                        near_duplicates = comments_data.get('near_duplicates', [])
+                        if collapsed:
+                            st.caption(f"🔁 {collapsed} near-duplicate comments reused the result of a matching comment")
+                        if near_duplicates:
+                            with st.expander(f"🔁 Repeated Comments ({len(near_duplicates)} groups)"):
+                                for group in sorted(near_duplicates, key=lambda group: group['count'], reverse=True)[:10]:
+                                    st.write(f"• **×{group['count']}**: {group['text'][:150]}")
+                        
+                        comment_entities = comments_data.get('entities') or {}
+                        for label, prefix, key in (("Hashtags", "#", 'top_hashtags'), ("Mentions", "@", 'top_mentions')):
+                            top_entities = comment_entities.get(key, [])
+                            if top_entities:
+                                st.caption(f"{label} in comments: " + ", ".join(f"{prefix}{name} ({count})" for name, count in top_entities[:5]))
                         
                         # Comment sentiment distribution
                         sentiment_dist = comments_data.get('sentiment_distribution', {})
@@ -513,7 +628,10 @@ if url_input:
                                         comment_text = comment.get('text', comment.get('body', ''))
                                         author = comment.get('author', 'unknown')
                                         score = comment.get('score', 0)
-                                        st.write(f"• **u/{author}** ({score} pts): {comment_text[:150]}...")
+                                        if platform == 'twitter':
+                                            st.write(f"• **@{author}** ({score} likes): {comment_text[:150]}...")
+                                        else:
+                                            st.write(f"• **u/{author}** ({score} pts): {comment_text[:150]}...")
                         
                         # Comment timeline
                         if len(processed_comments) > 5:
@@ -525,7 +643,7 @@ if url_input:
                         st.info("💡 No comments found or comments are not accessible.")
                 
                 else:
-                    st.info("💡 Comment analysis is available for Reddit posts only.")
+                    st.info("💡 Comment analysis is not available for this post.")
             
             with tab4:
                 # Advanced insights
@@ -626,6 +744,12 @@ if url_input:
                     st.write(f"**Emotion Model:** {Config.EMOTION_MODEL.split('/')[-1]}")
                     st.write("**Analysis Type:** HuggingFace Transformers")
                     st.write("**Processing:** Real-time AI analysis")
+                    service_stats = analysis_service.stats()
+                    cache_stats = service_stats['inference_cache']
+                    st.write(f"**Inference Cache:** {cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%})")
+                
+                with st.expander("⚙️ Length Bucket Throughput"):
+                    st.json(service_stats['length_buckets'])
                 
                 # Create export data
                 export_data = {
@@ -660,6 +784,8 @@ if url_input:
                     if processed_data.get('comments', {}).get('processed_comments'):
                         export_data['comments_analyzed'] = len(processed_data['comments']['processed_comments'])
                 
+                import pandas as pd
+                
                 df = pd.DataFrame([export_data])
                 csv = df.to_csv(index=False)
                 
@@ -671,7 +797,88 @@ if url_input:
                     use_container_width=True
                 )
                 
+                export_comments = processed_data.get('comments', {}).get('processed_comments')
+                if export_comments:
+                    if hasattr(export_comments, 'to_frame'):
+                        comments_df = export_comments.to_frame()
+                    else:  # plain list of comment dicts from a remote analysis server
+                        comments_df = pd.json_normalize(export_comments)
+                    st.download_button(
+                        label="💬 Download Comment Analysis (CSV)",
+                        data=comments_df.to_csv(index=False),
+                        file_name=f"{platform}_comments_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                        mime="text/csv",
+                        use_container_width=True
+                    )
+                
                 st.success("✅ Analysis completed successfully! Your data is ready for export.")
+            
+            # Per-stage timings of this analysis (recorded by the server when analysis is remote) and of this render
+            render_timings = end_trace(render_trace, render_token).to_dict()
+            analysis_trace = analysis.get('trace')
+            if analysis_trace:
+                with st.expander("⏱️ Performance"):
+                    stages = analysis_trace['spans'] + [
+                        {'name': 'render', 'start': None, 'seconds': render_timings['seconds'], 'calls': 1}
+                    ] + render_timings['spans']
+                    total_seconds = analysis_trace['seconds'] + render_timings['seconds']
+                    st.write(f"**Total:** {total_seconds:.2f}s ({analysis_trace['seconds']:.2f}s analysis, {render_timings['seconds']:.2f}s rendering)")
+                    st.plotly_chart(visualizer.create_stage_breakdown(stages), use_container_width=True)
+                    st.dataframe(
+                        [
+                            {
+                                'Stage': stage['name'],
+                                'Seconds': stage['seconds'],
+                                'Calls': stage['calls'],
+                                'Share': f"{stage['seconds'] / total_seconds:.0%}" if total_seconds else "-"
+                            }
+                            for stage in stages
+                        ],
+                        use_container_width=True
+                    )
+                    counters = analysis_trace['counters']
+                    perf_col1, perf_col2, perf_col3, perf_col4 = st.columns(4)
+                    perf_col1.metric("Texts Analyzed", format_number(int(counters.get('texts_analyzed_total', 0))))
+                    perf_col2.metric("Cache Hits", format_number(int(counters.get('inference_cache_hits_total', 0))))
+                    perf_col3.metric("Truncated", format_number(int(counters.get('texts_truncated_total', 0))))
+                    perf_col4.metric("HTTP Requests", format_number(int(counters.get('http_requests_total', 0))))
+            
+            # Live monitoring: a background thread polls, and the panel below is redrawn in place as polls land
+            st.markdown("## 📡 Live Thread Monitor")
+            watch_col1, watch_col2 = st.columns([3, 1])
+            with watch_col1:
+                watch_interval = st.slider(
+                    "Poll every (seconds)", 15, 600, int(Config.MONITOR_INTERVAL), step=15, on_change=mark_watch_rerun
+                )
+            with watch_col2:
+                watching = st.checkbox(
+                    "Watch this thread", help="Analyzes only new or edited comments on each poll",
+                    on_change=mark_watch_rerun
+                )
+            
+            # One monitor per browser session, released as soon as the box is unticked, the URL changes
+            # or nobody has read the watch for MONITOR_UNREAD_TIMEOUT seconds
+            watcher_id = st.session_state.setdefault('watcher_id', uuid.uuid4().hex)
+            watched_url = st.session_state.get('watched_url')
+            watch = st.session_state.get('thread_watch')
+            if watched_url and (not watching or watched_url != url_input):
+                analysis_service.stop_watching(watched_url, watcher_id)
+                st.session_state.pop('watched_url')
+            if watch is not None and (not watching or watched_url != url_input or watch.interval != watch_interval):
+                watch.stop()
+                watch = st.session_state['thread_watch'] = None
+            
+            if watching:
+                if watch is None:
+                    st.session_state['watched_url'] = url_input
+                    watch = st.session_state['thread_watch'] = BackgroundWatch(
+                        lambda: analysis_service.poll_thread(url_input, watcher_id), watch_interval,
+                        on_expire=lambda: analysis_service.stop_watching(url_input, watcher_id)
+                    )
+                watch_panel = (st.empty(), st.empty(), st.empty(), st.empty())
+                draw_watch(watch, visualizer, *watch_panel[:3])
+                # Followed after the rest of the page has rendered
+                live_watch = (watch, visualizer) + watch_panel
         
         else:
             st.error("❌ Failed to process the content. Please check the URL and try again.")
@@ -743,3 +950,8 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# The page is on screen by now; load the models in the background so the first analysis starts warm
+analysis_service.warm_up()
+
+if live_watch:
+    follow_watch(*live_watch)
@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+from typing import Dict, Any, List, Optional, Tuple
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from app.config import Config
+
+SUPPORTED_BACKENDS = ('torch', 'onnx', 'torch-int8')
+
+PARITY_SAMPLE_TEXTS = [
+    "I love this so much, best update ever!",
+    "This is the worst thing I have read all week.",
+    "ok",
+    "Not bad at all, honestly better than I expected.",
+    "Why does the app crash every time I open settings?",
+    "lol same",
+    "I'm scared about what this means for my job.",
+    "Wow, I did not see that coming.",
+]
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    backend = (backend or Config.INFERENCE_BACKEND).lower()
+    if backend not in SUPPORTED_BACKENDS:
+        print(f"❌ Unknown inference backend '{backend}', falling back to torch")
+        return 'torch'
+    return backend
+
+def load_sequence_classifier(model_name: str, revision: str = "main",
+                             backend: Optional[str] = None) -> Tuple[Any, Any, str]:
+    """Load tokenizer and classifier for the requested backend, returning the backend actually used"""
+    backend = resolve_backend(backend)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, revision=revision)
+
+    if backend == 'onnx':
+        try:
+            return tokenizer, _load_onnx_model(model_name, revision), backend
+        except ImportError:
+            print("❌ ONNX backend needs `pip install optimum[onnxruntime]`, falling back to torch")
+            backend = 'torch'
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_name, revision=revision)
+    model.eval()
+    if backend == 'torch-int8':
+        # Dynamic quantization: int8 weights for every Linear layer, activations quantized on the fly
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return tokenizer, model, backend
+
+def _load_onnx_model(model_name: str, revision: str):
+    """Load an exported ONNX graph, exporting it on first use"""
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+
+    export_dir = os.path.join(Config.ONNX_CACHE_DIR, model_name.replace('/', '__'), revision)
+    if os.path.exists(os.path.join(export_dir, 'model.onnx')):
+        return ORTModelForSequenceClassification.from_pretrained(export_dir)
+
+    model = ORTModelForSequenceClassification.from_pretrained(model_name, revision=revision, export=True)
+    try:
+        os.makedirs(export_dir, exist_ok=True)
+        model.save_pretrained(export_dir)
+    except OSError as e:
+        print(f"❌ Could not save ONNX export to {export_dir}: {e}")
+    return model
+
+def predict_probabilities(tokenizer, model, texts: List[str], max_length: Optional[int] = None) -> List[List[float]]:
+    """Softmax class probabilities for a batch of texts"""
+    encoded = tokenizer(
+        texts,
+        padding=True,
+        truncation=True,
+        max_length=max_length or Config.MAX_LENGTH,
+        return_tensors="pt"
+    )
+    inputs = {key: value for key, value in encoded.items() if key in ('input_ids', 'attention_mask')}
+    with torch.no_grad():
+        logits = model(**inputs).logits
+    return torch.softmax(torch.as_tensor(logits), dim=-1).tolist()
+
+def check_backend_parity(backend: str, texts: Optional[List[str]] = None,
+                         model_names: Optional[List[Tuple[str, str]]] = None) -> Dict[str, Any]:
+    """Compare a backend's labels and scores against the fp32 torch baseline"""
+    texts = texts or PARITY_SAMPLE_TEXTS
+    model_names = model_names or [
+        (Config.SENTIMENT_MODEL, Config.SENTIMENT_MODEL_REVISION),
+        (Config.EMOTION_MODEL, Config.EMOTION_MODEL_REVISION),
+    ]
+
+    report = {'backend': backend, 'num_texts': len(texts), 'models': {}}
+    for model_name, revision in model_names:
+        tokenizer, baseline_model, _ = load_sequence_classifier(model_name, revision, 'torch')
+        _, candidate_model, used_backend = load_sequence_classifier(model_name, revision, backend)
+
+        baseline = predict_probabilities(tokenizer, baseline_model, texts)
+        candidate = predict_probabilities(tokenizer, candidate_model, texts)
+
+        label_matches = 0
+        score_diffs = []
+        for base_row, cand_row in zip(baseline, candidate):
+            if base_row.index(max(base_row)) == cand_row.index(max(cand_row)):
+                label_matches += 1
+            score_diffs.extend(abs(b - c) for b, c in zip(base_row, cand_row))
+
+        report['models'][model_name] = {
+            'backend_used': used_backend,
+            'label_agreement': round(label_matches / len(texts), 4) if texts else 1.0,
+            'max_score_drift': round(max(score_diffs), 6) if score_diffs else 0.0,
+            'mean_score_drift': round(sum(score_diffs) / len(score_diffs), 6) if score_diffs else 0.0
+        }
+
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Check inference backend parity against the fp32 torch baseline")
+    parser.add_argument("--backend", default=Config.INFERENCE_BACKEND, choices=SUPPORTED_BACKENDS)
+    parser.add_argument("--texts", help="Optional file with one sample text per line")
+    args = parser.parse_args()
+
+    texts = None
+    if args.texts:
+        with open(args.texts, encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+
+    print(json.dumps(check_backend_parity(args.backend, texts), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from app.config import Config
+from app.utils.metrics import metrics
+
+class LengthBucketScheduler:
+    """Groups texts into token-length buckets so each batch is only padded to its own longest text"""
+
+    def __init__(self, edges: Optional[List[int]] = None, batch_size: Optional[int] = None,
+                 max_length: Optional[int] = None):
+        self.max_length = max_length or Config.MAX_LENGTH
+        edges = sorted(set(edge for edge in (edges or Config.LENGTH_BUCKETS) if edge < self.max_length))
+        self.edges = edges + [self.max_length]
+        self.batch_size = batch_size or Config.BATCH_SIZE
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.reset_stats()
+
+    def bucket_for(self, length: int) -> int:
+        """Smallest bucket edge that fits the given token length"""
+        for edge in self.edges:
+            if length <= edge:
+                return edge
+        return self.edges[-1]
+
+    def schedule(self, lengths: List[int], batch_size: Optional[int] = None) -> List[Tuple[int, List[int]]]:
+        """Split text positions into (bucket_edge, positions) batches, shortest bucket first"""
+        batch_size = batch_size or self.batch_size
+        buckets: Dict[int, List[int]] = {edge: [] for edge in self.edges}
+        for position, length in enumerate(lengths):
+            buckets[self.bucket_for(length)].append(position)
+
+        batches = []
+        for edge, positions in buckets.items():
+            positions.sort(key=lambda position: lengths[position])
+            for start in range(0, len(positions), batch_size):
+                batches.append((edge, positions[start:start + batch_size]))
+        return batches
+
+    def record(self, edge: int, lengths: List[int], padded_length: int, seconds: float) -> None:
+        """Record one executed batch for the per-bucket throughput stats"""
+        truncated = sum(1 for length in lengths if length >= self.max_length)
+        metrics.increment('inference_batches_total', bucket=f"<={edge}")
+        metrics.increment('inference_tokens_total', sum(lengths))
+        metrics.increment('inference_padded_tokens_total', padded_length * len(lengths))
+        metrics.increment('texts_truncated_total', truncated)
+        with self._lock:
+            bucket = self._stats[edge]
+            bucket['texts'] += len(lengths)
+            bucket['batches'] += 1
+            bucket['tokens'] += sum(lengths)
+            bucket['padded_tokens'] += padded_length * len(lengths)
+            bucket['truncated'] += truncated
+            bucket['seconds'] += seconds
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-bucket counts, padding efficiency and throughput"""
+        with self._lock:
+            report = {}
+            for edge, bucket in self._stats.items():
+                seconds = bucket['seconds']
+                report[f"<={edge}"] = {
+                    **bucket,
+                    'seconds': round(seconds, 4),
+                    'padding_efficiency': round(bucket['tokens'] / bucket['padded_tokens'], 3) if bucket['padded_tokens'] else 1.0,
+                    'texts_per_second': round(bucket['texts'] / seconds, 1) if seconds else 0.0,
+                    'tokens_per_second': round(bucket['tokens'] / seconds, 1) if seconds else 0.0
+                }
+            return report
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = {
+                edge: {'texts': 0, 'batches': 0, 'tokens': 0, 'padded_tokens': 0, 'truncated': 0, 'seconds': 0.0}
+                for edge in self.edges
+            }
@@ -0,0 +1,242 @@
+import sys
+import numpy as np
+from typing import TYPE_CHECKING, Dict, Any, List, Iterable, Iterator, Optional, Sequence, Union
+from app.models.dedup import duplicate_groups
+from app.utils.constants import SENTIMENT_EMOJIS, EMOTION_EMOJIS
+from app.utils.helpers import get_time_ago
+
+if TYPE_CHECKING:
+    import pandas as pd  # imported on demand in to_frame
+
+SENTIMENT_LABELS = ['NEGATIVE', 'NEUTRAL', 'POSITIVE']
+SENTIMENT_VALUES = {'NEGATIVE': -1, 'NEUTRAL': 0, 'POSITIVE': 1}
+
+class CommentStore:
+    """Columnar table of analyzed comments: one NumPy array per field instead of a dict per comment"""
+
+    def __init__(self, columns: Dict[str, np.ndarray], sentiment_labels: List[str], emotion_labels: List[str]):
+        self.columns = columns
+        self.sentiment_labels = sentiment_labels
+        self.emotion_labels = emotion_labels
+
+    @classmethod
+    def from_results(cls, comments: Sequence[Dict[str, Any]], cleaned_texts: Sequence[str],
+                     text_results: Sequence[Dict[str, Any]],
+                     duplicate_of: Optional[np.ndarray] = None,
+                     features: Optional[Sequence[Dict[str, Any]]] = None) -> 'CommentStore':
+        """Build the table from raw comment records, their TextAnalyzer results, near-duplicate groups and text features"""
+        n = len(comments)
+        if duplicate_of is None:
+            duplicate_of = np.arange(n, dtype=np.int64)
+        if features is None:
+            features = [{'entities': {}, 'readability': {'word_count': len(text.split())}} for text in cleaned_texts]
+        sentiment_labels = list(SENTIMENT_LABELS)
+        emotion_labels: List[str] = []
+        sentiment_index = {label: i for i, label in enumerate(sentiment_labels)}
+        emotion_index: Dict[str, int] = {}
+
+        # Label sets are discovered from the results, so any model head fits
+        for result in text_results:
+            for label in result['sentiment'].get('all_scores', {}):
+                if label not in sentiment_index:
+                    sentiment_index[label] = len(sentiment_labels)
+                    sentiment_labels.append(label)
+            for label in result['emotion'].get('all_emotions', {}):
+                if label not in emotion_index:
+                    emotion_index[label] = len(emotion_labels)
+                    emotion_labels.append(label)
+            emotion = result['emotion'].get('dominant_emotion', 'neutral')
+            if emotion not in emotion_index:
+                emotion_index[emotion] = len(emotion_labels)
+                emotion_labels.append(emotion)
+
+        sentiment_probs = np.zeros((n, len(sentiment_labels)), dtype=np.float32)
+        emotion_probs = np.zeros((n, len(emotion_labels)), dtype=np.float32)
+        sentiment_label = np.empty(n, dtype=np.int8)
+        emotion_label = np.empty(n, dtype=np.int8)
+        for row, result in enumerate(text_results):
+            sentiment, emotion = result['sentiment'], result['emotion']
+            for label, score in sentiment.get('all_scores', {}).items():
+                sentiment_probs[row, sentiment_index[label]] = score
+            for label, score in emotion.get('all_emotions', {}).items():
+                emotion_probs[row, emotion_index[label]] = score
+            sentiment_label[row] = sentiment_index.get(sentiment.get('sentiment', 'NEUTRAL'), 1)
+            emotion_label[row] = emotion_index[emotion.get('dominant_emotion', 'neutral')]
+
+        columns = {
+            'id': np.array([comment.get('id') for comment in comments], dtype=object),
+            'text': np.array([comment.get('body', '') for comment in comments], dtype=object),
+            'cleaned_text': np.array(list(cleaned_texts), dtype=object),
+            'author': np.array([comment.get('author', '[deleted]') for comment in comments], dtype=object),
+            'parent_id': np.array([comment.get('parent_id') for comment in comments], dtype=object),
+            'score': np.fromiter((comment.get('score', 0) or 0 for comment in comments), dtype=np.int32, count=n),
+            'created_utc': np.fromiter((comment.get('created_utc', 0) or 0 for comment in comments), dtype=np.float64, count=n),
+            'depth': np.fromiter((comment.get('depth', 0) or 0 for comment in comments), dtype=np.int16, count=n),
+            'word_count': np.fromiter((feature['readability']['word_count'] for feature in features), dtype=np.int32, count=n),
+            # Only the entity kinds a comment actually has; most comments have none
+            'entities': np.array(
+                [{key: values for key, values in feature['entities'].items() if values} or None for feature in features],
+                dtype=object
+            ),
+            'sentiment_probs': sentiment_probs,
+            'sentiment_label': sentiment_label,
+            'emotion_probs': emotion_probs,
+            'emotion_label': emotion_label,
+            # Row of the group representative, and the group size as each row's weight
+            'duplicate_of': np.asarray(duplicate_of, dtype=np.int64),
+            'duplicate_count': np.bincount(duplicate_of, minlength=n).astype(np.int32)[duplicate_of]
+        }
+        return cls(columns, sentiment_labels, emotion_labels)
+
+    def __len__(self) -> int:
+        return len(self.columns['id'])
+
+    def view(self, indices: Optional[Iterable[int]] = None) -> 'CommentView':
+        if indices is None:
+            indices = np.arange(len(self), dtype=np.int64)
+        return CommentView(self, np.asarray(indices, dtype=np.int64))
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """Single comment in the dict shape the UI and exports expect"""
+        columns = self.columns
+        sentiment_probs = columns['sentiment_probs'][i]
+        emotion_probs = columns['emotion_probs'][i]
+        sentiment = self.sentiment_labels[columns['sentiment_label'][i]]
+        emotion = self.emotion_labels[columns['emotion_label'][i]]
+        all_scores = {label: float(p) for label, p in zip(self.sentiment_labels, sentiment_probs) if p > 0}
+        all_emotions = {label: float(p) for label, p in zip(self.emotion_labels, emotion_probs) if p > 0}
+        top_3 = sorted(all_emotions.items(), key=lambda item: item[1], reverse=True)[:3]
+        created_utc = columns['created_utc'][i]
+
+        return {
+            'id': columns['id'][i],
+            'text': columns['text'][i],
+            'cleaned_text': columns['cleaned_text'][i],
+            'author': columns['author'][i],
+            'score': int(columns['score'][i]),
+            'created_utc': created_utc.item(),
+            'depth': int(columns['depth'][i]),
+            'parent_id': columns['parent_id'][i],
+            'word_count': int(columns['word_count'][i]),
+            'entities': columns['entities'][i] or {},
+            'duplicates': int(columns['duplicate_count'][i]),
+            'sentiment': {
+                'sentiment': sentiment,
+                'confidence': round(float(sentiment_probs.max(initial=0.0)), 3),
+                'emoji': SENTIMENT_EMOJIS.get(sentiment, '😐'),
+                'all_scores': all_scores,
+                'polarity': round(all_scores.get('POSITIVE', 0.0) - all_scores.get('NEGATIVE', 0.0), 3)
+            },
+            'emotion': {
+                'dominant_emotion': emotion,
+                'confidence': all_emotions.get(emotion, 0.0),
+                'emoji': EMOTION_EMOJIS.get(emotion, '😐'),
+                'all_emotions': all_emotions,
+                'top_3_emotions': [
+                    {'emotion': label, 'score': score, 'emoji': EMOTION_EMOJIS.get(label, '😐')}
+                    for label, score in top_3
+                ]
+            },
+            'time_ago': get_time_ago(int(created_utc))
+        }
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the table, including string payloads"""
+        total = 0
+        for name, column in self.columns.items():
+            total += column.nbytes
+            if column.dtype == object:
+                total += sum(sys.getsizeof(value) for value in column if value is not None)
+        return total
+
+class CommentView:
+    """Index view into a CommentStore; behaves like a read-only list of comment dicts"""
+
+    def __init__(self, store: CommentStore, indices: np.ndarray):
+        self.store = store
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in self.indices:
+            yield self.store.row(i)
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[Dict[str, Any], 'CommentView']:
+        if isinstance(item, slice):
+            return CommentView(self.store, self.indices[item])
+        return self.store.row(self.indices[item])
+
+    def take(self, positions: Sequence[int]) -> 'CommentView':
+        """Sub-view by positions within this view; shares the underlying columns"""
+        return CommentView(self.store, self.indices[np.asarray(positions, dtype=np.int64)])
+
+    def column(self, name: str) -> np.ndarray:
+        return self.store.columns[name][self.indices]
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self.column('id')
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self.column('score')
+
+    @property
+    def texts(self) -> np.ndarray:
+        return self.column('text')
+
+    @property
+    def cleaned_texts(self) -> np.ndarray:
+        return self.column('cleaned_text')
+
+    @property
+    def duplicate_counts(self) -> np.ndarray:
+        return self.column('duplicate_count')
+
+    def duplicate_groups(self) -> List[List[int]]:
+        """Positions in this view of every near-duplicate group with more than one member here"""
+        return duplicate_groups(self.column('duplicate_of'))
+
+    def sentiment_labels(self) -> np.ndarray:
+        return np.asarray(self.store.sentiment_labels, dtype=object)[self.column('sentiment_label')]
+
+    def sentiment_distribution(self) -> Dict[str, int]:
+        counts = np.bincount(self.column('sentiment_label'), minlength=len(self.store.sentiment_labels))
+        distribution = {'POSITIVE': 0, 'NEGATIVE': 0, 'NEUTRAL': 0}
+        distribution.update({label: int(count) for label, count in zip(self.store.sentiment_labels, counts) if count})
+        return distribution
+
+    def timeline(self) -> Dict[str, Any]:
+        """Comments in creation order with their sentiment label and -1/0/1 value"""
+        order = np.argsort(self.column('created_utc'), kind='stable')
+        labels = self.sentiment_labels()[order]
+        values = np.array([SENTIMENT_VALUES.get(label, 0) for label in self.store.sentiment_labels])
+        created = self.column('created_utc')[order]
+        return {
+            'created_utc': created,
+            'time_ago': [get_time_ago(int(stamp)) for stamp in created],
+            'sentiments': labels,
+            'values': values[self.column('sentiment_label')[order]]
+        }
+
+    def to_frame(self) -> 'pd.DataFrame':
+        """Flat export table with one probability column per label"""
+        import pandas as pd
+        frame = pd.DataFrame({
+            name: self.column(name)
+            for name in ('id', 'author', 'score', 'created_utc', 'depth', 'parent_id', 'word_count', 'duplicate_count', 'text')
+        })
+        frame['sentiment'] = self.sentiment_labels()
+        frame['emotion'] = np.asarray(self.store.emotion_labels, dtype=object)[self.column('emotion_label')]
+        sentiment_probs = self.column('sentiment_probs')
+        for i, label in enumerate(self.store.sentiment_labels):
+            frame[f"sentiment_{label.lower()}"] = sentiment_probs[:, i]
+        emotion_probs = self.column('emotion_probs')
+        for i, label in enumerate(self.store.emotion_labels):
+            frame[f"emotion_{label}"] = emotion_probs[:, i]
+        return frame
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return list(self)
@@ -0,0 +1,81 @@
+import hashlib
+import re
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.config import Config
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+SHINGLE_SIZE = 2
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 32  # 4 rows each: texts at 0.7 Jaccard share a band ~99.99% of the time, at 0.3 ~23%
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_random = np.random.RandomState(42)
+# Universal hashes (a * x + b) mod p; uint64 wrap-around in a * x is fine, it only adds more mixing
+_A = _random.randint(1, (1 << 61) - 1, MINHASH_PERMUTATIONS, dtype=np.uint64)
+_B = _random.randint(0, (1 << 61) - 1, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+def _shingles(tokens: List[str]) -> set:
+    # Word bigrams: comments are short, so longer shingles leave too few in common after a one-word edit
+    if len(tokens) < SHINGLE_SIZE:
+        return set(tokens)
+    return {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+def minhash(tokens: List[str]) -> np.ndarray:
+    """MinHash signature of the token list's word bigrams; equal positions estimate Jaccard similarity"""
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'little')
+         for shingle in _shingles(tokens)],
+        dtype=np.uint64
+    )
+    return (((np.outer(hashes, _A) + _B) % _PRIME) & _MAX_HASH).min(axis=0)
+
+def group_near_duplicates(texts: Sequence[str], threshold: Optional[float] = None,
+                          min_tokens: Optional[int] = None) -> np.ndarray:
+    """Index of each text's group representative (its first member); unique texts point at themselves"""
+    threshold = Config.DEDUP_THRESHOLD if threshold is None else threshold
+    min_tokens = Config.DEDUP_MIN_TOKENS if min_tokens is None else min_tokens
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+
+    bands: List[Dict[bytes, List[int]]] = [{} for _ in range(LSH_BANDS)]
+    exact: Dict[Tuple[str, ...], int] = {}
+    signatures: Dict[int, np.ndarray] = {}
+
+    representatives = np.arange(len(texts), dtype=np.int64)
+    for i, text in enumerate(texts):
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        if len(tokens) < min_tokens:
+            # Too few shingles for a stable estimate; short replies only collapse when identical
+            representatives[i] = exact.setdefault(tuple(tokens), i)
+            continue
+
+        signature = minhash(tokens)
+        keys = [signature[band * rows:(band + 1) * rows].tobytes() for band in range(LSH_BANDS)]
+        match = None
+        checked = set()
+        for band, key in enumerate(keys):
+            for leader in bands[band].get(key, ()):
+                # Compared against group leaders only, so a chain of small edits cannot drift into one group
+                if leader in checked:
+                    continue
+                checked.add(leader)
+                if np.count_nonzero(signature == signatures[leader]) >= threshold * MINHASH_PERMUTATIONS:
+                    match = leader
+                    break
+            if match is not None:
+                break
+
+        if match is not None:
+            representatives[i] = match
+        else:
+            signatures[i] = signature
+            for band, key in enumerate(keys):
+                bands[band].setdefault(key, []).append(i)
+    return representatives
+
+def duplicate_groups(representatives: np.ndarray) -> List[List[int]]:
+    """Member indices of every group with more than one text"""
+    groups: Dict[int, List[int]] = {}
+    for i, representative in enumerate(representatives.tolist()):
+        groups.setdefault(representative, []).append(i)
+    return [members for members in groups.values() if len(members) > 1]
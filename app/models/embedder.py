@@ -0,0 +1,128 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+from app.config import Config
+from app.utils.cache import normalize_cache_text
+
+class SentenceEmbedder:
+    """Small local sentence encoder with a per-text embedding cache"""
+
+    def __init__(self, model_name: Optional[str] = None, revision: Optional[str] = None,
+                 cache_size: Optional[int] = None):
+        self.model_name = model_name or Config.EMBEDDING_MODEL
+        self.revision = revision or Config.EMBEDDING_MODEL_REVISION
+        self.cache_size = cache_size or Config.EMBEDDING_CACHE_SIZE
+        self.tokenizer = None
+        self.model = None
+        self.device = None
+        self._cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self) -> bool:
+        # Loaded on first use so the TF-IDF theme engine never pays for it
+        if self.model is not None:
+            return True
+        try:
+            import torch
+            from transformers import AutoModel, AutoTokenizer
+
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, revision=self.revision)
+            self.model = AutoModel.from_pretrained(self.model_name, revision=self.revision)
+            self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+            self.model.to(self.device).eval()
+            return True
+        except Exception as e:
+            print(f"❌ Error loading embedding model: {e}")
+            self.tokenizer = None
+            self.model = None
+            return False
+
+    def encode(self, texts: List[str], batch_size: Optional[int] = None) -> Optional[np.ndarray]:
+        """L2-normalized embeddings in input order; each distinct text is encoded once"""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        keys = [normalize_cache_text(text) for text in texts]
+        with self._lock:
+            missing = list(dict.fromkeys(key for key in keys if key not in self._cache))
+            if missing:
+                if not self._load():
+                    return None
+                for key, vector in zip(missing, self._encode_uncached(missing, batch_size or Config.EMBEDDING_BATCH_SIZE)):
+                    self._cache[key] = vector
+            for key in keys:
+                self._cache.move_to_end(key)
+            vectors = np.stack([self._cache[key] for key in keys])
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return vectors
+
+    def _encode_uncached(self, texts: List[str], batch_size: int) -> List[np.ndarray]:
+        import torch
+
+        # Similar lengths share a batch so little compute goes to padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                indices = order[start:start + batch_size]
+                encoded = self.tokenizer(
+                    [texts[i] for i in indices], padding=True, truncation=True,
+                    max_length=Config.EMBEDDING_MAX_LENGTH, return_tensors='pt'
+                ).to(self.device)
+                hidden = self.model(**encoded).last_hidden_state
+                # Mean pooling over real tokens, then unit length so dot product == cosine
+                mask = encoded['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                pooled = torch.nn.functional.normalize(pooled, dim=1)
+                for i, vector in zip(indices, pooled.cpu().numpy().astype(np.float32)):
+                    vectors[i] = vector
+        return vectors
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def near_duplicates(self, embeddings: np.ndarray, threshold: Optional[float] = None) -> List[List[int]]:
+        """Groups of indices whose embeddings are within `threshold` cosine similarity"""
+        threshold = threshold if threshold is not None else Config.NEAR_DUPLICATE_THRESHOLD
+        if len(embeddings) < 2:
+            return []
+
+        similarity = embeddings @ embeddings.T
+        # Union-find over the upper triangle of the similarity matrix
+        parent = list(range(len(embeddings)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        rows, cols = np.nonzero(np.triu(similarity >= threshold, k=1))
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            parent[find(j)] = find(i)
+
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(embeddings)):
+            groups.setdefault(find(i), []).append(i)
+        return [members for members in groups.values() if len(members) > 1]
+
+    def search(self, query: str, embeddings: np.ndarray, top_k: int = 5) -> List[Dict[str, Any]]:
+        """Indices and cosine scores of the rows most similar to `query`"""
+        query_vector = self.encode([query])
+        if query_vector is None or len(embeddings) == 0:
+            return []
+        scores = embeddings @ query_vector[0]
+        top = np.argsort(-scores)[:top_k]
+        return [{'index': int(i), 'score': float(scores[i])} for i in top]
+
+_embedder: Optional[SentenceEmbedder] = None
+
+def get_sentence_embedder() -> SentenceEmbedder:
+    """Process-wide embedder, so every feature reuses the same cached vectors"""
+    global _embedder
+    if _embedder is None:
+        _embedder = SentenceEmbedder()
+    return _embedder
@@ -1,18 +1,28 @@
 from transformers import pipeline
 import torch
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from app.config import Config
+from app.models.backends import load_sequence_classifier, resolve_backend
+from app.utils.cache import InferenceCache, get_inference_cache
 from app.utils.constants import EMOTION_EMOJIS
 
 class EmotionDetector:
-    def __init__(self):
+    def __init__(self, cache: Optional[InferenceCache] = None):
         self.model_name = Config.EMOTION_MODEL
-        self.device = 0 if torch.cuda.is_available() else -1
+        self.revision = Config.EMOTION_MODEL_REVISION
+        self.cache = cache or get_inference_cache()
+        self.backend = resolve_backend()
+        # ONNX Runtime and int8 dynamic quantization target CPU inference
+        self.device = 0 if torch.cuda.is_available() and self.backend == 'torch' else -1
         self.max_length = getattr(Config, "MAX_LENGTH", 128)
         try:
+            self.tokenizer, self.model, self.backend = load_sequence_classifier(
+                self.model_name, self.revision, self.backend
+            )
             self.pipeline = pipeline(
                 "text-classification",
-                model=self.model_name,
+                model=self.model,
+                tokenizer=self.tokenizer,
                 device=self.device,
                 top_k=None,
                 truncation=True,
@@ -20,6 +30,8 @@ class EmotionDetector:
             )
         except Exception as e:
             print(f"❌ Error loading emotion model: {e}")
+            self.tokenizer = None
+            self.model = None
             self.pipeline = None
 
     def detect_emotions(self, text: str) -> Dict[str, Any]:
@@ -27,38 +39,79 @@ class EmotionDetector:
             return self._default_result("Pipeline missing")
         if not text.strip():
             return self._default_result("Blank input")
+        key = self.cache_key(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
         try:
-            results = self.pipeline(text)
-            # Unwrap if results is a list of lists
-            if isinstance(results, list) and len(results) > 0 and isinstance(results[0], list):
-                results = results[0]
-            if (isinstance(results, list) and len(results) > 0 
-                and isinstance(results[0], dict) and 'label' in results[0] and 'score' in results[0]):
-                sorted_emotions = sorted(results, key=lambda x: x['score'], reverse=True)
-                dominant = sorted_emotions[0]
-                emotion_name = dominant['label'].lower()
-                confidence = float(dominant['score'])
-                emotion_scores = {e['label'].lower(): float(e['score']) for e in results if 'label' in e and 'score' in e}
-                top_3 = [
-                    {
-                        'emotion': e['label'].lower(),
-                        'score': float(e['score']),
-                        'emoji': EMOTION_EMOJIS.get(e['label'].lower(), '😐')
-                    }
-                    for e in sorted_emotions[:3]
-                ]
-                return {
-                    'dominant_emotion': emotion_name,
-                    'confidence': confidence,
-                    'emoji': EMOTION_EMOJIS.get(emotion_name, '😐'),
-                    'all_emotions': emotion_scores,
-                    'top_3_emotions': top_3
-                }
-            return self._default_result("No valid results")
+            result = self._format_result(self.pipeline(text))
+            self.cache.set(key, result)
+            return result
         except Exception as e:
             print(f"❌ Error in emotion detection: {e}")
             return self._default_result(str(e))
 
+    def detect_emotions_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Detect emotions for many texts in batched forward passes, keeping input order"""
+        if not self.pipeline:
+            return [self._default_result("Pipeline missing") for _ in texts]
+        batch_size = batch_size or Config.BATCH_SIZE
+        results = [self._default_result("Blank input") for _ in texts]
+        keys = {i: self.cache_key(text) for i, text in enumerate(texts) if text.strip()}
+        pending: Dict[str, List[int]] = {}
+        for i, key in keys.items():
+            cached = self.cache.get(key) if key not in pending else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                # Repeated texts within the batch are inferred once
+                pending.setdefault(key, []).append(i)
+        order = sorted(pending, key=lambda key: len(texts[pending[key][0]]))
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            try:
+                outputs = self.pipeline([texts[pending[key][0]] for key in chunk], batch_size=len(chunk))
+            except Exception as e:
+                print(f"❌ Error in batched emotion detection: {e}")
+                continue
+            formatted = {key: self._format_result(output) for key, output in zip(chunk, outputs)}
+            for key, result in formatted.items():
+                for i in pending[key]:
+                    results[i] = result
+            self.cache.set_many(formatted)
+        return results
+
+    def cache_key(self, text: str) -> str:
+        return InferenceCache.make_key(self.model_name, f"{self.revision}/{self.backend}", text)
+
+    def _format_result(self, results) -> Dict[str, Any]:
+        # Unwrap if results is a list of lists
+        if isinstance(results, list) and len(results) > 0 and isinstance(results[0], list):
+            results = results[0]
+        if (isinstance(results, list) and len(results) > 0 
+            and isinstance(results[0], dict) and 'label' in results[0] and 'score' in results[0]):
+            sorted_emotions = sorted(results, key=lambda x: x['score'], reverse=True)
+            dominant = sorted_emotions[0]
+            emotion_name = dominant['label'].lower()
+            confidence = float(dominant['score'])
+            emotion_scores = {e['label'].lower(): float(e['score']) for e in results if 'label' in e and 'score' in e}
+            top_3 = [
+                {
+                    'emotion': e['label'].lower(),
+                    'score': float(e['score']),
+                    'emoji': EMOTION_EMOJIS.get(e['label'].lower(), '😐')
+                }
+                for e in sorted_emotions[:3]
+            ]
+            return {
+                'dominant_emotion': emotion_name,
+                'confidence': confidence,
+                'emoji': EMOTION_EMOJIS.get(emotion_name, '😐'),
+                'all_emotions': emotion_scores,
+                'top_3_emotions': top_3
+            }
+        return self._default_result("No valid results")
+
     def _default_result(self, msg=""):
         return {
             'dominant_emotion': 'neutral',
@@ -0,0 +1,78 @@
+import gc
+import math
+import multiprocessing
+import os
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+import torch
+from app.config import Config
+
+# Set in the parent right before forking; workers inherit the loaded models copy-on-write
+_worker_analyzer = None
+
+def _init_worker(threads: int) -> None:
+    torch.set_num_threads(threads)
+
+def _infer_chunk(texts: List[str], batch_size: int) -> Tuple[List[Tuple[Optional[Dict], Optional[Dict]]], List[tuple]]:
+    records = []
+    outputs = _worker_analyzer.infer(texts, batch_size, record=lambda *args: records.append(args))
+    return outputs, records
+
+class InferencePool:
+    """Forked worker processes that run TextAnalyzer.infer on chunks of uncached texts"""
+
+    def __init__(self, analyzer, workers: int, threads_per_worker: Optional[int] = None):
+        global _worker_analyzer
+        self.analyzer = analyzer
+        self.workers = workers
+        self.threads_per_worker = (threads_per_worker or Config.INFERENCE_THREADS_PER_WORKER
+                                   or max(1, (os.cpu_count() or 1) // workers))
+        self.timeout = Config.INFERENCE_TIMEOUT
+        # Callers skip the service's inference lock when a pool exists, so the in-process fallback takes its own
+        self._fallback_lock = threading.Lock()
+
+        if threading.current_thread() is not threading.main_thread() or threading.active_count() > 1:
+            raise ValueError("inference workers must be forked from the main thread before other threads start")
+        context = multiprocessing.get_context('fork')  # ValueError where fork is unavailable
+        _worker_analyzer = analyzer
+        # Objects that exist now never get their GC headers written in the workers, so their pages stay shared
+        gc.freeze()
+        try:
+            self._pool = context.Pool(workers, initializer=_init_worker, initargs=(self.threads_per_worker,))
+        finally:
+            # The workers are forked by now; the parent goes back to collecting everything
+            gc.unfreeze()
+
+    def infer(self, texts: List[str], batch_size: int) -> List[Tuple[Optional[Dict], Optional[Dict]]]:
+        """Same contract as TextAnalyzer.infer; safe to call from several threads at once"""
+        if not texts:
+            return []
+
+        # Length-sorted chunks keep padding low; several chunks per worker keep the workers evenly loaded
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        chunk_size = max(batch_size, min(batch_size * 4, math.ceil(len(texts) / self.workers)))
+        chunks = [order[start:start + chunk_size] for start in range(0, len(order), chunk_size)]
+
+        try:
+            chunk_results = self._pool.starmap_async(
+                _infer_chunk, [([texts[i] for i in chunk], batch_size) for chunk in chunks], chunksize=1
+            ).get(self.timeout)
+        except Exception as e:
+            print(f"❌ Error in inference workers, running in-process: {e}")
+            with self._fallback_lock:
+                return self.analyzer.infer(texts, batch_size)
+
+        outputs: List[Tuple[Optional[Dict], Optional[Dict]]] = [(None, None)] * len(texts)
+        for chunk, (chunk_outputs, records) in zip(chunks, chunk_results):
+            for i, output in zip(chunk, chunk_outputs):
+                outputs[i] = output
+            for record in records:
+                self.analyzer.scheduler.record(*record)
+        return outputs
+
+    def stats(self) -> Dict[str, Any]:
+        return {'workers': self.workers, 'threads_per_worker': self.threads_per_worker}
+
+    def close(self) -> None:
+        self._pool.terminate()
+        self._pool.join()
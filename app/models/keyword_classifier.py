@@ -0,0 +1,75 @@
+import json
+import re
+from typing import Dict, List, Iterable, Optional
+
+class KeywordClassifier:
+    """Scores every keyword category in a single regex pass over a text"""
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        # Category order is the tie-break order: on equal scores the earlier category wins
+        self.categories = list(categories)
+        self.keyword_categories: Dict[str, List[int]] = {}
+        for index, keywords in enumerate(categories.values()):
+            for keyword in keywords:
+                owners = self.keyword_categories.setdefault(keyword.lower().strip(), [])
+                if index not in owners:
+                    owners.append(index)
+        self.keyword_categories.pop('', None)
+        self.pattern = self._compile(self.keyword_categories)
+
+    @staticmethod
+    def _compile(keywords: Iterable[str]) -> Optional[re.Pattern]:
+        if not keywords:
+            return None
+        # Longest first so phrases win over their prefixes; whole-word matches only, so
+        # "can" no longer fires on "scanner". Each keyword only gets a boundary on an end that is a word
+        # character, so emoji keywords still match when they touch a word ("hi😂").
+        alternation = '|'.join(
+            KeywordClassifier._bounded(keyword) for keyword in sorted(keywords, key=len, reverse=True)
+        )
+        return re.compile(rf'(?=({alternation}))')
+
+    @staticmethod
+    def _bounded(keyword: str) -> str:
+        before = r'(?<!\w)' if re.match(r'\w', keyword[0]) else ''
+        after = r'(?!\w)' if re.match(r'\w', keyword[-1]) else ''
+        return f"{before}{re.escape(keyword)}{after}"
+
+    def matches(self, text: str) -> set:
+        """Distinct keywords present in the text"""
+        if self.pattern is None or not text:
+            return set()
+        return set(self.pattern.findall(text.lower()))
+
+    def scores(self, text: str) -> List[int]:
+        """Number of distinct keywords of each category found in the text"""
+        scores = [0] * len(self.categories)
+        for keyword in self.matches(text):
+            for index in self.keyword_categories[keyword]:
+                scores[index] += 1
+        return scores
+
+    def classify(self, text: str, default: str = 'general') -> str:
+        """Highest-scoring category, or `default` when no keyword matches"""
+        scores = self.scores(text)
+        best_score = max(scores, default=0)
+        if best_score == 0:
+            return default
+        return self.categories[scores.index(best_score)]
+
+def load_keyword_pack(path: str) -> Dict[str, List[str]]:
+    """Read a {category: [keywords]} JSON keyword pack"""
+    with open(path, encoding='utf-8') as f:
+        pack = json.load(f)
+    if not isinstance(pack, dict):
+        raise ValueError(f"Keyword pack {path} must map category names to keyword lists")
+    return {str(category): [str(keyword) for keyword in keywords] for category, keywords in pack.items()}
+
+def merge_keyword_packs(base: Dict[str, List[str]], *packs: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Extend existing categories and append new ones after the built-in categories"""
+    merged = {category: list(keywords) for category, keywords in base.items()}
+    for pack in packs:
+        for category, keywords in pack.items():
+            existing = merged.setdefault(category, [])
+            existing.extend(keyword for keyword in keywords if keyword not in existing)
+    return merged
@@ -0,0 +1,117 @@
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+from app.config import Config
+from app.utils.metrics import span
+
+WARM_UP_TEXTS = ["Warming up the models.", "Thanks for waiting, this should be quick!"]
+
+class ModelRegistry:
+    """Single owner of the heavy model objects; each is imported and built on first use, once per process"""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {
+            'sentiment': self._load_sentiment,
+            'emotion': self._load_emotion,
+            'text_analyzer': self._load_text_analyzer,
+            'theme_analyzer': self._load_theme_analyzer
+        }
+        self._instances: Dict[str, Any] = {}
+        self._locks = {name: threading.Lock() for name in self._factories}
+        self._status = {name: {'state': 'idle', 'seconds': None, 'error': None} for name in self._factories}
+        self._warm_up = {'state': 'idle', 'first_inference_seconds': None}
+        self._warm_up_thread: Optional[threading.Thread] = None
+        self._warm_up_lock = threading.Lock()
+
+    def get(self, name: str) -> Any:
+        """Build the component on first use; concurrent callers wait for the same load"""
+        if name in self._instances:
+            return self._instances[name]
+        with self._locks[name]:
+            if name not in self._instances:
+                status = self._status[name]
+                status['state'] = 'loading'
+                started = time.perf_counter()
+                try:
+                    with span(f"model_load.{name}"):
+                        self._instances[name] = self._factories[name]()
+                except Exception as e:
+                    status.update(state='failed', error=str(e))
+                    raise
+                status.update(state='ready', seconds=round(time.perf_counter() - started, 3))
+        return self._instances[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def warm_up(self, background: bool = True) -> None:
+        """Load the models and run one inference, in a daemon thread unless background=False"""
+        with self._warm_up_lock:
+            if self._warm_up_thread is None:
+                self._warm_up_thread = threading.Thread(target=self._run_warm_up, name="model-warm-up", daemon=True)
+                self._warm_up_thread.start()
+        if not background:
+            self._warm_up_thread.join()
+
+    def start_pool(self) -> bool:
+        """Load the models and fork INFERENCE_WORKERS workers; call from the main thread before any other thread starts"""
+        if Config.INFERENCE_WORKERS < 1:
+            return False
+        # A fork copies only the calling thread, so locks held by any other thread would stay locked in the workers
+        if threading.current_thread() is not threading.main_thread() or threading.active_count() > 1:
+            print("❌ Error starting inference workers: other threads are running, inferring in-process")
+            return False
+        return self.get('text_analyzer').start_pool()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'ready': self._warm_up['state'] == 'ready',
+            'warm_up': dict(self._warm_up),
+            'models': {name: dict(status) for name, status in self._status.items()}
+        }
+
+    def _run_warm_up(self) -> None:
+        self._warm_up['state'] = 'loading'
+        try:
+            text_analyzer = self.get('text_analyzer')
+            # Straight through the models (or the workers), so nothing lands in the inference cache
+            started = time.perf_counter()
+            if text_analyzer.pool is not None:
+                text_analyzer.pool.infer(WARM_UP_TEXTS, len(WARM_UP_TEXTS))
+            else:
+                text_analyzer.infer(WARM_UP_TEXTS)
+            self._warm_up['first_inference_seconds'] = round(time.perf_counter() - started, 3)
+            text_analyzer.scheduler.reset_stats()
+            self.get('theme_analyzer')
+            self._warm_up['state'] = 'ready'
+        except Exception as e:
+            print(f"❌ Error warming up models: {e}")
+            self._warm_up['state'] = 'failed'
+
+    def _load_sentiment(self):
+        from app.models.sentiment_model import SentimentAnalyzer
+        return SentimentAnalyzer()
+
+    def _load_emotion(self):
+        from app.models.emotion_detector import EmotionDetector
+        return EmotionDetector()
+
+    def _load_text_analyzer(self):
+        sentiment_analyzer, emotion_detector = self.get('sentiment'), self.get('emotion')
+        from app.models.text_analyzer import TextAnalyzer
+        return TextAnalyzer(sentiment_analyzer, emotion_detector)
+
+    def _load_theme_analyzer(self):
+        from app.models.theme_analyzer import ThemeAnalyzer
+        return ThemeAnalyzer()
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide registry shared by the UI, the API server and the CLIs"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
@@ -1,16 +1,23 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
+from transformers import pipeline
 import torch
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from app.config import Config
+from app.models.backends import load_sequence_classifier, resolve_backend
+from app.utils.cache import InferenceCache, get_inference_cache
 from app.utils.constants import SENTIMENT_EMOJIS
 
 class SentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, cache: Optional[InferenceCache] = None):
         self.model_name = Config.SENTIMENT_MODEL
-        self.device = 0 if torch.cuda.is_available() else -1
+        self.revision = Config.SENTIMENT_MODEL_REVISION
+        self.cache = cache or get_inference_cache()
+        self.backend = resolve_backend()
+        # ONNX Runtime and int8 dynamic quantization target CPU inference
+        self.device = 0 if torch.cuda.is_available() and self.backend == 'torch' else -1
         try:
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+            self.tokenizer, self.model, self.backend = load_sequence_classifier(
+                self.model_name, self.revision, self.backend
+            )
             self.pipeline = pipeline(
                 "sentiment-analysis",
                 model=self.model,
@@ -22,11 +29,14 @@ class SentimentAnalyzer:
             )
         except Exception as e:
             print(f"❌ Error loading sentiment model: {e}")
+            self.tokenizer = None
+            self.model = None
             self.pipeline = None
 
         self.label_mapping = {
             'LABEL_0': 'NEGATIVE', 'LABEL_1': 'NEUTRAL', 'LABEL_2': 'POSITIVE',
-            'NEGATIVE': 'NEGATIVE', 'NEUTRAL': 'NEUTRAL', 'POSITIVE': 'POSITIVE'
+            'NEGATIVE': 'NEGATIVE', 'NEUTRAL': 'NEUTRAL', 'POSITIVE': 'POSITIVE',
+            'negative': 'NEGATIVE', 'neutral': 'NEUTRAL', 'positive': 'POSITIVE'
         }
 
     def analyze(self, text: str) -> Dict[str, Any]:
@@ -34,33 +44,75 @@ class SentimentAnalyzer:
             return self._default_result("Pipeline missing")
         if not text.strip():
             return self._default_result("Blank input")
+        key = self.cache_key(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
         try:
-            results = self.pipeline(text)
-            # UNWRAP if nested [[...]]
-            if isinstance(results, list) and len(results) > 0 and isinstance(results[0], list):
-                results = results[0]
-            if (isinstance(results, list) and len(results) > 0 
-                and isinstance(results[0], dict) and 'label' in results[0] and 'score' in results[0]):
-                sorted_results = sorted(results, key=lambda x: x['score'], reverse=True)
-                top_result = sorted_results[0]
-                sentiment_raw = top_result['label']
-                sentiment = self.label_mapping.get(sentiment_raw, sentiment_raw)
-                confidence = float(top_result['score'])
-                score_map = {self.label_mapping.get(r['label'], r['label']): float(r['score']) for r in results if 'label' in r and 'score' in r}
-                polarity = self._calculate_polarity(score_map)
-                emoji = SENTIMENT_EMOJIS.get(sentiment, '😐')
-                return {
-                    'sentiment': sentiment,
-                    'confidence': round(confidence, 3),
-                    'emoji': emoji,
-                    'all_scores': score_map,
-                    'polarity': round(polarity, 3)
-                }
-            return self._default_result("No valid results")
+            result = self._format_result(self.pipeline(text))
+            self.cache.set(key, result)
+            return result
         except Exception as e:
             print(f"❌ Error in sentiment analysis: {e}")
             return self._default_result(str(e))
 
+    def analyze_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Analyze many texts in batched forward passes, keeping input order"""
+        if not self.pipeline:
+            return [self._default_result("Pipeline missing") for _ in texts]
+        batch_size = batch_size or Config.BATCH_SIZE
+        results = [self._default_result("Blank input") for _ in texts]
+        keys = {i: self.cache_key(text) for i, text in enumerate(texts) if text.strip()}
+        pending: Dict[str, List[int]] = {}
+        for i, key in keys.items():
+            cached = self.cache.get(key) if key not in pending else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                # Repeated texts within the batch are inferred once
+                pending.setdefault(key, []).append(i)
+        # Sorting by length keeps similarly sized texts together so padding stays low
+        order = sorted(pending, key=lambda key: len(texts[pending[key][0]]))
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            try:
+                outputs = self.pipeline([texts[pending[key][0]] for key in chunk], batch_size=len(chunk))
+            except Exception as e:
+                print(f"❌ Error in batched sentiment analysis: {e}")
+                continue
+            formatted = {key: self._format_result(output) for key, output in zip(chunk, outputs)}
+            for key, result in formatted.items():
+                for i in pending[key]:
+                    results[i] = result
+            self.cache.set_many(formatted)
+        return results
+
+    def cache_key(self, text: str) -> str:
+        return InferenceCache.make_key(self.model_name, f"{self.revision}/{self.backend}", text)
+
+    def _format_result(self, results) -> Dict[str, Any]:
+        # UNWRAP if nested [[...]]
+        if isinstance(results, list) and len(results) > 0 and isinstance(results[0], list):
+            results = results[0]
+        if (isinstance(results, list) and len(results) > 0 
+            and isinstance(results[0], dict) and 'label' in results[0] and 'score' in results[0]):
+            sorted_results = sorted(results, key=lambda x: x['score'], reverse=True)
+            top_result = sorted_results[0]
+            sentiment_raw = top_result['label']
+            sentiment = self.label_mapping.get(sentiment_raw, sentiment_raw)
+            confidence = float(top_result['score'])
+            score_map = {self.label_mapping.get(r['label'], r['label']): float(r['score']) for r in results if 'label' in r and 'score' in r}
+            polarity = self._calculate_polarity(score_map)
+            emoji = SENTIMENT_EMOJIS.get(sentiment, '😐')
+            return {
+                'sentiment': sentiment,
+                'confidence': round(confidence, 3),
+                'emoji': emoji,
+                'all_scores': score_map,
+                'polarity': round(polarity, 3)
+            }
+        return self._default_result("No valid results")
+
     def _calculate_polarity(self, scores: Dict[str, float]) -> float:
         pos_score = scores.get('POSITIVE', 0.0)
         neg_score = scores.get('NEGATIVE', 0.0)
@@ -0,0 +1,220 @@
+import time
+import torch
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from app.config import Config
+from app.models.bucketing import LengthBucketScheduler
+from app.models.sentiment_model import SentimentAnalyzer
+from app.models.emotion_detector import EmotionDetector
+from app.utils.helpers import clean_text
+from app.utils.metrics import metrics, span, timed
+
+class TextAnalyzer:
+    """Runs sentiment and emotion detection over one shared, pre-tokenized batch"""
+
+    def __init__(self, sentiment_analyzer: Optional[SentimentAnalyzer] = None,
+                 emotion_detector: Optional[EmotionDetector] = None):
+        self.sentiment_analyzer = sentiment_analyzer or SentimentAnalyzer()
+        self.emotion_detector = emotion_detector or EmotionDetector()
+        self.max_length = getattr(Config, "MAX_LENGTH", 128)
+        self.shared_tokenizer = self._tokenizers_compatible()
+        self.scheduler = LengthBucketScheduler(max_length=self.max_length)
+        self.pool = None
+
+    def _tokenizers_compatible(self) -> bool:
+        """Both models are RoBERTa-family, so one encoding can feed both when the vocabularies match"""
+        sentiment_tokenizer = getattr(self.sentiment_analyzer, 'tokenizer', None)
+        emotion_tokenizer = getattr(self.emotion_detector, 'tokenizer', None)
+        if sentiment_tokenizer is None or emotion_tokenizer is None:
+            return False
+        try:
+            return sentiment_tokenizer.get_vocab() == emotion_tokenizer.get_vocab()
+        except Exception:
+            return False
+
+    def analyze(self, text: str, clean: bool = True) -> Dict[str, Any]:
+        """Analyze a single text for sentiment and emotion"""
+        return self.analyze_batch([text], clean=clean)[0]
+
+    @timed('inference')
+    def analyze_batch(self, texts: List[str], batch_size: Optional[int] = None,
+                      clean: bool = True) -> List[Dict[str, Any]]:
+        """Clean, tokenize and run both models once per length bucket batch, keeping input order"""
+        batch_size = batch_size or Config.BATCH_SIZE
+        cleaned_texts = [clean_text(text) for text in texts] if clean else list(texts)
+        results = [
+            {
+                'cleaned_text': cleaned,
+                'sentiment': self.sentiment_analyzer._default_result("Blank input"),
+                'emotion': self.emotion_detector._default_result("Blank input")
+            }
+            for cleaned in cleaned_texts
+        ]
+
+        # Look up both models in the cache; only texts missing a result are encoded
+        pending: Dict[str, List[int]] = {}
+        cache_hits = 0
+        with span('inference.cache_lookup'):
+            for i, text in enumerate(cleaned_texts):
+                if not text.strip():
+                    continue
+                sentiment_key = self.sentiment_analyzer.cache_key(text)
+                if sentiment_key in pending:
+                    pending[sentiment_key].append(i)
+                    continue
+                sentiment_cached = self.sentiment_analyzer.cache.get(sentiment_key)
+                emotion_cached = self.emotion_detector.cache.get(self.emotion_detector.cache_key(text))
+                if sentiment_cached is not None and emotion_cached is not None:
+                    results[i]['sentiment'] = sentiment_cached
+                    results[i]['emotion'] = emotion_cached
+                    cache_hits += 1
+                else:
+                    pending[sentiment_key] = [i]
+        metrics.increment('texts_analyzed_total', len(texts))
+        metrics.increment('inference_cache_hits_total', cache_hits)
+        metrics.increment('inference_cache_misses_total', len(pending))
+
+        if not pending:
+            return results
+
+        # Model work goes to the worker pool when one is running, otherwise runs here
+        pending_keys = list(pending)
+        pending_texts = [cleaned_texts[pending[key][0]] for key in pending_keys]
+        if self.pool is not None:
+            with span('inference.workers'):
+                outputs = self.pool.infer(pending_texts, batch_size)
+        else:
+            outputs = self.infer(pending_texts, batch_size)
+
+        sentiment_cache_items = {}
+        emotion_cache_items = {}
+        for key, text, (sentiment, emotion) in zip(pending_keys, pending_texts, outputs):
+            if sentiment is not None:
+                sentiment_cache_items[key] = sentiment
+                for i in pending[key]:
+                    results[i]['sentiment'] = sentiment
+            if emotion is not None:
+                emotion_cache_items[self.emotion_detector.cache_key(text)] = emotion
+                for i in pending[key]:
+                    results[i]['emotion'] = emotion
+        self.sentiment_analyzer.cache.set_many(sentiment_cache_items)
+        self.emotion_detector.cache.set_many(emotion_cache_items)
+
+        return results
+
+    def infer(self, texts: List[str], batch_size: Optional[int] = None,
+              record: Optional[Callable[..., None]] = None) -> List[Tuple[Optional[Dict], Optional[Dict]]]:
+        """Formatted (sentiment, emotion) per cleaned text, without touching the cache; None where a batch failed"""
+        batch_size = batch_size or Config.BATCH_SIZE
+        record = record or self.scheduler.record
+        outputs: List[Tuple[Optional[Dict], Optional[Dict]]] = [(None, None)] * len(texts)
+        tokenizer = self._primary_tokenizer()
+        if tokenizer is None or not texts:
+            return outputs
+
+        # Tokenize once without padding; each bucket is padded only to its own longest text
+        try:
+            with span('inference.tokenize'):
+                input_ids = tokenizer(texts, truncation=True, max_length=self.max_length)['input_ids']
+        except Exception as e:
+            print(f"❌ Error tokenizing texts: {e}")
+            return outputs
+        lengths = [len(ids) for ids in input_ids]
+
+        for edge, positions in self.scheduler.schedule(lengths, batch_size):
+            started = time.perf_counter()
+            batch_texts = [texts[position] for position in positions]
+            with span('inference.tokenize'):
+                encoded = self._pad([input_ids[position] for position in positions], tokenizer.pad_token_id)
+            try:
+                sentiment_outputs, emotion_outputs = self._run_models(batch_texts, encoded)
+            except Exception as e:
+                print(f"❌ Error in combined text analysis: {e}")
+                continue
+            record(
+                edge, [lengths[position] for position in positions],
+                encoded['input_ids'].shape[1], time.perf_counter() - started
+            )
+
+            for batch_position, position in enumerate(positions):
+                outputs[position] = (
+                    self.sentiment_analyzer._format_result(sentiment_outputs[batch_position])
+                    if sentiment_outputs is not None else None,
+                    self.emotion_detector._format_result(emotion_outputs[batch_position])
+                    if emotion_outputs is not None else None
+                )
+
+        return outputs
+
+    def start_pool(self, workers: Optional[int] = None, threads_per_worker: Optional[int] = None) -> bool:
+        """Fork inference worker processes that share the loaded weights; returns whether a pool is running"""
+        workers = Config.INFERENCE_WORKERS if workers is None else workers
+        if self.pool is not None or workers < 1 or self._primary_tokenizer() is None:
+            return self.pool is not None
+        from app.models.inference_pool import InferencePool
+        try:
+            self.pool = InferencePool(self, workers, threads_per_worker)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error starting inference workers, running in-process: {e}")
+        return self.pool is not None
+
+    def bucket_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-bucket throughput stats for tuning LENGTH_BUCKETS"""
+        return self.scheduler.stats()
+
+    def _primary_tokenizer(self):
+        if getattr(self.sentiment_analyzer, 'model', None) is not None:
+            return self.sentiment_analyzer.tokenizer
+        if getattr(self.emotion_detector, 'model', None) is not None:
+            return self.emotion_detector.tokenizer
+        return None
+
+    def _run_models(self, batch_texts: List[str], encoded: Dict[str, Any]):
+        """Score one pre-tokenized batch with both classification heads"""
+        sentiment_model = getattr(self.sentiment_analyzer, 'model', None)
+        emotion_model = getattr(self.emotion_detector, 'model', None)
+
+        sentiment_outputs = None
+        emotion_outputs = None
+
+        if sentiment_model is not None:
+            with span('inference.sentiment'):
+                sentiment_outputs = self._predict(sentiment_model, encoded)
+
+        if emotion_model is not None:
+            with span('inference.emotion'):
+                if sentiment_model is not None and not self.shared_tokenizer:
+                    encoded = self._encode(self.emotion_detector.tokenizer, batch_texts)
+                emotion_outputs = self._predict(emotion_model, encoded)
+
+        return sentiment_outputs, emotion_outputs
+
+    def _pad(self, batch_ids: List[List[int]], pad_token_id: Optional[int]) -> Dict[str, Any]:
+        width = max(len(ids) for ids in batch_ids)
+        input_ids = torch.full((len(batch_ids), width), pad_token_id or 0, dtype=torch.long)
+        attention_mask = torch.zeros((len(batch_ids), width), dtype=torch.long)
+        for row, ids in enumerate(batch_ids):
+            input_ids[row, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+            attention_mask[row, :len(ids)] = 1
+        return {'input_ids': input_ids, 'attention_mask': attention_mask}
+
+    def _encode(self, tokenizer, batch_texts: List[str]) -> Dict[str, Any]:
+        return tokenizer(
+            batch_texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="pt"
+        )
+
+    def _predict(self, model, encoded) -> List[List[Dict[str, Any]]]:
+        """Run a forward pass and shape the output like the transformers pipeline does"""
+        inputs = {key: value.to(model.device) for key, value in encoded.items()
+                  if key in ('input_ids', 'attention_mask')}
+        with torch.no_grad():
+            logits = model(**inputs).logits
+        probabilities = torch.softmax(torch.as_tensor(logits), dim=-1).cpu().tolist()
+        id2label = model.config.id2label
+        return [
+            [{'label': id2label[j], 'score': score} for j, score in enumerate(row)]
+            for row in probabilities
+        ]
@@ -1,16 +1,84 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer, CountVectorizer
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from scipy.cluster.hierarchy import linkage, fcluster
+from scipy.sparse import csr_matrix
+from scipy.spatial.distance import squareform
+import hashlib
 import numpy as np
-from collections import Counter
-from typing import Dict, List, Any
+from collections import Counter, OrderedDict
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Union
+from app.config import Config
+from app.models.comment_store import CommentView
+from app.models.embedder import SentenceEmbedder, get_sentence_embedder
+from app.models.keyword_classifier import KeywordClassifier, load_keyword_pack, merge_keyword_packs
 from app.utils.constants import THEME_CATEGORIES
 from app.utils.helpers import clean_text
+from app.utils.metrics import span
+
+class ThemeStream:
+    """Online theme model for one growing comment stream"""
+    
+    def __init__(self, n_clusters: int, n_features: int):
+        self.n_clusters = n_clusters
+        # Hashing needs no fitted vocabulary, so new comments vectorize in the same space as old ones
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            stop_words='english',
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm='l2'
+        )
+        self.analyzer = self.vectorizer.build_analyzer()
+        self.term_hasher = FeatureHasher(n_features=n_features, input_type='string', alternate_sign=False)
+        self.kmeans = MiniBatchKMeans(
+            n_clusters=n_clusters,
+            random_state=42,
+            n_init=3,
+            reassignment_ratio=0.0  # keep theme ids stable between updates
+        )
+        self.assignments: Dict[str, int] = {}
+        self.terms: Dict[int, str] = {}  # hashed column -> first term seen in it, for keywords
+        self.known_terms = set()
+        self.fitted = False
+    
+    def can_update(self, new_count: int) -> bool:
+        # The first partial_fit needs at least one sample per centroid
+        return self.fitted or new_count >= self.n_clusters
+    
+    def update(self, keys: List[str], texts: List[str], weights: Optional[np.ndarray] = None) -> None:
+        """Fold unseen comments into the centroids and assign them to a theme"""
+        matrix = self.vectorizer.transform(texts)
+        self.kmeans.partial_fit(matrix, sample_weight=weights)
+        self.fitted = True
+        for key, cluster_id in zip(keys, self.kmeans.predict(matrix)):
+            self.assignments[key] = int(cluster_id)
+        self._remember_terms(texts)
+    
+    def keywords(self, cluster_id: int, top_n: int = 5) -> List[str]:
+        center = self.kmeans.cluster_centers_[cluster_id]
+        top_indices = center.argsort()[::-1][:top_n * 2]
+        keywords = [self.terms[idx] for idx in top_indices if center[idx] > 0 and idx in self.terms]
+        return keywords[:top_n]
+    
+    def _remember_terms(self, texts: List[str]) -> None:
+        new_terms = list({term for text in texts for term in self.analyzer(text)} - self.known_terms)
+        if not new_terms:
+            return
+        columns = self.term_hasher.transform([[term] for term in new_terms]).indices
+        self.known_terms.update(new_terms)
+        for term, column in zip(new_terms, columns):
+            self.terms.setdefault(int(column), term)
 
 class ThemeAnalyzer:
-    def __init__(self):
+    def __init__(self, mode: Optional[str] = None, engine: Optional[str] = None,
+                 embedder: Optional[SentenceEmbedder] = None, keyword_packs: Optional[List[str]] = None):
         self.vectorizer = None
         self.kmeans = None
+        self.mode = mode or Config.THEME_MODE
+        self.engine = engine or Config.THEME_ENGINE
+        self.embedder = embedder or get_sentence_embedder()
+        self.streams: OrderedDict[str, ThemeStream] = OrderedDict()
         self.theme_keywords = {
             'support': ['great', 'amazing', 'awesome', 'love', 'perfect', 'excellent', 'fantastic', 'wonderful'],
             'criticism': ['bad', 'terrible', 'awful', 'hate', 'worst', 'horrible', 'disgusting', 'stupid'],
@@ -22,31 +90,61 @@ class ThemeAnalyzer:
             'debate': ['disagree', 'wrong', 'argue', 'debate', 'opinion', 'think', 'believe'],
             'suggestion': ['should', 'could', 'suggest', 'recommend', 'idea', 'proposal', 'maybe']
         }
+        self.theme_keywords = merge_keyword_packs(self.theme_keywords, *self._load_keyword_packs(keyword_packs))
+        self.keyword_classifier = KeywordClassifier(self.theme_keywords)
+        self.sentiment_classifier = KeywordClassifier({
+            'positive': ['good', 'great', 'love', 'amazing', 'perfect', 'excellent'],
+            'negative': ['bad', 'hate', 'terrible', 'awful', 'worst', 'horrible']
+        })
     
-    def analyze_themes(self, comments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_themes(self, comments: Union[CommentView, List[Dict[str, Any]]],
+                       stream_key: Optional[str] = None) -> Dict[str, Any]:
         """Group comments by themes using clustering and keyword analysis"""
+        # In incremental mode comments already seen for stream_key keep their theme and only new ones are clustered.
+        # For a CommentView, each theme's 'comments' is an index view into the same store rather than a copy.
         if not comments or len(comments) < 2:
             return self._create_single_theme(comments)
         
         # Prepare texts
-        texts = []
-        valid_comments = []
+        if isinstance(comments, CommentView):
+            candidates = comments.cleaned_texts  # already cleaned by DataProcessor
+        else:
+            candidates = (clean_text(comment.get('body', '') or comment.get('text', '')) for comment in comments)
         
-        for comment in comments:
-            text = comment.get('body', '') or comment.get('text', '')
-            cleaned_text = clean_text(text)
-            
+        texts = []
+        positions = []
+        for position, cleaned_text in enumerate(candidates):
             if len(cleaned_text.split()) >= 3:  # Filter very short comments
                 texts.append(cleaned_text)
-                valid_comments.append(comment)
+                positions.append(position)
         
+        valid_comments = self._take(comments, positions)
+        # Near-duplicates are clustered once, weighted by group size; members share their representative's theme
+        unique, members = self._collapse_duplicates(valid_comments)
+        texts = [texts[position] for position in unique]
+        weights = np.array([len(group) for group in members], dtype=np.float64)
         if len(texts) < 2:
             return self._create_single_theme(valid_comments)
         
         try:
-            # Use both clustering and keyword-based classification
-            clustered_themes = self._cluster_comments(texts, valid_comments)
-            keyword_themes = self._classify_by_keywords(texts, valid_comments)
+            # Use both clustering and keyword-based classification; themes hold positions in texts
+            with span('themes.cluster'):
+                if self.engine == 'embedding':
+                    clustered_themes = self._cluster_comments_embedding(texts, weights)
+                elif self.mode == 'incremental':
+                    comment_ids = self._comment_ids(valid_comments)
+                    clustered_themes = self._cluster_comments_incremental(
+                        texts, [comment_ids[position] for position in unique], stream_key, weights
+                    )
+                else:
+                    clustered_themes = self._cluster_comments(texts, weights)
+            with span('themes.keywords'):
+                keyword_themes = self._classify_by_keywords(texts)
+            
+            for themes in (clustered_themes, keyword_themes):
+                for theme_data in themes.values():
+                    fanned_out = sorted(position for i in theme_data['comments'] for position in members[i])
+                    theme_data['comments'] = self._take(valid_comments, fanned_out)
             
             # Merge and prioritize keyword-based classification
             merged_themes = self._merge_themes(clustered_themes, keyword_themes)
@@ -57,7 +155,27 @@ class ThemeAnalyzer:
             print(f"Error in theme analysis: {str(e)}")
             return self._create_single_theme(valid_comments)
     
-    def _cluster_comments(self, texts: List[str], comments: List[Dict]) -> Dict[str, Any]:
+    def _take(self, comments: Union[CommentView, List[Dict]], positions: Sequence[int]) -> Union[CommentView, List[Dict]]:
+        if isinstance(comments, CommentView):
+            return comments.take(positions)
+        return [comments[position] for position in positions]
+    
+    def _collapse_duplicates(self, comments: Union[CommentView, List[Dict]]) -> Tuple[List[int], List[List[int]]]:
+        """First position of each near-duplicate group and the positions of all its members"""
+        if not isinstance(comments, CommentView):
+            return list(range(len(comments))), [[position] for position in range(len(comments))]
+        groups: Dict[int, List[int]] = {}
+        for position, representative in enumerate(comments.column('duplicate_of').tolist()):
+            groups.setdefault(representative, []).append(position)
+        members = list(groups.values())
+        return [group[0] for group in members], members
+    
+    def _comment_ids(self, comments: Union[CommentView, List[Dict]]) -> List[Optional[str]]:
+        if isinstance(comments, CommentView):
+            return comments.ids.tolist()
+        return [comment.get('id') for comment in comments]
+    
+    def _cluster_comments(self, texts: List[str], weights: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Cluster comments using TF-IDF and K-means"""
         try:
             # TF-IDF Vectorization
@@ -76,7 +194,7 @@ class ThemeAnalyzer:
             
             # K-means clustering
             self.kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-            clusters = self.kmeans.fit_predict(tfidf_matrix)
+            clusters = self.kmeans.fit_predict(tfidf_matrix, sample_weight=weights)
             
             # Group comments by clusters
             themes = {}
@@ -91,12 +209,13 @@ class ThemeAnalyzer:
                         'avg_score': 0
                     }
                 
-                themes[theme_name]['comments'].append(comments[i])
+                themes[theme_name]['comments'].append(i)
             
             # Extract keywords for each theme
             feature_names = self.vectorizer.get_feature_names_out()
-            for i, theme_name in enumerate(themes.keys()):
-                cluster_center = self.kmeans.cluster_centers_[i]
+            for cluster_id in np.unique(clusters):
+                theme_name = f"Theme {cluster_id + 1}"
+                cluster_center = self.kmeans.cluster_centers_[cluster_id]
                 top_indices = cluster_center.argsort()[-5:][::-1]
                 themes[theme_name]['keywords'] = [feature_names[idx] for idx in top_indices]
             
@@ -106,21 +225,173 @@ class ThemeAnalyzer:
             print(f"Error in clustering: {str(e)}")
             return {}
     
-    def _classify_by_keywords(self, texts: List[str], comments: List[Dict]) -> Dict[str, Any]:
+    def _cluster_comments_embedding(self, texts: List[str], weights: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Cluster sentence embeddings agglomeratively, picking the cluster count by silhouette"""
+        try:
+            embeddings = self.embedder.encode(texts)
+            if embeddings is None:
+                return self._cluster_comments(texts, weights)
+            
+            labels = self._auto_cluster(embeddings, weights)
+            keywords = self._cluster_keywords(texts, labels, weights)
+            
+            themes = {}
+            for i, cluster_id in enumerate(labels):
+                theme_name = f"Theme {cluster_id + 1}"
+                
+                if theme_name not in themes:
+                    themes[theme_name] = {
+                        'comments': [],
+                        'keywords': keywords[cluster_id],
+                        'sentiment_summary': {'positive': 0, 'negative': 0, 'neutral': 0},
+                        'avg_score': 0
+                    }
+                
+                themes[theme_name]['comments'].append(i)
+            
+            return themes
+            
+        except Exception as e:
+            print(f"Error in embedding clustering: {str(e)}")
+            return {}
+    
+    def _auto_cluster(self, embeddings: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """Average-linkage cosine tree cut at the k with the best weighted silhouette score"""
+        n = len(embeddings)
+        if n < 3:
+            return np.zeros(n, dtype=int)
+        
+        # The tree is built over representatives; the weights decide where it is cut
+        weights = np.ones(n) if weights is None else np.asarray(weights, dtype=np.float64)
+        # Embeddings are unit length, so one matrix product gives every cosine distance
+        distances = np.clip(1.0 - embeddings @ embeddings.T, 0.0, 2.0)
+        np.fill_diagonal(distances, 0.0)
+        tree = linkage(squareform(distances, checks=False), method='average')
+        
+        best_labels, best_score = np.zeros(n, dtype=int), -1.0
+        for k in range(2, min(Config.THEME_MAX_CLUSTERS, n - 1) + 1):
+            labels = fcluster(tree, k, criterion='maxclust') - 1
+            if len(np.unique(labels)) < 2:
+                continue
+            score = self._weighted_silhouette(distances, labels, weights)
+            if score > best_score:
+                best_labels, best_score = labels, score
+        return best_labels
+    
+    @staticmethod
+    def _weighted_silhouette(distances: np.ndarray, labels: np.ndarray, weights: np.ndarray) -> float:
+        """Mean silhouette as if each representative were repeated `weight` times at distance 0 from itself"""
+        n_clusters = int(labels.max()) + 1
+        membership = np.zeros((len(labels), n_clusters))
+        membership[np.arange(len(labels)), labels] = 1.0
+        cluster_weights = weights @ membership
+        # Weighted sum of distances from every point to each cluster
+        sums = distances @ (membership * weights[:, None])
+        rows = np.arange(len(labels))
+        
+        own_weight = cluster_weights[labels] - 1  # the point's own copies sit at distance 0 but still count
+        a = np.divide(sums[rows, labels], own_weight, out=np.zeros(len(labels)), where=own_weight > 0)
+        other = np.divide(sums, cluster_weights, out=np.full(sums.shape, np.inf), where=cluster_weights > 0)
+        other[rows, labels] = np.inf
+        b = other.min(axis=1)
+        
+        denominator = np.maximum(a, b)
+        scores = np.divide(b - a, denominator, out=np.zeros(len(labels)), where=denominator > 0)
+        scores[own_weight <= 0] = 0.0  # singletons score 0, as in sklearn
+        return float(np.average(scores, weights=weights))
+    
+    def _cluster_keywords(self, texts: List[str], labels: np.ndarray, weights: Optional[np.ndarray] = None,
+                          top_n: int = 5) -> Dict[int, List[str]]:
+        """Class-based TF-IDF: terms frequent in one cluster and rare in the others, duplicates counted by weight"""
+        n_clusters = int(labels.max()) + 1
+        try:
+            vectorizer = CountVectorizer(stop_words='english', ngram_range=(1, 2), max_features=2000)
+            counts = vectorizer.fit_transform(texts)
+        except ValueError:  # only stop words left
+            return {cluster_id: [] for cluster_id in range(n_clusters)}
+        
+        counted = np.ones(len(labels)) if weights is None else np.asarray(weights, dtype=np.float64)
+        membership = csr_matrix((counted, (labels, np.arange(len(labels)))), shape=(n_clusters, len(labels)))
+        class_counts = np.asarray((membership @ counts).todense())
+        tf = class_counts / np.maximum(class_counts.sum(axis=1, keepdims=True), 1)
+        idf = np.log(1 + class_counts.sum() / np.maximum(class_counts.sum(axis=0), 1))
+        weights = tf * idf
+        
+        feature_names = vectorizer.get_feature_names_out()
+        keywords = {}
+        for cluster_id in range(n_clusters):
+            top_indices = weights[cluster_id].argsort()[::-1][:top_n]
+            keywords[cluster_id] = [feature_names[idx] for idx in top_indices if weights[cluster_id, idx] > 0]
+        return keywords
+    
+    def _cluster_comments_incremental(self, texts: List[str], comment_ids: List[Optional[str]],
+                                      stream_key: Optional[str], weights: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Assign comments to online MiniBatchKMeans themes, fitting only comments not seen before"""
+        try:
+            stream = self._get_stream(stream_key)
+            keys = [self._comment_key(comment_id, text) for comment_id, text in zip(comment_ids, texts)]
+            
+            new_keys, new_texts, new_weights = [], [], []
+            pending = set()
+            for i, (key, text) in enumerate(zip(keys, texts)):
+                if key not in stream.assignments and key not in pending:
+                    pending.add(key)
+                    new_keys.append(key)
+                    new_texts.append(text)
+                    new_weights.append(weights[i] if weights is not None else 1.0)
+            
+            if new_texts:
+                if not stream.can_update(len(new_texts)):
+                    # Too few comments to seed the stream yet; the next call sees them again as new
+                    return self._cluster_comments(texts, weights)
+                stream.update(new_keys, new_texts, np.array(new_weights))
+            
+            themes = {}
+            for i, key in enumerate(keys):
+                cluster_id = stream.assignments[key]
+                theme_name = f"Theme {cluster_id + 1}"
+                
+                if theme_name not in themes:
+                    themes[theme_name] = {
+                        'comments': [],
+                        'keywords': stream.keywords(cluster_id),
+                        'sentiment_summary': {'positive': 0, 'negative': 0, 'neutral': 0},
+                        'avg_score': 0
+                    }
+                
+                themes[theme_name]['comments'].append(i)
+            
+            return themes
+            
+        except Exception as e:
+            print(f"Error in incremental clustering: {str(e)}")
+            return {}
+    
+    def _get_stream(self, stream_key: Optional[str]) -> ThemeStream:
+        """Per-stream model, most recently used streams kept in memory"""
+        if stream_key is None:
+            return ThemeStream(Config.THEME_CLUSTERS, Config.THEME_HASH_FEATURES)
+        
+        if stream_key in self.streams:
+            self.streams.move_to_end(stream_key)
+        else:
+            self.streams[stream_key] = ThemeStream(Config.THEME_CLUSTERS, Config.THEME_HASH_FEATURES)
+            while len(self.streams) > Config.THEME_MAX_STREAMS:
+                self.streams.popitem(last=False)
+        return self.streams[stream_key]
+    
+    def _comment_key(self, comment_id: Optional[str], text: str) -> str:
+        if comment_id:
+            return str(comment_id)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+    
+    def _classify_by_keywords(self, texts: List[str]) -> Dict[str, Any]:
         """Classify comments using keyword matching"""
         themes = {}
         
         for i, text in enumerate(texts):
-            text_lower = text.lower()
-            best_theme = 'general'
-            best_score = 0
-            
-            # Check against keyword categories
-            for theme_type, keywords in self.theme_keywords.items():
-                score = sum(1 for keyword in keywords if keyword in text_lower)
-                if score > best_score:
-                    best_score = score
-                    best_theme = theme_type
+            # One pass scores every category; ties go to the earlier category
+            best_theme = self.keyword_classifier.classify(text, default='general')
             
             # Create theme if doesn't exist
             if best_theme not in themes:
@@ -131,7 +402,7 @@ class ThemeAnalyzer:
                     'avg_score': 0
                 }
             
-            themes[best_theme]['comments'].append(comments[i])
+            themes[best_theme]['comments'].append(i)
         
         return themes
     
@@ -154,6 +425,18 @@ class ThemeAnalyzer:
         
         return final_themes
     
+    def _load_keyword_packs(self, paths: Optional[List[str]]) -> List[Dict[str, List[str]]]:
+        """User keyword packs from THEME_KEYWORD_PACKS (comma-separated JSON files)"""
+        if paths is None:
+            paths = [path.strip() for path in Config.THEME_KEYWORD_PACKS.split(',') if path.strip()]
+        packs = []
+        for path in paths:
+            try:
+                packs.append(load_keyword_pack(path))
+            except Exception as e:
+                print(f"❌ Error loading keyword pack {path}: {e}")
+        return packs
+    
     def _get_theme_display_name(self, theme_name: str) -> str:
         """Get display name with emoji for theme"""
         theme_info = THEME_CATEGORIES.get(theme_name, {'emoji': '💬'})
@@ -181,20 +464,19 @@ class ThemeAnalyzer:
             return theme_data
         
         # Calculate average score
-        scores = [comment.get('score', 0) for comment in comments]
-        theme_data['avg_score'] = sum(scores) / len(scores) if scores else 0
+        if isinstance(comments, CommentView):
+            theme_data['avg_score'] = float(comments.scores.mean())
+            texts = comments.texts
+        else:
+            scores = [comment.get('score', 0) for comment in comments]
+            theme_data['avg_score'] = sum(scores) / len(scores) if scores else 0
+            texts = [comment.get('body', '') or comment.get('text', '') for comment in comments]
         
         # Simple sentiment analysis based on keywords
-        positive_words = ['good', 'great', 'love', 'amazing', 'perfect', 'excellent']
-        negative_words = ['bad', 'hate', 'terrible', 'awful', 'worst', 'horrible']
-        
         sentiment_counts = {'positive': 0, 'negative': 0, 'neutral': 0}
         
-        for comment in comments:
-            text = (comment.get('body', '') or comment.get('text', '')).lower()
-            
-            pos_count = sum(1 for word in positive_words if word in text)
-            neg_count = sum(1 for word in negative_words if word in text)
+        for text in texts:
+            pos_count, neg_count = self.sentiment_classifier.scores(text)
             
             if pos_count > neg_count:
                 sentiment_counts['positive'] += 1
@@ -206,7 +488,7 @@ class ThemeAnalyzer:
         theme_data['sentiment_summary'] = sentiment_counts
         return theme_data
     
-    def _create_single_theme(self, comments: List[Dict]) -> Dict[str, Any]:
+    def _create_single_theme(self, comments: Union[CommentView, List[Dict]]) -> Dict[str, Any]:
         """Create a single theme for few comments"""
         return {
             "💬 General Discussion": {
@@ -0,0 +1,92 @@
+import json
+from typing import Dict, Any, List, Optional
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+from app.config import Config
+from app.services.analysis_service import AnalysisService
+from app.utils.helpers import json_default
+from app.utils.metrics import metrics
+
+app = FastAPI(title=f"{Config.APP_NAME} API")
+
+_service: Optional[AnalysisService] = None
+
+class AnalyzeRequest(BaseModel):
+    url: str
+
+class WatchRequest(BaseModel):
+    url: str
+    watcher: str = ''  # one monitor per watcher and thread, so watchers don't split each other's deltas
+
+class BatchAnalyzeRequest(BaseModel):
+    urls: List[str]
+
+class TextAnalyzeRequest(BaseModel):
+    texts: List[str]
+
+def get_service() -> AnalysisService:
+    """One service per server process; its models are shared by every request"""
+    global _service
+    if _service is None:
+        _service = AnalysisService()
+    return _service
+
+def to_jsonable(data: Any) -> Any:
+    # Results carry columnar comment views and numpy scalars from scikit-learn
+    return json.loads(json.dumps(data, default=json_default))
+
+@app.on_event("startup")
+def load_models():
+    service = get_service()
+    # Inference workers fork here, on the main thread before any other thread exists; this loads the models first
+    service.data_processor.registry.start_pool()
+    # Warm up in the background so /health answers while the models load
+    service.warm_up()
+
+@app.get("/health")
+def health() -> Dict[str, Any]:
+    models = get_service().models_status()
+    return {'status': 'ok', 'models_loaded': models['ready'], 'models': models}
+
+@app.get("/stats")
+def stats() -> Dict[str, Any]:
+    return to_jsonable(get_service().stats())
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics() -> str:
+    return metrics.render_prometheus()
+
+@app.post("/analyze")
+def analyze(request: AnalyzeRequest) -> Dict[str, Any]:
+    # An unsupported or malformed URL comes back as fetched=False, exactly like AnalysisService.analyze_url
+    return to_jsonable(get_service().analyze_url(request.url))
+
+@app.post("/analyze/batch")
+def analyze_batch(request: BatchAnalyzeRequest) -> Dict[str, Any]:
+    if len(request.urls) > Config.ANALYSIS_API_MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"At most {Config.ANALYSIS_API_MAX_BATCH} URLs per request")
+
+    results = []
+    report = get_service().analyze_urls(request.urls, on_result=results.append)
+    return to_jsonable({'results': results, 'report': report})
+
+@app.post("/analyze/text")
+def analyze_text(request: TextAnalyzeRequest) -> Dict[str, Any]:
+    if len(request.texts) > Config.ANALYSIS_API_MAX_BATCH * 10:
+        raise HTTPException(status_code=413, detail="Too many texts in one request")
+    return to_jsonable({'results': get_service().analyze_texts(request.texts)})
+
+@app.post("/monitor/poll")
+def monitor_poll(request: WatchRequest) -> Dict[str, Any]:
+    return to_jsonable(get_service().poll_thread(request.url, request.watcher))
+
+@app.post("/monitor/stop")
+def monitor_stop(request: WatchRequest) -> Dict[str, Any]:
+    get_service().stop_watching(request.url, request.watcher)
+    return {'status': 'stopped'}
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=Config.API_HOST, port=Config.API_PORT)
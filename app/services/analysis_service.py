@@ -0,0 +1,177 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+import httpx
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from app.config import Config
+from app.services.api_client import SocialAPIClient
+from app.services.batch_runner import BatchAnalyzer
+from app.services.data_processor import DataProcessor
+from app.services.thread_monitor import ThreadMonitor
+from app.utils.cache import get_inference_cache
+from app.utils.helpers import extract_social_url_info
+from app.utils.metrics import metrics, trace
+
+class AnalysisService:
+    """Fetch + analyze facade shared by the Streamlit UI, the bulk runner and the HTTP API"""
+
+    def __init__(self, api_client: Optional[SocialAPIClient] = None,
+                 data_processor: Optional[DataProcessor] = None):
+        self.api_client = api_client or SocialAPIClient()
+        self.data_processor = data_processor or DataProcessor()
+        self.batch_analyzer = BatchAnalyzer(self.api_client, self.data_processor, inference_guard=self._inference_guard)
+        self._inference_lock = threading.Lock()
+        # (watcher, platform, post_id) -> monitor, least recently polled first
+        self._monitors: "OrderedDict[Tuple[str, str, str], ThreadMonitor]" = OrderedDict()
+        self._monitors_lock = threading.Lock()
+
+    def warm_up(self, background: bool = True) -> None:
+        """Load the models ahead of the first request"""
+        self.data_processor.registry.warm_up(background)
+    
+    def models_status(self) -> Dict[str, Any]:
+        return self.data_processor.registry.status()
+    
+    def _inference_guard(self):
+        # In-process models run one analysis at a time; with inference workers, requests overlap
+        if self.data_processor.text_analyzer.pool is not None:
+            return nullcontext()
+        return self._inference_lock
+    
+    def analyze_url(self, url: str) -> Dict[str, Any]:
+        """Fetch a post and run the full analysis pipeline on it; record['trace'] has the per-stage timings"""
+        with trace('analyze_url') as current:
+            platform, post_data = self.api_client.fetch_content(url)
+            record = {'url': url, 'platform': platform, 'fetched': bool(platform and post_data), 'result': None}
+            if record['fetched']:
+                with self._inference_guard():
+                    record['result'] = self.data_processor.process_content(platform, post_data)
+            metrics.increment('analyses_total', platform=platform or 'unknown',
+                              status='ok' if record['fetched'] else 'fetch_failed')
+        record['trace'] = current.to_dict()
+        return record
+
+    def analyze_urls(self, urls: List[str], output_path: Optional[str] = None,
+                     on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Bulk analysis; per-URL records stream to output_path, the aggregate report is returned"""
+        return self.batch_analyzer.analyze_urls(urls, output_path, on_result)
+
+    def analyze_texts(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Sentiment and emotion for raw texts, without fetching anything"""
+        with self._inference_guard():
+            return self.data_processor.text_analyzer.analyze_batch(texts)
+
+    def poll_thread(self, url: str, watcher: str = '') -> Dict[str, Any]:
+        """One watch-mode poll; each watcher keeps its own monitor per thread so only its delta is analyzed"""
+        platform, post_id = extract_social_url_info(url)
+        if not platform or not post_id:
+            # Nothing to watch; the monitor reports the URL as unsupported and is not kept
+            return ThreadMonitor(url, self.api_client, self.data_processor).poll()
+
+        # URL variants of one thread share a monitor, different watchers never do
+        key = (watcher, platform, post_id)
+        with self._monitors_lock:
+            monitor = self._monitors.get(key)
+            if monitor is None:
+                monitor = self._monitors[key] = ThreadMonitor(
+                    url, self.api_client, self.data_processor, self._inference_guard
+                )
+            self._monitors.move_to_end(key)
+            monitor.last_polled = time.monotonic()
+            self._evict_monitors()
+        return monitor.poll()
+
+    def stop_watching(self, url: str, watcher: str = '') -> None:
+        platform, post_id = extract_social_url_info(url)
+        with self._monitors_lock:
+            self._monitors.pop((watcher, platform, post_id), None)
+
+    def _evict_monitors(self) -> None:
+        # Watchers that closed the page never call stop_watching; idle or surplus monitors are dropped
+        idle_since = time.monotonic() - Config.MONITOR_IDLE_TIMEOUT
+        while self._monitors:
+            key, monitor = next(iter(self._monitors.items()))
+            if len(self._monitors) <= Config.MONITOR_MAX_WATCHES and monitor.last_polled >= idle_since:
+                break
+            del self._monitors[key]
+
+    def get_platform_info(self, platform: str) -> Dict[str, Any]:
+        return self.api_client.get_platform_info(platform)
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self.data_processor.text_analyzer.pool
+        return {
+            'inference_cache': get_inference_cache().stats(),
+            'fetch_cache': self.api_client.fetch_cache.stats(),
+            'length_buckets': self.data_processor.text_analyzer.bucket_stats(),
+            'inference_pool': pool.stats() if pool is not None else None
+        }
+
+class RemoteAnalysisService:
+    """Thin client for a headless analysis server (see app/server.py)"""
+
+    def __init__(self, base_url: str, timeout: Optional[float] = None):
+        self.base_url = base_url.rstrip('/')
+        self._http = httpx.Client(base_url=self.base_url, timeout=timeout or Config.ANALYSIS_API_TIMEOUT)
+        self._platforms = SocialAPIClient()
+
+    def warm_up(self, background: bool = True) -> None:
+        """Nothing to load locally; the server warms its own models on startup"""
+    
+    def models_status(self) -> Dict[str, Any]:
+        response = self._http.get('/health')
+        response.raise_for_status()
+        return response.json().get('models', {})
+    
+    def analyze_url(self, url: str) -> Dict[str, Any]:
+        response = self._http.post('/analyze', json={'url': url})
+        response.raise_for_status()
+        return response.json()
+
+    def analyze_urls(self, urls: List[str], output_path: Optional[str] = None,
+                     on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        response = self._http.post('/analyze/batch', json={'urls': urls})
+        response.raise_for_status()
+        payload = response.json()
+
+        output = open(output_path, 'a', encoding='utf-8') if output_path else None
+        try:
+            for record in payload.get('results', []):
+                if output:
+                    output.write(json.dumps(record) + '\n')
+                if on_result:
+                    on_result(record)
+        finally:
+            if output:
+                output.close()
+        return payload.get('report', {})
+
+    def analyze_texts(self, texts: List[str]) -> List[Dict[str, Any]]:
+        response = self._http.post('/analyze/text', json={'texts': texts})
+        response.raise_for_status()
+        return response.json().get('results', [])
+
+    def poll_thread(self, url: str, watcher: str = '') -> Dict[str, Any]:
+        response = self._http.post('/monitor/poll', json={'url': url, 'watcher': watcher})
+        response.raise_for_status()
+        return response.json()
+
+    def stop_watching(self, url: str, watcher: str = '') -> None:
+        response = self._http.post('/monitor/stop', json={'url': url, 'watcher': watcher})
+        response.raise_for_status()
+
+    def get_platform_info(self, platform: str) -> Dict[str, Any]:
+        return self._platforms.get_platform_info(platform)
+
+    def stats(self) -> Dict[str, Any]:
+        response = self._http.get('/stats')
+        response.raise_for_status()
+        return response.json()
+
+def create_analysis_service():
+    """Use the shared analysis server when ANALYSIS_API_URL is set, otherwise load models in-process"""
+    if Config.ANALYSIS_API_URL:
+        return RemoteAnalysisService(Config.ANALYSIS_API_URL)
+    return AnalysisService()
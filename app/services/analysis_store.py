@@ -0,0 +1,193 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, List, Optional
+from app.config import Config
+
+class AnalysisStore:
+    """SQLite record of fetched posts and per-comment model results, for delta re-analysis"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS posts (
+                platform TEXT NOT NULL,
+                post_id TEXT NOT NULL,
+                data TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (platform, post_id)
+            );
+            CREATE TABLE IF NOT EXISTS comments (
+                platform TEXT NOT NULL,
+                comment_id TEXT NOT NULL,
+                post_id TEXT NOT NULL,
+                version TEXT NOT NULL,
+                sentiment TEXT NOT NULL,
+                emotion TEXT NOT NULL,
+                score INTEGER NOT NULL DEFAULT 0,
+                analyzed_at REAL NOT NULL,
+                PRIMARY KEY (platform, comment_id)
+            );
+            CREATE INDEX IF NOT EXISTS comments_by_post ON comments (platform, post_id);
+            CREATE TABLE IF NOT EXISTS thread_aggregates (
+                platform TEXT NOT NULL,
+                post_id TEXT NOT NULL,
+                comments INTEGER NOT NULL,
+                sentiments TEXT NOT NULL,
+                emotions TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (platform, post_id)
+            );
+        """)
+        self._db.commit()
+
+    @staticmethod
+    def comment_version(comment: Dict[str, Any]) -> str:
+        """Edit timestamp plus body hash, so edits are caught even when `edited` is not reported"""
+        body = comment.get('body', comment.get('text', '')) or ''
+        digest = hashlib.sha1(body.encode('utf-8')).hexdigest()[:16]
+        return f"{comment.get('edited') or 0}:{digest}"
+
+    def save_post(self, platform: str, post_id: str, data: Dict[str, Any]) -> bool:
+        """Store the latest post payload; returns True when the post was seen before"""
+        now = time.time()
+        with self._lock:
+            seen = self._db.execute(
+                "SELECT 1 FROM posts WHERE platform = ? AND post_id = ?", (platform, post_id)
+            ).fetchone() is not None
+            self._db.execute(
+                "INSERT INTO posts (platform, post_id, data, first_seen, last_seen) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (platform, post_id) DO UPDATE SET data = excluded.data, last_seen = excluded.last_seen",
+                (platform, post_id, json.dumps(data, default=str), now, now)
+            )
+            self._db.commit()
+        return seen
+
+    def get_post(self, platform: str, post_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM posts WHERE platform = ? AND post_id = ?", (platform, post_id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_comment_results(self, platform: str, comments: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Stored sentiment/emotion for comments whose version is unchanged, keyed by comment id"""
+        versions = {str(comment['id']): self.comment_version(comment) for comment in comments if comment.get('id')}
+        if not versions:
+            return {}
+
+        rows = []
+        ids = list(versions)
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows.extend(self._db.execute(
+                    f"SELECT comment_id, version, sentiment, emotion FROM comments "
+                    f"WHERE platform = ? AND comment_id IN ({','.join('?' * len(chunk))})",
+                    [platform, *chunk]
+                ).fetchall())
+
+        return {
+            comment_id: {'sentiment': json.loads(sentiment), 'emotion': json.loads(emotion)}
+            for comment_id, version, sentiment, emotion in rows
+            if versions[comment_id] == version
+        }
+
+    def save_comment_results(self, platform: str, post_id: str, comments: List[Dict[str, Any]],
+                             results: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Upsert fresh results and fold them into the thread aggregate; returns new/edited counts"""
+        counts = {'new': 0, 'edited': 0}
+        if not comments:
+            return counts
+
+        now = time.time()
+        with self._lock:
+            aggregate = self._load_aggregate(platform, post_id)
+            for comment, result in zip(comments, results):
+                if not comment.get('id'):
+                    continue
+                comment_id = str(comment['id'])
+                sentiment = result['sentiment'].get('sentiment', 'NEUTRAL')
+                emotion = result['emotion'].get('dominant_emotion', 'neutral')
+
+                previous = self._db.execute(
+                    "SELECT sentiment, emotion FROM comments WHERE platform = ? AND comment_id = ?",
+                    (platform, comment_id)
+                ).fetchone()
+                if previous:
+                    # Edited: swap the old labels out of the aggregate instead of recounting the thread
+                    counts['edited'] += 1
+                    aggregate['sentiments'][json.loads(previous[0]).get('sentiment', 'NEUTRAL')] -= 1
+                    aggregate['emotions'][json.loads(previous[1]).get('dominant_emotion', 'neutral')] -= 1
+                else:
+                    counts['new'] += 1
+                    aggregate['comments'] += 1
+                aggregate['sentiments'][sentiment] += 1
+                aggregate['emotions'][emotion] += 1
+
+                self._db.execute(
+                    "INSERT OR REPLACE INTO comments "
+                    "(platform, comment_id, post_id, version, sentiment, emotion, score, analyzed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (platform, comment_id, post_id, self.comment_version(comment),
+                     json.dumps(result['sentiment']), json.dumps(result['emotion']),
+                     int(comment.get('score', 0) or 0), now)
+                )
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO thread_aggregates "
+                "(platform, post_id, comments, sentiments, emotions, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (platform, post_id, aggregate['comments'],
+                 json.dumps(+aggregate['sentiments']), json.dumps(+aggregate['emotions']), now)
+            )
+            self._db.commit()
+        return counts
+
+    def thread_summary(self, platform: str, post_id: str) -> Dict[str, Any]:
+        """Running totals over every comment ever analyzed for the thread"""
+        with self._lock:
+            aggregate = self._load_aggregate(platform, post_id)
+        return {
+            'comments_analyzed': aggregate['comments'],
+            'sentiment_distribution': dict(+aggregate['sentiments']),
+            'emotion_distribution': dict((+aggregate['emotions']).most_common()),
+            'updated_at': aggregate['updated_at']
+        }
+
+    def _load_aggregate(self, platform: str, post_id: str) -> Dict[str, Any]:
+        row = self._db.execute(
+            "SELECT comments, sentiments, emotions, updated_at FROM thread_aggregates WHERE platform = ? AND post_id = ?",
+            (platform, post_id)
+        ).fetchone()
+        if not row:
+            return {'comments': 0, 'sentiments': Counter(), 'emotions': Counter(), 'updated_at': None}
+        return {
+            'comments': row[0],
+            'sentiments': Counter(json.loads(row[1])),
+            'emotions': Counter(json.loads(row[2])),
+            'updated_at': row[3]
+        }
+
+_shared_store: Optional[AnalysisStore] = None
+_shared_store_lock = threading.Lock()
+
+def get_analysis_store() -> Optional[AnalysisStore]:
+    """Process-wide store, or None when ANALYSIS_STORE_PATH is not configured"""
+    global _shared_store
+    if not Config.ANALYSIS_STORE_PATH:
+        return None
+    with _shared_store_lock:
+        if _shared_store is None:
+            try:
+                _shared_store = AnalysisStore(Config.ANALYSIS_STORE_PATH)
+            except sqlite3.Error as e:
+                print(f"❌ Error opening analysis store at {Config.ANALYSIS_STORE_PATH}: {e}")
+                return None
+        return _shared_store
@@ -1,107 +1,410 @@
-import requests
+import asyncio
+import math
+import threading
 import time
-from typing import Dict, Any, List, Tuple, Optional
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import httpx
+from typing import Dict, Any, AsyncIterator, List, Tuple, Optional, Coroutine
 from app.config import Config
+from app.services.fetch_cache import FetchCache
+from app.services.comment_stream import (
+    assign_reply_depths, iter_reddit_comments, reddit_comment_record, twitter_reply_record
+)
+from app.services.rate_limiter import TokenBucket
+from app.services.tweet_lookup import TweetLookupCoalescer, split_tweet_lookup
 from app.utils.helpers import extract_social_url_info
+from app.utils.metrics import bind_trace, current_trace, metrics, span
+
+TWEET_LOOKUP_PARAMS = {
+    'tweet.fields': 'created_at,author_id,public_metrics,geo,lang,context_annotations,conversation_id',
+    'expansions': 'author_id,geo.place_id',
+    'user.fields': 'username,name,location,verified,public_metrics,description',
+    'place.fields': 'full_name,country,geo'
+}
 
 class SocialAPIClient:
     def __init__(self):
         self.x_bearer = Config.X_BEARER_TOKEN
         self.reddit_headers = {"User-Agent": "SocialAnalyzerPro/1.0"}
-        self.rate_limit_delay = 1  # seconds between requests
+        self.max_retries = Config.HTTP_MAX_RETRIES
+        self._limiters: Dict[str, TokenBucket] = {}
+        self._validators: Dict[str, Dict[str, str]] = {}  # platform:post_id -> validators of the last poll
+        self.fetch_cache = FetchCache(disk_path=Config.FETCH_CACHE_DB_PATH)
+        self._http: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._tweet_lookup = TweetLookupCoalescer(
+            self._lookup_tweets, window=Config.X_LOOKUP_WINDOW, hold_for=Config.FETCH_CACHE_TTL_TWITTER
+        )
     
     def fetch_content(self, url: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
         """Main method to fetch content from any supported platform"""
+        return self.run(self.fetch_content_async(url))
+    
+    async def fetch_content_async(self, url: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Async variant of fetch_content; many calls can run concurrently within the rate limits"""
+        # Cached per (platform, post_id), so URL variants and Streamlit reruns within the TTL cost no request;
+        # a stale entry with an ETag / Last-Modified is revalidated instead of refetched
         platform, post_id = extract_social_url_info(url)
         
-        if not platform or not post_id:
+        if not platform or not post_id or platform not in ('twitter', 'reddit'):
             return None, None
         
+        cached = self.fetch_cache.get(platform, post_id)
+        if cached is not None and self.fetch_cache.is_fresh(platform, cached):
+            self._record_cache('hit', platform)
+            return platform, cached['data']
+        
         try:
-            if platform == 'twitter':
-                return platform, self._fetch_twitter_content(post_id)
-            elif platform == 'reddit':
-                return platform, self._fetch_reddit_content(post_id)
-            else:
-                return None, None
-                
+            with span('fetch'):
+                data, validators = await self._fetch_post(platform, post_id, cached['validators'] if cached else None)
         except Exception as e:
             print(f"Error fetching {platform} content: {str(e)}")
             return platform, None
+        
+        if data is None:
+            self.fetch_cache.touch(platform, post_id)
+            self._record_cache('revalidated', platform)
+            return platform, cached['data']
+        self.fetch_cache.set(platform, post_id, data, validators)
+        self._record_cache('miss', platform)
+        return platform, data
+    
+    async def poll_content_async(self, url: str, validators: Optional[Dict[str, str]] = None) -> Tuple[Optional[str], Optional[Dict[str, Any]], bool]:
+        """Conditional fetch for repeated polling; returns (platform, data, modified)"""
+        # Sends If-None-Match / If-Modified-Since when the API gave validators last time;
+        # an unchanged resource comes back as (platform, None, False) without a body. Each monitor passes its
+        # own validators dict, updated in place, so one watcher's poll never turns another's into a 304;
+        # they are kept apart from the fetch cache's, so the first poll after a normal fetch still gets a body
+        platform, post_id = extract_social_url_info(url)
+        
+        if not platform or not post_id or platform not in ('twitter', 'reddit'):
+            return None, None, False
+        
+        if validators is None:
+            validators = self._validators.setdefault(FetchCache.make_key(platform, post_id), {})
+        try:
+            with span('fetch'):
+                data, response_validators = await self._fetch_post(platform, post_id, dict(validators))
+        except Exception as e:
+            print(f"Error polling {platform} content: {str(e)}")
+            return platform, None, True
+        
+        if data is None:
+            return platform, None, False
+        validators.clear()
+        validators.update(response_validators or {})
+        self.fetch_cache.set(platform, post_id, data, response_validators)
+        return platform, data, True
+    
+    async def _fetch_post(self, platform: str, post_id: str,
+                          validators: Optional[Dict[str, str]] = None) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, str]]]:
+        """(content, validators) from the platform API; content is None when the validators still match (304)"""
+        if platform == 'twitter':
+            return await self._fetch_twitter_content(post_id, validators)
+        return await self._fetch_reddit_content(post_id, validators)
+    
+    def _record_cache(self, result: str, platform: str) -> None:
+        self.fetch_cache.record(result)
+        metrics.increment('fetch_cache_total', platform=platform, result=result)
+    
+    def prefetch_tweets(self, urls: List[str]) -> None:
+        """Queue the tweet ids of many URLs for bulk lookup; call from the client's event loop"""
+        if not Config.X_BULK_LOOKUP or not self.x_bearer:
+            return
+        # Tweets still fresh in the fetch cache are served from there and need no lookup
+        self._tweet_lookup.prefetch(
+            post_id for platform, post_id in map(extract_social_url_info, urls)
+            if platform == 'twitter' and post_id and not self.fetch_cache.has_fresh(platform, post_id)
+        )
+    
+    def run(self, coro: Coroutine) -> Any:
+        """Run a coroutine on the client's event loop from synchronous code (e.g. Streamlit)"""
+        # The loop thread does not see the caller's context, so the active trace is handed over
+        return asyncio.run_coroutine_threadsafe(bind_trace(coro, current_trace()), self._ensure_loop()).result()
+    
+    def close(self) -> None:
+        """Close the connection pool and stop the background event loop"""
+        if self._loop is None:
+            return
+        if self._http is not None:
+            self.run(self._http.aclose())
+            self._http = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        # One long-lived loop keeps the httpx connection pool alive across Streamlit reruns
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="social-api-client", daemon=True)
+                thread.start()
+                self._loop = loop
+            return self._loop
+    
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=Config.HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=Config.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.HTTP_MAX_CONNECTIONS
+                )
+            )
+        return self._http
+    
+    def _limiter(self, platform: str) -> TokenBucket:
+        if platform not in self._limiters:
+            rate_limit = self.get_platform_info(platform).get('rate_limit', {'requests': 60, 'period': 60})
+            self._limiters[platform] = TokenBucket(rate_limit['requests'], rate_limit['period'])
+        return self._limiters[platform]
+    
+    async def _get(self, platform: str, url: str, validators: Optional[Dict[str, str]] = None, **kwargs) -> httpx.Response:
+        """Rate-limited GET that follows rate-limit headers and retries on 429"""
+        # With validators the request is conditional and callers must handle 304
+        limiter = self._limiter(platform)
+        conditional = validators is not None
+        if conditional:
+            kwargs['headers'] = {**kwargs.get('headers', {}), **self._conditional_headers(validators)}
+        for attempt in range(self.max_retries + 1):
+            with span('fetch.rate_limit_wait'):
+                await limiter.acquire()
+            with span('fetch.http'):
+                response = await self._client().get(url, **kwargs)
+            metrics.increment('http_requests_total', platform=platform, status=response.status_code)
+            limiter.update_from_headers(response.headers)
+            if response.status_code == 429 and attempt < self.max_retries:
+                metrics.increment('http_retries_total', platform=platform)
+                limiter.block_for(self._retry_after_seconds(response.headers.get('retry-after')))
+                continue
+            if conditional and response.status_code == 304:
+                return response
+            response.raise_for_status()
+            return response
+        return response
+    
+    @staticmethod
+    def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+        """Retry-After as seconds to wait; it may be delta-seconds (possibly fractional) or an HTTP-date"""
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+            return max(0.0, seconds) if math.isfinite(seconds) else None
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at is None:
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    
+    @staticmethod
+    def _conditional_headers(validators: Dict[str, str]) -> Dict[str, str]:
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+    
+    @staticmethod
+    def _response_validators(response: httpx.Response) -> Optional[Dict[str, str]]:
+        etag = response.headers.get('etag')
+        last_modified = response.headers.get('last-modified')
+        if etag or last_modified:
+            return {'etag': etag, 'last_modified': last_modified}
+        return None
     
-    def _fetch_twitter_content(self, tweet_id: str) -> Dict[str, Any]:
-        """Fetch Twitter/X content"""
+    async def _fetch_twitter_content(self, tweet_id: str, validators: Optional[Dict[str, str]] = None):
+        """Fetch Twitter/X content and its validators"""
         if not self.x_bearer:
             raise ValueError("Twitter Bearer Token not configured")
         
-        url = f"https://api.twitter.com/2/tweets/{tweet_id}"
-        params = {
-            'tweet.fields': 'created_at,author_id,public_metrics,geo,lang,context_annotations,conversation_id',
-            'expansions': 'author_id,geo.place_id',
-            'user.fields': 'username,name,location,verified,public_metrics,description',
-            'place.fields': 'full_name,country,geo'
-        }
+        if validators is not None or not Config.X_BULK_LOOKUP:
+            # Revalidation keeps the per-tweet endpoint, where the validators of the last response apply
+            url = f"{Config.X_API_BASE_URL}/2/tweets/{tweet_id}"
+            headers = {"Authorization": f"Bearer {self.x_bearer}"}
+            response = await self._get('twitter', url, validators=validators, headers=headers, params=TWEET_LOOKUP_PARAMS)
+            if response.status_code == 304:
+                return None, validators
+            content = response.json()
+            validators = self._response_validators(response)
+        else:
+            # Concurrent fetches share /2/tweets?ids= calls of up to 100 ids
+            content = await self._tweet_lookup.lookup(tweet_id)
+            if content is None:
+                raise ValueError(f"Tweet {tweet_id} not found or not accessible")
+        
+        conversation_id = content.get('data', {}).get('conversation_id')
+        if Config.X_FETCH_REPLIES and conversation_id:
+            with span('fetch.replies'):
+                content['replies'], content['replies_meta'] = await self.fetch_twitter_replies(conversation_id)
+        return content, validators
+    
+    async def _lookup_tweets(self, tweet_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """One /2/tweets?ids= call, split back into single-tweet payloads; missing ids map to None"""
+        url = f"{Config.X_API_BASE_URL}/2/tweets"
         headers = {"Authorization": f"Bearer {self.x_bearer}"}
+        with span('fetch.tweet_lookup'):
+            response = await self._get('twitter', url, headers=headers, params={**TWEET_LOOKUP_PARAMS, 'ids': ','.join(tweet_ids)})
+            response.raise_for_status()  # still 429 after every retry
+        metrics.increment('x_tweets_looked_up_total', len(tweet_ids))
+        tweets = split_tweet_lookup(response.json())
+        return {tweet_id: tweets.get(tweet_id) for tweet_id in tweet_ids}
+    
+    async def fetch_twitter_replies(self, conversation_id: str, max_comments: Optional[int] = None,
+                                    time_budget: Optional[float] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Collect a conversation's replies page by page as flat comment records, plus paging stats"""
+        max_comments = max_comments or Config.X_REPLIES_MAX_COMMENTS
+        deadline = time.monotonic() + (time_budget or Config.X_REPLIES_TIME_BUDGET)
+        replies: List[Dict[str, Any]] = []
+        meta = {'pages': 0, 'truncated': False}
+        
+        try:
+            async for page, has_more in self.iter_twitter_reply_pages(conversation_id):
+                meta['pages'] += 1
+                kept = page[:max_comments - len(replies)]
+                replies.extend(kept)
+                if len(kept) < len(page):
+                    meta['truncated'] = True
+                    break
+                if len(replies) >= max_comments or time.monotonic() >= deadline:
+                    # Stopping on the last page loses nothing
+                    meta['truncated'] = has_more
+                    break
+        except Exception as e:
+            # Replies are an extra; the tweet itself is still analyzed with whatever pages arrived
+            print(f"Error fetching X replies: {str(e)}")
+            meta['truncated'] = True
         
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
+        assign_reply_depths(replies, conversation_id)
+        return replies, meta
+    
+    async def iter_twitter_reply_pages(self, conversation_id: str) -> AsyncIterator[Tuple[List[Dict[str, Any]], bool]]:
+        """Yield the replies of a conversation one recent-search page at a time, with whether a next_token follows"""
+        # Only the converted records are kept, so the raw page JSON is dropped as soon as it is parsed
+        url = f"{Config.X_API_BASE_URL}/2/tweets/search/recent"
+        headers = {"Authorization": f"Bearer {self.x_bearer}"}
+        params = {
+            'query': f"conversation_id:{conversation_id}",
+            'max_results': min(100, max(10, Config.X_REPLIES_PAGE_SIZE)),
+            'tweet.fields': 'created_at,author_id,public_metrics,conversation_id,referenced_tweets,lang',
+            'expansions': 'author_id',
+            'user.fields': 'username'
+        }
         
-        time.sleep(self.rate_limit_delay)
-        return response.json()
+        while True:
+            response = await self._get('twitter', url, headers=headers, params=params)
+            response.raise_for_status()  # still 429 after every retry
+            payload = response.json()
+            usernames = {user['id']: user.get('username', 'unknown') for user in payload.get('includes', {}).get('users', [])}
+            # The root tweet can come back as a member of its own conversation; it is the post, not a reply
+            page = [
+                twitter_reply_record(tweet, usernames) for tweet in payload.get('data', [])
+                if str(tweet.get('id')) != str(conversation_id)
+            ]
+            metrics.increment('x_reply_pages_total')
+            next_token = payload.get('meta', {}).get('next_token')
+            if page:
+                yield page, bool(next_token)
+            if not next_token:
+                return
+            params = {**params, 'next_token': next_token}
     
-    def _fetch_reddit_content(self, post_id: str) -> Dict[str, Any]:
-        """Fetch Reddit content"""
-        url = f"https://www.reddit.com/comments/{post_id}.json"
+    async def _fetch_reddit_content(self, post_id: str, validators: Optional[Dict[str, str]] = None):
+        """Fetch Reddit content and its validators"""
+        url = f"{Config.REDDIT_BASE_URL}/comments/{post_id}.json"
         
-        response = requests.get(url, headers=self.reddit_headers)
-        response.raise_for_status()
+        response = await self._get('reddit', url, validators=validators, headers=self.reddit_headers)
+        if response.status_code == 304:
+            return None, validators
         
         data = response.json()
         
         # Parse main post
         main_post = data[0]['data']['children'][0]['data']
         
-        # Parse comments
-        comments = []
-        if len(data) > 1:
-            comments = self._parse_reddit_comments(data[1]['data']['children'])
-        
-        time.sleep(self.rate_limit_delay)
+        # Comments stay as the raw listing; DataProcessor streams through it with iter_reddit_comments
+        comment_listing = data[1]['data']['children'] if len(data) > 1 else []
         
-        return {
+        content = {
             'main_post': main_post,
-            'comments': comments,
-            'total_comments': len(comments)
+            'comment_listing': comment_listing,
+            'total_comments': main_post.get('num_comments', 0)
         }
+        
+        if Config.REDDIT_EXPAND_MORE:
+            more_stubs = []
+            for _ in iter_reddit_comments(comment_listing, more_stubs=more_stubs):
+                pass
+            with span('fetch.expand_more'):
+                content['expanded_comments'] = await self.expand_more_comments(post_id, more_stubs)
+        
+        return content, self._response_validators(response)
     
-    def _parse_reddit_comments(self, comment_data: List[Dict]) -> List[Dict[str, Any]]:
-        """Parse Reddit comments recursively"""
-        comments = []
-        
-        for item in comment_data:
-            if item['kind'] == 't1' and 'body' in item['data']:
-                comment = item['data']
-                
-                parsed_comment = {
-                    'id': comment['id'],
-                    'body': comment['body'],
-                    'score': comment.get('score', 0),
-                    'author': comment.get('author', '[deleted]'),
-                    'created_utc': comment.get('created_utc', 0),
-                    'permalink': comment.get('permalink', ''),
-                    'replies': []
-                }
-                
-                # Parse replies recursively
-                if 'replies' in comment and isinstance(comment['replies'], dict):
-                    if 'data' in comment['replies'] and 'children' in comment['replies']['data']:
-                        parsed_comment['replies'] = self._parse_reddit_comments(
-                            comment['replies']['data']['children']
-                        )
-                
-                comments.append(parsed_comment)
-        
-        return comments
+    async def expand_more_comments(self, post_id: str, more_stubs: List[Dict[str, Any]],
+                                   max_comments: Optional[int] = None,
+                                   time_budget: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Resolve Reddit "more" stubs through /api/morechildren into flat comment records"""
+        max_comments = max_comments or Config.REDDIT_MORE_MAX_COMMENTS
+        deadline = time.monotonic() + (time_budget or Config.REDDIT_MORE_TIME_BUDGET)
+        batch_size = min(100, Config.REDDIT_MORE_BATCH_SIZE)  # Reddit accepts at most 100 ids per call
+        semaphore = asyncio.Semaphore(Config.REDDIT_MORE_CONCURRENCY)
+        
+        pending_ids = deque(child_id for stub in more_stubs for child_id in stub['children'])
+        requested = set(pending_ids)
+        expanded = []
+        
+        async def fetch_batch(child_ids: List[str]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                if time.monotonic() >= deadline:
+                    return []
+                try:
+                    response = await self._get(
+                        'reddit',
+                        f"{Config.REDDIT_BASE_URL}/api/morechildren.json",
+                        headers=self.reddit_headers,
+                        params={
+                            'api_type': 'json',
+                            'link_id': f"t3_{post_id}",
+                            'children': ','.join(child_ids),
+                            'raw_json': 1
+                        }
+                    )
+                    return response.json().get('json', {}).get('data', {}).get('things', [])
+                except Exception as e:
+                    print(f"Error expanding Reddit comments: {str(e)}")
+                    return []
+        
+        while pending_ids and len(expanded) < max_comments and time.monotonic() < deadline:
+            # One round: up to REDDIT_MORE_CONCURRENCY requests of up to 100 ids each
+            remaining = max_comments - len(expanded)
+            round_size = min(len(pending_ids), remaining, batch_size * Config.REDDIT_MORE_CONCURRENCY)
+            round_ids = [pending_ids.popleft() for _ in range(round_size)]
+            batches = [round_ids[i:i + batch_size] for i in range(0, len(round_ids), batch_size)]
+            
+            for things in await asyncio.gather(*(fetch_batch(batch) for batch in batches)):
+                for thing in things:
+                    data = thing.get('data', {})
+                    if thing.get('kind') == 't1' and 'body' in data:
+                        if len(expanded) < max_comments:
+                            expanded.append(reddit_comment_record(data))
+                    elif thing.get('kind') == 'more':
+                        # Nested stubs can appear in the response; queue their ids for a later round
+                        for child_id in data.get('children', []):
+                            if child_id not in requested:
+                                requested.add(child_id)
+                                pending_ids.append(child_id)
+        
+        return expanded
     
     def get_platform_info(self, platform: str) -> Dict[str, str]:
         """Get platform metadata"""
@@ -110,13 +413,15 @@ class SocialAPIClient:
                 'name': 'Twitter/X',
                 'emoji': '🐦',
                 'color': '#1da1f2',
-                'api_limit': '300 requests/15min'
+                'api_limit': '300 requests/15min',
+                'rate_limit': {'requests': 300, 'period': 900}
             },
             'reddit': {
                 'name': 'Reddit', 
                 'emoji': '👽',
                 'color': '#ff4500',
-                'api_limit': '60 requests/min'
+                'api_limit': '60 requests/min',
+                'rate_limit': {'requests': 60, 'period': 60}
             }
         }
         
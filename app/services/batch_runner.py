@@ -0,0 +1,215 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, ContextManager
+from app.config import Config
+from app.models.registry import get_model_registry
+from app.services.api_client import SocialAPIClient
+from app.services.data_processor import DataProcessor
+from app.utils.helpers import json_default
+
+URL_PATTERN = re.compile(r'https?://[^\s,;"\']+')
+
+def load_urls(text: str) -> List[str]:
+    """Pull URLs out of a plain-text or CSV upload, keeping order and dropping duplicates"""
+    seen = set()
+    urls = []
+    for line in text.splitlines():
+        if line.strip().startswith('#'):
+            continue
+        for url in URL_PATTERN.findall(line):
+            if url not in seen:
+                seen.add(url)
+                urls.append(url)
+    return urls
+
+class BulkAggregate:
+    """Running cross-post summary of a bulk analysis"""
+
+    def __init__(self):
+        self.total = 0
+        self.status_counts = Counter()
+        self.platform_counts = Counter()
+        self.post_sentiments = Counter()
+        self.post_emotions = Counter()
+        self.comment_sentiments = Counter()
+        self.hashtags = Counter()
+        self.comment_hashtags = Counter()
+        self.confidence_sum = 0.0
+        self.comments_analyzed = 0
+
+    def add(self, record: Dict[str, Any]) -> None:
+        self.total += 1
+        self.status_counts[record['status']] += 1
+        result = record.get('result')
+        if not result:
+            return
+
+        self.platform_counts[result.get('platform', 'unknown')] += 1
+        analysis = result.get('analysis', {})
+        sentiment = analysis.get('sentiment', {})
+        self.post_sentiments[sentiment.get('sentiment', 'NEUTRAL')] += 1
+        self.confidence_sum += sentiment.get('confidence', 0)
+        self.post_emotions[analysis.get('emotion', {}).get('dominant_emotion', 'neutral')] += 1
+        self.hashtags.update(tag.lower() for tag in analysis.get('entities', {}).get('hashtags', []))
+
+        comments = result.get('comments', {})
+        self.comment_sentiments.update(comments.get('sentiment_distribution', {}))
+        self.comments_analyzed += comments.get('total_processed', 0)
+        self.comment_hashtags.update(dict(comments.get('entities', {}).get('top_hashtags', [])))
+
+    def to_dict(self) -> Dict[str, Any]:
+        analyzed = self.status_counts.get('ok', 0)
+        return {
+            'total_urls': self.total,
+            'status': dict(self.status_counts),
+            'platforms': dict(self.platform_counts),
+            'post_sentiment_distribution': dict(self.post_sentiments),
+            'avg_sentiment_confidence': round(self.confidence_sum / analyzed, 3) if analyzed else 0.0,
+            'dominant_emotions': dict(self.post_emotions.most_common()),
+            'comment_sentiment_distribution': dict(self.comment_sentiments),
+            'comments_analyzed': self.comments_analyzed,
+            'top_hashtags': dict(self.hashtags.most_common(20)),
+            'top_comment_hashtags': dict(self.comment_hashtags.most_common(20)),
+            'generated_at': datetime.now().isoformat()
+        }
+
+class BatchAnalyzer:
+    """Analyzes many URLs, overlapping concurrent fetches with model inference"""
+
+    def __init__(self, api_client: SocialAPIClient, data_processor: DataProcessor,
+                 fetch_concurrency: Optional[int] = None,
+                 inference_guard: Optional[Callable[[], ContextManager]] = None):
+        self.api_client = api_client
+        self.data_processor = data_processor
+        self.fetch_concurrency = fetch_concurrency or Config.BULK_FETCH_CONCURRENCY
+        # Held per URL around inference only, so fetches never block other users of the models
+        self.inference_guard = inference_guard
+        self._inference_executor = ThreadPoolExecutor(
+            max_workers=max(1, Config.INFERENCE_WORKERS), thread_name_prefix="bulk-inference"
+        )
+
+    def analyze_urls(self, urls: List[str], output_path: Optional[str] = None,
+                     on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Synchronous entry point used by the CLI and Streamlit"""
+        return self.api_client.run(self.analyze_urls_async(urls, output_path, on_result))
+
+    async def analyze_urls_async(self, urls: List[str], output_path: Optional[str] = None,
+                                 on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Fetch -> infer -> aggregate pipeline; results stream to output_path as JSON lines"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=Config.BULK_QUEUE_SIZE)
+        semaphore = asyncio.Semaphore(self.fetch_concurrency)
+        aggregate = BulkAggregate()
+
+        async def fetch(url: str) -> None:
+            async with semaphore:
+                platform, data = await self.api_client.fetch_content_async(url)
+            await queue.put((url, platform, data))
+
+        async def produce() -> None:
+            # X posts are looked up 100 ids per call instead of one call per URL
+            self.api_client.prefetch_tweets(urls)
+            await asyncio.gather(*(fetch(url) for url in urls))
+            await queue.put(None)
+
+        output = open(output_path, 'a', encoding='utf-8') if output_path else None
+        producer = asyncio.ensure_future(produce())
+        loop = asyncio.get_running_loop()
+        running = set()
+        
+        def emit(record: Dict[str, Any]) -> None:
+            aggregate.add(record)
+            if output:
+                output.write(json.dumps(record, default=json_default) + '\n')
+                output.flush()
+            if on_result:
+                on_result(record)
+        
+        try:
+            # Resolving the pool may load the models, which must not block the fetch loop
+            concurrency = await loop.run_in_executor(self._inference_executor, self.inference_concurrency)
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                url, platform, data = item
+                running.add(loop.run_in_executor(self._inference_executor, self._process, url, platform, data))
+                if len(running) >= concurrency:
+                    done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        emit(task.result())
+            for task in asyncio.as_completed(running):
+                emit(await task)
+            running = set()
+        finally:
+            if output:
+                output.close()
+            if not producer.done():
+                producer.cancel()
+            await asyncio.gather(producer, *running, return_exceptions=True)
+
+        return aggregate.to_dict()
+
+    def inference_concurrency(self) -> int:
+        # In-process models are not re-entrant, so URLs are analyzed one at a time;
+        # with inference workers, one URL per worker
+        pool = self.data_processor.text_analyzer.pool
+        return pool.workers if pool is not None else 1
+
+    def _process(self, url: str, platform: Optional[str], data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        record = {'url': url, 'platform': platform, 'status': 'ok', 'result': None, 'error': None}
+        if not platform:
+            record['status'] = 'unsupported_url'
+            return record
+        if not data:
+            record['status'] = 'fetch_failed'
+            return record
+        try:
+            with self.inference_guard() if self.inference_guard else nullcontext():
+                record['result'] = self.data_processor.process_content(platform, data)
+        except Exception as e:
+            print(f"Error analyzing {url}: {str(e)}")
+            record['status'] = 'analysis_failed'
+            record['error'] = str(e)
+        return record
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a list of Reddit/X URLs in bulk")
+    parser.add_argument("url_file", help="Text or CSV file containing one or more URLs per line")
+    parser.add_argument("--output", default=None, help="JSON lines file for per-URL results")
+    parser.add_argument("--report", default=None, help="JSON file for the cross-post aggregate report")
+    parser.add_argument("--concurrency", type=int, default=Config.BULK_FETCH_CONCURRENCY)
+    args = parser.parse_args()
+
+    with open(args.url_file, encoding='utf-8') as f:
+        urls = load_urls(f.read())
+
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    os.makedirs(Config.BULK_OUTPUT_DIR, exist_ok=True)
+    output_path = args.output or os.path.join(Config.BULK_OUTPUT_DIR, f"bulk_{stamp}.jsonl")
+    report_path = args.report or os.path.join(Config.BULK_OUTPUT_DIR, f"bulk_{stamp}_report.json")
+
+    # Fork any inference workers before the client's event-loop thread starts
+    get_model_registry().start_pool()
+    api_client = SocialAPIClient()
+    analyzer = BatchAnalyzer(api_client, DataProcessor(), args.concurrency)
+
+    def progress(record: Dict[str, Any]) -> None:
+        print(f"[{record['status']}] {record['url']}")
+
+    report = analyzer.analyze_urls(urls, output_path, progress)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    api_client.close()
+
+    print(f"✅ Analyzed {report['total_urls']} URLs → {output_path}")
+    print(f"📊 Aggregate report → {report_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import heapq
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional
+
+def iter_reddit_comments(children: List[Dict[str, Any]], order: str = 'dfs',
+                         more_stubs: Optional[List[Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+    """Walk a raw Reddit comment listing depth- or breadth-first, yielding flat comment records"""
+    # Unexpanded "more" stubs are collected into more_stubs when a list is passed in
+    pending = deque((item, 0) for item in children)
+    while pending:
+        item, depth = pending.popleft()
+        kind = item.get('kind')
+        data = item.get('data', {})
+
+        if kind == 'more':
+            if more_stubs is not None and data.get('children'):
+                more_stubs.append({
+                    'parent_id': data.get('parent_id'),
+                    'depth': data.get('depth', depth),
+                    'children': list(data['children']),
+                    'count': data.get('count', len(data['children']))
+                })
+            continue
+
+        if kind != 't1' or 'body' not in data:
+            continue
+
+        yield reddit_comment_record(data, depth)
+
+        replies = data.get('replies')
+        if isinstance(replies, dict):
+            reply_children = replies.get('data', {}).get('children', [])
+            reply_items = [(reply, depth + 1) for reply in reply_children]
+            if order == 'bfs':
+                pending.extend(reply_items)
+            else:
+                # Depth-first: replies are visited before the next sibling, in their original order
+                pending.extendleft(reversed(reply_items))
+
+def reddit_comment_record(data: Dict[str, Any], depth: Optional[int] = None) -> Dict[str, Any]:
+    """Flat comment record from a raw Reddit t1 payload"""
+    return {
+        'id': data['id'],
+        'body': data['body'],
+        'score': data.get('score', 0),
+        'author': data.get('author', '[deleted]'),
+        'created_utc': data.get('created_utc', 0),
+        'edited': data.get('edited', False),
+        'permalink': data.get('permalink', ''),
+        'parent_id': data.get('parent_id'),
+        'depth': depth if depth is not None else data.get('depth', 0)
+    }
+
+def twitter_reply_record(tweet: Dict[str, Any], usernames: Dict[str, str]) -> Dict[str, Any]:
+    """Flat comment record from an X reply in a recent-search page, in the same shape as Reddit comments"""
+    username = usernames.get(str(tweet.get('author_id')), 'unknown')
+    parent_id = next(
+        (reference['id'] for reference in tweet.get('referenced_tweets', []) if reference.get('type') == 'replied_to'),
+        tweet.get('conversation_id')
+    )
+    created_at = tweet.get('created_at')
+    return {
+        'id': tweet['id'],
+        'body': tweet.get('text', ''),
+        'score': tweet.get('public_metrics', {}).get('like_count', 0),
+        'author': username,
+        'created_utc': datetime.fromisoformat(created_at.replace('Z', '+00:00')).timestamp() if created_at else 0,
+        # Edits get a new tweet id on X; the body hash in the stored version still catches them
+        'edited': False,
+        'permalink': f"https://x.com/{username}/status/{tweet['id']}",
+        'parent_id': parent_id,
+        'depth': 0
+    }
+
+def assign_reply_depths(records: List[Dict[str, Any]], conversation_id: str) -> None:
+    """Set each reply's depth from its parent chain; search returns newest first, so parents can come later"""
+    parents = {record['id']: record['parent_id'] for record in records}
+    depths: Dict[str, int] = {}
+    for record in records:
+        chain = []
+        node = record['id']
+        while node in parents and node not in depths and len(chain) <= len(parents):
+            chain.append(node)
+            node = parents[node]
+        # Replies to the root tweet, or to a reply outside the fetched window, sit at depth 0
+        depth = depths.get(node, -1)
+        for node in reversed(chain):
+            depth += 1
+            depths[node] = depth
+        record['depth'] = depths[record['id']]
+
+def select_comments(records: Iterable[Dict[str, Any]], budget: int, priority: str = 'score',
+                    prepare: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+    """Pick up to `budget` comments from a stream by score (or traversal order), keeping traversal order"""
+    # Only `budget` records are held at a time, so arbitrarily large threads stream through.
+    # prepare() may enrich a record or return None to drop it before selection.
+    if prepare is not None:
+        records = (prepared for prepared in map(prepare, records) if prepared is not None)
+    sequenced = ((position, record) for position, record in enumerate(records))
+
+    if priority == 'score':
+        selected = heapq.nlargest(budget, sequenced, key=lambda item: (item[1].get('score', 0), -item[0]))
+        selected.sort(key=lambda item: item[0])
+    else:
+        selected = list(islice(sequenced, budget))
+
+    return [record for _, record in selected]
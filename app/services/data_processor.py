@@ -1,15 +1,42 @@
-from typing import Dict, Any, List
+import threading
+import numpy as np
+from typing import Dict, Any, Iterator, List, Optional
 from datetime import datetime
-from app.models.sentiment_model import SentimentAnalyzer
-from app.models.emotion_detector import EmotionDetector
-from app.models.theme_analyzer import ThemeAnalyzer
-from app.utils.helpers import clean_text, format_number, get_time_ago
+from itertools import chain
+from app.config import Config
+from app.models.comment_store import CommentStore, CommentView
+from app.models.dedup import group_near_duplicates
+from app.models.registry import ModelRegistry, get_model_registry
+from app.services.analysis_store import AnalysisStore, get_analysis_store
+from app.services.comment_stream import iter_reddit_comments, select_comments
+from app.utils.helpers import clean_text, format_number
+from app.utils.metrics import metrics, span
+from app.utils.text_features import extract_features, extract_features_batch, summarize_entities
 
 class DataProcessor:
-    def __init__(self):
-        self.sentiment_analyzer = SentimentAnalyzer()
-        self.emotion_detector = EmotionDetector()
-        self.theme_analyzer = ThemeAnalyzer()
+    def __init__(self, analysis_store: Optional[AnalysisStore] = None,
+                 registry: Optional[ModelRegistry] = None):
+        # Models come from the shared registry and are only loaded when first needed
+        self.registry = registry or get_model_registry()
+        self.analysis_store = analysis_store or get_analysis_store()
+        # The theme analyzer keeps per-call state, so concurrent analyses take turns there
+        self._theme_lock = threading.Lock()
+    
+    @property
+    def sentiment_analyzer(self):
+        return self.registry.get('sentiment')
+    
+    @property
+    def emotion_detector(self):
+        return self.registry.get('emotion')
+    
+    @property
+    def text_analyzer(self):
+        return self.registry.get('text_analyzer')
+    
+    @property
+    def theme_analyzer(self):
+        return self.registry.get('theme_analyzer')
     
     def process_content(self, platform: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Process content based on platform"""
@@ -20,6 +47,17 @@ class DataProcessor:
         else:
             return {}
     
+    def iter_comments(self, platform: str, data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Flat comment records of a fetched thread, streamed in traversal order"""
+        if platform == 'reddit' and 'comment_listing' in data:
+            return chain(
+                iter_reddit_comments(data['comment_listing'], order=Config.COMMENT_TRAVERSAL),
+                data.get('expanded_comments', [])
+            )
+        if platform == 'twitter':
+            return iter(data.get('replies', []))
+        return iter(data.get('comments', []))
+    
     def _process_twitter_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Process Twitter/X data"""
         tweet = data.get('data', {})
@@ -30,12 +68,18 @@ class DataProcessor:
         metrics = tweet.get('public_metrics', {})
         author_info = includes.get('users', [{}])[0] if includes.get('users') else {}
         
-        # Clean text for analysis
-        cleaned_text = clean_text(text)
+        # Clean text, entities and readability in one scan
+        features = extract_features(text)
+        cleaned_text = features['cleaned_text']
         
-        # Perform AI analysis
-        sentiment_result = self.sentiment_analyzer.analyze(cleaned_text)
-        emotion_result = self.emotion_detector.detect_emotions(cleaned_text)
+        # The tweet and its conversation replies go through the same pipeline as a Reddit thread
+        post_id = str(tweet['id']) if tweet.get('id') else None
+        post = {'data': tweet, 'includes': includes}
+        text_result, comments = self._process_comments('twitter', post_id, post, cleaned_text, data)
+        comments['pages'] = data.get('replies_meta', {}).get('pages', 0)
+        comments['truncated'] = data.get('replies_meta', {}).get('truncated', False)
+        sentiment_result = text_result['sentiment']
+        emotion_result = text_result['emotion']
         
         # Calculate engagement metrics
         total_engagement = sum([
@@ -74,52 +118,30 @@ class DataProcessor:
             'analysis': {
                 'sentiment': sentiment_result,
                 'emotion': emotion_result,
-                'readability': self._analyze_readability(cleaned_text),
-                'entities': self._extract_entities(text)
+                'readability': features['readability'],
+                'entities': features['entities']
             },
             'location': location_info,
+            'comments': comments,
             'processed_at': datetime.now().isoformat()
         }
     
     def _process_reddit_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Process Reddit data"""
         main_post = data.get('main_post', {})
-        comments = data.get('comments', [])
         
         # Combine title and selftext for analysis
         title = main_post.get('title', '')
         selftext = main_post.get('selftext', '')
         full_text = f"{title}\n{selftext}".strip()
-        cleaned_text = clean_text(full_text)
-        
-        # Perform AI analysis on main post
-        sentiment_result = self.sentiment_analyzer.analyze(cleaned_text)
-        emotion_result = self.emotion_detector.detect_emotions(cleaned_text)
-        
-        # Process comments
-        processed_comments = []
-        for comment in comments[:50]:  # Limit to top 50 comments for performance
-            comment_text = clean_text(comment.get('body', ''))
-            if len(comment_text.split()) >= 3:  # Only process substantial comments
-                comment_sentiment = self.sentiment_analyzer.analyze(comment_text)
-                comment_emotion = self.emotion_detector.detect_emotions(comment_text)
-                
-                processed_comments.append({
-                    'id': comment.get('id'),
-                    'text': comment.get('body', ''),
-                    'cleaned_text': comment_text,
-                    'author': comment.get('author', '[deleted]'),
-                    'score': comment.get('score', 0),
-                    'created_utc': comment.get('created_utc', 0),
-                    'sentiment': comment_sentiment,
-                    'emotion': comment_emotion,
-                    'time_ago': get_time_ago(comment.get('created_utc', 0))
-                })
+        features = extract_features(full_text)
+        cleaned_text = features['cleaned_text']
         
-        # Analyze comment themes
-        theme_analysis = {}
-        if processed_comments:
-            theme_analysis = self.theme_analyzer.analyze_themes(processed_comments)
+        # Stream the whole comment tree and keep the best comments within the budget
+        post_id = str(main_post['id']) if main_post.get('id') else None
+        post_result, comments = self._process_comments('reddit', post_id, main_post, cleaned_text, data)
+        sentiment_result = post_result['sentiment']
+        emotion_result = post_result['emotion']
         
         return {
             'platform': 'reddit',
@@ -144,45 +166,150 @@ class DataProcessor:
             'analysis': {
                 'sentiment': sentiment_result,
                 'emotion': emotion_result,
-                'readability': self._analyze_readability(cleaned_text),
-                'entities': self._extract_entities(full_text)
-            },
-            'comments': {
-                'processed_comments': processed_comments,
-                'total_processed': len(processed_comments),
-                'theme_analysis': theme_analysis,
-                'sentiment_distribution': self._calculate_comment_sentiment_distribution(processed_comments)
+                'readability': features['readability'],
+                'entities': features['entities']
             },
+            'comments': comments,
             'processed_at': datetime.now().isoformat()
         }
     
-    def _analyze_readability(self, text: str) -> Dict[str, Any]:
-        """Analyze text readability"""
-        if not text:
-            return {'word_count': 0, 'sentence_count': 0, 'avg_words_per_sentence': 0, 'reading_time': 0}
+    def _process_comments(self, platform: str, post_id: Optional[str], post: Dict[str, Any],
+                          cleaned_text: str, data: Dict[str, Any]):
+        """Select, dedup, analyze and theme a thread's comments; returns the post's result and the comments section"""
+        comment_stream = self.iter_comments(platform, data)
         
-        words = text.split()
-        sentences = max(1, text.count('.') + text.count('!') + text.count('?'))
+        seen = {'comments': 0}
         
-        return {
-            'word_count': len(words),
-            'sentence_count': sentences,
-            'avg_words_per_sentence': round(len(words) / sentences, 1),
-            'character_count': len(text),
-            'reading_time': max(1, len(words) // 200)  # Assuming 200 WPM
+        def prepare_comment(comment: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            seen['comments'] += 1
+            comment_text = clean_text(comment.get('body', ''))
+            if len(comment_text.split()) < 3:  # Only process substantial comments
+                return None
+            return {**comment, 'cleaned_text': comment_text}
+        
+        with span('comments.select'):
+            selected_comments = select_comments(
+                comment_stream, Config.COMMENT_BUDGET, Config.COMMENT_PRIORITY, prepare=prepare_comment
+            )
+        comment_texts = [comment['cleaned_text'] for comment in selected_comments]
+        with span('comments.features'):
+            comment_features = extract_features_batch(comment.get('body', '') for comment in selected_comments)
+        
+        # Copypasta, bot replies and repeated one-liners: each near-duplicate group is inferred once
+        with span('dedup'):
+            if Config.DEDUP_COMMENTS:
+                duplicate_of = group_near_duplicates(comment_texts)
+            else:
+                duplicate_of = np.arange(len(comment_texts), dtype=np.int64)
+        
+        # Analyze the post and the new or edited comments with one shared tokenization pass
+        post_result, comment_results, delta = self._analyze_comment_delta(
+            platform, post_id, post, cleaned_text, selected_comments, duplicate_of
+        )
+        
+        # Columnar storage: comment dicts are only built on demand when a row is read
+        with span('comments.store'):
+            processed_comments = CommentStore.from_results(
+                selected_comments, comment_texts, comment_results, duplicate_of, comment_features
+            ).view()
+        
+        # Analyze comment themes
+        theme_analysis = {}
+        near_duplicates = []
+        with self._theme_lock:
+            if processed_comments:
+                stream_key = f"{platform}:{post_id}" if post_id else None
+                with span('themes'):
+                    theme_analysis = self.theme_analyzer.analyze_themes(processed_comments, stream_key=stream_key)
+            
+            if processed_comments and Config.THEME_ENGINE == 'embedding':
+                with span('near_duplicates'):
+                    near_duplicates = self._find_near_duplicates(processed_comments)
+            elif processed_comments:
+                near_duplicates = self._collapsed_duplicates(processed_comments)
+        
+        return post_result, {
+            'processed_comments': processed_comments,
+            'total_processed': len(processed_comments),
+            'total_seen': seen['comments'],
+            'theme_analysis': theme_analysis,
+            'near_duplicates': near_duplicates,
+            'entities': summarize_entities(comment_features),
+            'delta': delta,
+            'thread_totals': self.analysis_store.thread_summary(platform, post_id) if self.analysis_store and post_id else None,
+            'sentiment_distribution': processed_comments.sentiment_distribution()
         }
     
-    def _extract_entities(self, text: str) -> Dict[str, List[str]]:
-        """Extract entities from text"""
-        import re
+    def _analyze_comment_delta(self, platform: str, post_id: Optional[str], post: Dict[str, Any],
+                               cleaned_text: str, comments: List[Dict[str, Any]], duplicate_of: np.ndarray):
+        """Run the models on the post and on one comment per near-duplicate group not already stored"""
+        store = self.analysis_store if post_id else None
+        known = {}
+        if store:
+            delta = {'revisit': store.save_post(platform, post_id, post)}
+            known = store.get_comment_results(platform, comments)
+        else:
+            delta = {'revisit': False}
         
-        return {
-            'hashtags': re.findall(r'#(\w+)', text),
-            'mentions': re.findall(r'@(\w+)', text),
-            'urls': re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', text),
-            'emails': re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text),
-            'phone_numbers': re.findall(r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b', text)
-        }
+        # A stored result stands in for its whole group; otherwise the group's first pending member is inferred
+        group_results: Dict[int, Dict[str, Any]] = {}
+        for comment, representative in zip(comments, duplicate_of.tolist()):
+            if str(comment.get('id')) in known:
+                group_results.setdefault(representative, known[str(comment.get('id'))])
+        pending = [i for i, comment in enumerate(comments) if str(comment.get('id')) not in known]
+        infer: Dict[int, int] = {}
+        for i in pending:
+            if int(duplicate_of[i]) not in group_results:
+                infer.setdefault(int(duplicate_of[i]), i)
+        
+        text_results = self.text_analyzer.analyze_batch(
+            [cleaned_text] + [comments[i]['cleaned_text'] for i in infer.values()], clean=False
+        )
+        group_results.update(zip(infer, text_results[1:]))
+        comment_results = [
+            known.get(str(comment.get('id'))) or group_results[representative]
+            for comment, representative in zip(comments, duplicate_of.tolist())
+        ]
+        
+        collapsed = len(pending) - len(infer)
+        metrics.increment('comments_collapsed_total', collapsed)
+        delta.update({
+            'analyzed': len(infer), 'collapsed': collapsed, 'reused': len(comments) - len(pending),
+            'new': 0, 'edited': 0
+        })
+        if store:
+            delta.update(store.save_comment_results(
+                platform, post_id, [comments[i] for i in pending], [comment_results[i] for i in pending]
+            ))
+        return text_results[0], comment_results, delta
+    
+    def _find_near_duplicates(self, comments: CommentView) -> List[Dict[str, Any]]:
+        """Groups of near-identical comments, reusing the embeddings cached by the theme engine"""
+        embedder = self.theme_analyzer.embedder
+        embeddings = embedder.encode(comments.cleaned_texts.tolist())
+        if embeddings is None:
+            return []
+        ids, texts = comments.ids, comments.texts
+        return [
+            {
+                'comment_ids': ids[group].tolist(),
+                'count': len(group),
+                'text': texts[group[0]]
+            }
+            for group in embedder.near_duplicates(embeddings)
+        ]
+    
+    def _collapsed_duplicates(self, comments: CommentView) -> List[Dict[str, Any]]:
+        """Near-duplicate groups found by the MinHash pass, in the same shape as _find_near_duplicates"""
+        ids, texts = comments.ids, comments.texts
+        return [
+            {
+                'comment_ids': ids[group].tolist(),
+                'count': len(group),
+                'text': texts[group[0]]
+            }
+            for group in comments.duplicate_groups()
+        ]
     
     def _calculate_engagement_rate(self, total_engagement: int, followers: int) -> float:
         """Calculate engagement rate"""
@@ -190,16 +317,6 @@ class DataProcessor:
             return 0.0
         return round((total_engagement / followers) * 100, 2)
     
-    def _calculate_comment_sentiment_distribution(self, comments: List[Dict]) -> Dict[str, int]:
-        """Calculate sentiment distribution across comments"""
-        distribution = {'POSITIVE': 0, 'NEGATIVE': 0, 'NEUTRAL': 0}
-        
-        for comment in comments:
-            sentiment = comment.get('sentiment', {}).get('sentiment', 'NEUTRAL')
-            distribution[sentiment] = distribution.get(sentiment, 0) + 1
-        
-        return distribution
-    
     def _process_location(self, location_string: str) -> Dict[str, Any]:
         """Process location information"""
         if not location_string:
@@ -0,0 +1,171 @@
+import copy
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from app.config import Config
+
+class FetchCache:
+    """Fetched post payloads keyed on (platform, post_id), with per-platform TTLs and an optional SQLite tier"""
+
+    def __init__(self, max_size: Optional[int] = None, disk_path: Optional[str] = None,
+                 ttls: Optional[Dict[str, float]] = None):
+        self.max_size = max_size if max_size is not None else Config.FETCH_CACHE_SIZE
+        self.ttls = ttls if ttls is not None else {
+            'twitter': Config.FETCH_CACHE_TTL_TWITTER,
+            'reddit': Config.FETCH_CACHE_TTL_REDDIT
+        }
+        self.disk_path = disk_path
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        if disk_path:
+            self._open_disk(disk_path)
+
+    @staticmethod
+    def make_key(platform: str, post_id: str) -> str:
+        return f"{platform}:{post_id}"
+
+    def get(self, platform: str, post_id: str) -> Optional[Dict[str, Any]]:
+        """Cached entry ({'data', 'validators', 'fetched_at'}), fresh or not; None if never fetched"""
+        key = self.make_key(platform, post_id)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            if entry is None or (self._disk is not None and not self.is_fresh(platform, entry)):
+                # Another replica sharing the disk tier may have refreshed the post since
+                stored = self._disk_get(key)
+                if stored is not None and (entry is None or stored['fetched_at'] > entry['fetched_at']):
+                    entry = stored
+                    self._memory_set(key, entry)
+            return copy.deepcopy(entry) if entry is not None else None
+
+    def is_fresh(self, platform: str, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry['fetched_at'] < self.ttls.get(platform, 0)
+
+    def has_fresh(self, platform: str, post_id: str) -> bool:
+        """Whether a fresh entry exists, without copying its payload"""
+        key = self.make_key(platform, post_id)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                return self.is_fresh(platform, entry)
+            if self._disk is None:
+                return False
+            try:
+                row = self._disk.execute("SELECT fetched_at FROM fetch_cache WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                print(f"❌ Error reading fetch cache: {e}")
+                return False
+            return row is not None and self.is_fresh(platform, {'fetched_at': row[0]})
+
+    def set(self, platform: str, post_id: str, data: Dict[str, Any],
+            validators: Optional[Dict[str, str]] = None) -> None:
+        if self.max_size <= 0 and self._disk is None:
+            return
+        entry = {'data': data, 'validators': validators, 'fetched_at': time.time()}
+        key = self.make_key(platform, post_id)
+        with self._lock:
+            self._memory_set(key, copy.deepcopy(entry))
+            self._disk_set(key, entry)
+
+    def touch(self, platform: str, post_id: str) -> None:
+        """Restart the TTL after the API confirmed the cached payload is unchanged (304)"""
+        key = self.make_key(platform, post_id)
+        now = time.time()
+        with self._lock:
+            if key in self._memory:
+                self._memory[key]['fetched_at'] = now
+            if self._disk is not None:
+                try:
+                    self._disk.execute("UPDATE fetch_cache SET fetched_at = ? WHERE key = ?", (now, key))
+                    self._disk.commit()
+                except sqlite3.Error as e:
+                    print(f"❌ Error writing fetch cache: {e}")
+
+    def record(self, result: str) -> None:
+        """Count one lookup as 'hit', 'revalidated' or 'miss'"""
+        with self._lock:
+            if result == 'hit':
+                self.hits += 1
+            elif result == 'revalidated':
+                self.revalidated += 1
+            else:
+                self.misses += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.revalidated = self.misses = 0
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM fetch_cache")
+                self._disk.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/revalidation/miss counters and current size"""
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'hit_rate': round((self.hits + self.revalidated) / lookups, 3) if lookups else 0.0,
+            'size': len(self._memory),
+            'max_size': self.max_size,
+            'ttls': dict(self.ttls),
+            'disk_enabled': self._disk is not None
+        }
+
+    def _memory_set(self, key: str, entry: Dict[str, Any]) -> None:
+        if self.max_size <= 0:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def _open_disk(self, path: str) -> None:
+        try:
+            # Several app replicas can point at the same file; WAL lets them read while one writes
+            self._disk = sqlite3.connect(path, check_same_thread=False, timeout=10)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS fetch_cache ("
+                "key TEXT PRIMARY KEY, data TEXT NOT NULL, validators TEXT, fetched_at REAL NOT NULL)"
+            )
+            self._disk.commit()
+        except sqlite3.Error as e:
+            print(f"❌ Error opening fetch cache at {path}: {e}")
+            self._disk = None
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._disk is None:
+            return None
+        try:
+            row = self._disk.execute(
+                "SELECT data, validators, fetched_at FROM fetch_cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"❌ Error reading fetch cache: {e}")
+            return None
+        if row is None:
+            return None
+        return {'data': json.loads(row[0]), 'validators': json.loads(row[1]) if row[1] else None, 'fetched_at': row[2]}
+
+    def _disk_set(self, key: str, entry: Dict[str, Any]) -> None:
+        if self._disk is None:
+            return
+        try:
+            self._disk.execute(
+                "INSERT OR REPLACE INTO fetch_cache (key, data, validators, fetched_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(entry['data']), json.dumps(entry['validators']) if entry['validators'] else None,
+                 entry['fetched_at'])
+            )
+            self._disk.commit()
+        except (sqlite3.Error, TypeError) as e:
+            print(f"❌ Error writing fetch cache: {e}")
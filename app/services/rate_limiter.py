@@ -0,0 +1,69 @@
+import asyncio
+import time
+from typing import Mapping, Optional
+
+class TokenBucket:
+    """Async token-bucket limiter that also follows the server's rate-limit response headers"""
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = max(1, capacity)
+        self.period = period
+        self.refill_rate = self.capacity / period
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent and consume one token"""
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def _reserve(self) -> float:
+        # Runs on a single event loop with no await inside, so no lock is needed
+        now = time.monotonic()
+        self._refill(now)
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.refill_rate
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        self.updated = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Sync with X (x-rate-limit-*) or Reddit (x-ratelimit-*) rate-limit headers"""
+        remaining = _header_float(headers, 'x-rate-limit-remaining', 'x-ratelimit-remaining')
+        reset = _header_float(headers, 'x-rate-limit-reset', 'x-ratelimit-reset')
+        if remaining is None:
+            return
+
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = min(self.tokens, remaining)
+        if remaining < 1 and reset is not None:
+            # X sends an epoch timestamp, Reddit sends seconds until the window resets
+            delay = reset - time.time() if reset > 1_000_000_000 else reset
+            self.block_for(delay)
+
+    def block_for(self, seconds: Optional[float]) -> None:
+        """Pause all requests, e.g. after a 429 with Retry-After"""
+        seconds = self.period / self.capacity if seconds is None else max(0.0, seconds)
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+def _header_float(headers: Mapping[str, str], *names: str) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
@@ -0,0 +1,287 @@
+import argparse
+import asyncio
+import json
+import threading
+import time
+from collections import Counter, deque
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, ContextManager
+from app.config import Config
+from app.models.dedup import group_near_duplicates
+from app.models.registry import get_model_registry
+from app.services.analysis_store import AnalysisStore
+from app.services.api_client import SocialAPIClient
+from app.services.comment_stream import select_comments
+from app.services.data_processor import DataProcessor
+from app.utils.helpers import clean_text, get_time_ago
+
+SENTIMENT_VALUES = {'POSITIVE': 1, 'NEUTRAL': 0, 'NEGATIVE': -1}
+
+class ThreadMonitor:
+    """Polls one thread and runs the models only on comments that are new or edited since the last poll"""
+
+    def __init__(self, url: str, api_client: SocialAPIClient, data_processor: DataProcessor,
+                 inference_guard: Optional[Callable[[], ContextManager]] = None):
+        self.url = url
+        self.api_client = api_client
+        self.data_processor = data_processor
+        # Resolved on every poll: whether a lock is needed depends on the inference pool, which may start later
+        self.inference_guard = inference_guard
+        self.platform: Optional[str] = None
+        self.versions: Dict[str, str] = {}  # comment id -> version already analyzed
+        self.validators: Dict[str, str] = {}  # ETag / Last-Modified of this monitor's last poll
+        self.entries: Dict[str, Dict[str, Any]] = {}  # comment id -> compact analyzed record
+        self.evicted_before = 0.0  # comments created at or before this were analyzed and dropped
+        self.history = deque(maxlen=Config.MONITOR_HISTORY)
+        self.polls = 0
+        self.started_at = time.time()
+        self.last_polled = time.monotonic()
+
+    def poll(self) -> Dict[str, Any]:
+        """Synchronous entry point used by the UI, the server and the CLI"""
+        return self.api_client.run(self.poll_async())
+
+    async def poll_async(self) -> Dict[str, Any]:
+        """Fetch conditionally, analyze the delta and return the updated snapshot"""
+        started = time.perf_counter()
+        platform, data, modified = await self.api_client.poll_content_async(self.url, self.validators)
+        self.platform = platform or self.platform
+        self.polls += 1
+
+        snapshot = {
+            'url': self.url,
+            'platform': self.platform,
+            'poll': self.polls,
+            'polled_at': datetime.now().isoformat(),
+            'modified': modified,
+            'error': None,
+            'new_comments': 0,
+            'edited_comments': 0,
+            'post': self.history[-1]['post'] if self.history else {}
+        }
+
+        if not self.platform:
+            snapshot['error'] = "unsupported or malformed URL"
+        elif modified and data is None:
+            snapshot['error'] = "fetch failed"
+        elif modified:
+            snapshot['post'] = self._post_metrics(platform, data)
+            # Inference runs off the client's event loop so other fetches keep flowing
+            loop = asyncio.get_running_loop()
+            snapshot.update(await loop.run_in_executor(None, self._analyze_delta, platform, data))
+
+        snapshot['seconds'] = round(time.perf_counter() - started, 3)
+        snapshot['tracked_comments'] = len(self.entries)
+        snapshot['windows'] = self.windows()
+        self.history.append(snapshot)
+        return {**snapshot, 'timeline': self.timeline()}
+
+    def run(self, interval: Optional[float] = None, max_polls: Optional[int] = None,
+            on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+            stop_event: Optional[threading.Event] = None) -> None:
+        """Poll on a fixed schedule until max_polls is reached or stop_event is set"""
+        interval = interval or Config.MONITOR_INTERVAL
+        stop_event = stop_event or threading.Event()
+        polls = 0
+        while not stop_event.is_set() and (max_polls is None or polls < max_polls):
+            started = time.monotonic()
+            snapshot = self.poll()
+            polls += 1
+            if on_update:
+                on_update(snapshot)
+            stop_event.wait(max(0.0, interval - (time.monotonic() - started)))
+
+    def windows(self, now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Rolling sentiment/emotion summaries over comments created in the last N minutes"""
+        now = now or time.time()
+        windows = {}
+        for minutes in Config.MONITOR_WINDOWS:
+            since = now - minutes * 60
+            recent = [entry for entry in self.entries.values() if entry['created_utc'] >= since]
+            windows[f"{minutes}m"] = self._summarize(recent)
+        windows['all'] = self._summarize(list(self.entries.values()))
+        return windows
+
+    def timeline(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Latest analyzed comments in the shape Visualizer.create_sentiment_timeline expects"""
+        limit = limit or Config.MONITOR_TIMELINE_SIZE
+        entries = sorted(self.entries.values(), key=lambda entry: entry['created_utc'])[-limit:]
+        return [
+            {
+                'id': entry['id'],
+                'created_utc': entry['created_utc'],
+                'time_ago': get_time_ago(int(entry['created_utc'])),
+                'score': entry['score'],
+                'sentiment': {'sentiment': entry['sentiment']},
+                'emotion': {'dominant_emotion': entry['emotion']}
+            }
+            for entry in entries
+        ]
+
+    def _analyze_delta(self, platform: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        def prepare(comment: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            if not comment.get('id'):
+                return None
+            if float(comment.get('created_utc', 0) or 0) <= self.evicted_before:
+                return None
+            version = AnalysisStore.comment_version(comment)
+            if self.versions.get(str(comment['id'])) == version:
+                return None
+            comment_text = clean_text(comment.get('body', comment.get('text', '')))
+            if len(comment_text.split()) < 3:
+                return None
+            return {**comment, 'cleaned_text': comment_text, 'version': version}
+
+        # Unselected comments stay unversioned, so a later poll can still pick them up
+        fresh = select_comments(
+            self.data_processor.iter_comments(platform, data), Config.COMMENT_BUDGET,
+            Config.COMMENT_PRIORITY, prepare=prepare
+        )
+        if not fresh:
+            return {}
+
+        # Bot floods arrive as bursts of near-identical replies; each group is inferred once
+        texts = [comment['cleaned_text'] for comment in fresh]
+        duplicate_of = group_near_duplicates(texts).tolist() if Config.DEDUP_COMMENTS else list(range(len(texts)))
+        representatives = list(dict.fromkeys(duplicate_of))
+        with self.inference_guard() if self.inference_guard else nullcontext():
+            unique_results = self.data_processor.text_analyzer.analyze_batch(
+                [texts[i] for i in representatives], clean=False
+            )
+        results_by_group = dict(zip(representatives, unique_results))
+        results = [results_by_group[representative] for representative in duplicate_of]
+
+        edited = 0
+        for comment, result in zip(fresh, results):
+            comment_id = str(comment['id'])
+            edited += comment_id in self.versions
+            self.versions[comment_id] = comment['version']
+            self.entries[comment_id] = {
+                'id': comment_id,
+                'created_utc': float(comment.get('created_utc', 0) or 0),
+                'score': comment.get('score', 0),
+                'sentiment': result['sentiment'].get('sentiment', 'NEUTRAL'),
+                'emotion': result['emotion'].get('dominant_emotion', 'neutral')
+            }
+        self._evict()
+        return {'new_comments': len(fresh) - edited, 'edited_comments': edited}
+
+    def _evict(self) -> None:
+        # Keep the most recent comments and their versions; a creation-time watermark stops the
+        # dropped ones from being analyzed again, so memory stays bounded by MONITOR_MAX_COMMENTS
+        overflow = len(self.entries) - Config.MONITOR_MAX_COMMENTS
+        if overflow > 0:
+            oldest = sorted(self.entries.values(), key=lambda entry: entry['created_utc'])[:overflow]
+            for entry in oldest:
+                del self.entries[entry['id']]
+                self.versions.pop(entry['id'], None)
+            self.evicted_before = max(self.evicted_before, oldest[-1]['created_utc'])
+
+    def _summarize(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        sentiments = Counter(entry['sentiment'] for entry in entries)
+        emotions = Counter(entry['emotion'] for entry in entries)
+        mean = sum(SENTIMENT_VALUES.get(label, 0) * count for label, count in sentiments.items())
+        return {
+            'comments': len(entries),
+            'sentiment_distribution': dict(sentiments),
+            'emotion_distribution': dict(emotions.most_common()),
+            'mean_sentiment': round(mean / len(entries), 3) if entries else 0.0
+        }
+
+    def _post_metrics(self, platform: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        if platform == 'reddit':
+            post = data.get('main_post', {})
+            return {
+                'score': post.get('score', 0),
+                'upvote_ratio': post.get('upvote_ratio', 0),
+                'num_comments': post.get('num_comments', 0)
+            }
+        metrics = data.get('data', {}).get('public_metrics', {})
+        return {
+            'likes': metrics.get('like_count', 0),
+            'retweets': metrics.get('retweet_count', 0),
+            'replies': metrics.get('reply_count', 0)
+        }
+
+class BackgroundWatch:
+    """Runs a poll callable on a daemon thread; the UI redraws from `read()` as polls land"""
+
+    def __init__(self, poll: Callable[[], Dict[str, Any]], interval: float, max_polls: Optional[int] = None,
+                 unread_timeout: Optional[float] = None, on_expire: Optional[Callable[[], None]] = None):
+        self.poll = poll
+        self.interval = interval
+        self.max_polls = max_polls if max_polls is not None else Config.MONITOR_MAX_POLLS
+        self.unread_timeout = unread_timeout if unread_timeout is not None else Config.MONITOR_UNREAD_TIMEOUT
+        self.on_expire = on_expire  # called when the watch ends on its own rather than through stop()
+        self.latest: Optional[Dict[str, Any]] = None
+        self.polls = 0
+        self.last_read = time.monotonic()
+        self._stop_event = threading.Event()
+        self._updated = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="thread-watch", daemon=True)
+        self._thread.start()
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Latest snapshot; reading it is what keeps the watch polling"""
+        self.last_read = time.monotonic()
+        return self.latest
+
+    def wait_for_update(self, timeout: float) -> bool:
+        """Block up to `timeout` seconds for the next poll or the end of the watch; True if one happened"""
+        updated = self._updated.wait(timeout)
+        self._updated.clear()
+        return updated
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _run(self) -> None:
+        try:
+            while not self._stop_event.is_set() and self.polls < self.max_polls:
+                # A closed browser tab stops reading; don't keep its monitor alive until max_polls
+                if time.monotonic() - self.last_read > self.unread_timeout:
+                    break
+                started = time.monotonic()
+                try:
+                    self.latest = self.poll()
+                except Exception as e:
+                    print(f"❌ Error polling watched thread: {e}")
+                self.polls += 1
+                self._updated.set()
+                self._stop_event.wait(max(0.0, self.interval - (time.monotonic() - started)))
+        finally:
+            self._updated.set()
+            if not self._stop_event.is_set() and self.on_expire:
+                self.on_expire()
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a Reddit/X thread and analyze new comments as they arrive")
+    parser.add_argument("url")
+    parser.add_argument("--interval", type=float, default=Config.MONITOR_INTERVAL, help="Seconds between polls")
+    parser.add_argument("--polls", type=int, default=None, help="Stop after this many polls")
+    args = parser.parse_args()
+
+    # Fork any inference workers before the client's event-loop thread starts
+    get_model_registry().start_pool()
+    api_client = SocialAPIClient()
+    monitor = ThreadMonitor(args.url, api_client, DataProcessor())
+
+    def report(snapshot: Dict[str, Any]) -> None:
+        status = "unchanged" if not snapshot['modified'] else f"+{snapshot['new_comments']} new, {snapshot['edited_comments']} edited"
+        print(f"[{snapshot['polled_at']}] poll {snapshot['poll']}: {status} ({snapshot['seconds']}s)")
+        print(json.dumps(snapshot['windows'], indent=2))
+
+    try:
+        monitor.run(args.interval, args.polls, report)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api_client.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import asyncio
+import time
+from typing import Dict, Any, Awaitable, Callable, Iterable, List, Optional, Set, Tuple
+
+MAX_IDS_PER_LOOKUP = 100  # /2/tweets accepts at most 100 ids per call
+
+class TweetLookupCoalescer:
+    """Collects tweet ids requested around the same time into shared /2/tweets?ids= calls"""
+
+    def __init__(self, fetch_batch: Callable[[List[str]], Awaitable[Dict[str, Optional[Dict[str, Any]]]]],
+                 window: float = 0.02, batch_size: int = MAX_IDS_PER_LOOKUP, hold_for: float = 300.0):
+        self.fetch_batch = fetch_batch
+        self.window = window
+        self.batch_size = max(1, min(MAX_IDS_PER_LOOKUP, batch_size))
+        self.hold_for = hold_for
+        # Must only be used from the event loop it runs on, so no lock is needed
+        self._queued: Dict[str, asyncio.Future] = {}
+        self._futures: Dict[str, asyncio.Future] = {}  # queued or in flight; dropped once the batch returns
+        self._unclaimed: Set[str] = set()  # prefetched ids no lookup has asked for yet
+        # Prefetched results that arrived before their lookup: id -> (arrived, payload), kept up to hold_for seconds
+        self._held: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def submit(self, tweet_id: str) -> asyncio.Future:
+        """Queue one id; a full batch is sent at once, a partial one after `window` seconds"""
+        future = self._futures.get(tweet_id)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # A prefetched id nobody awaits would otherwise log "exception was never retrieved"
+        future.add_done_callback(_consume_exception)
+        self._futures[tweet_id] = future
+        self._queued[tweet_id] = future
+        if len(self._queued) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return future
+
+    def prefetch(self, tweet_ids: Iterable[str]) -> None:
+        """Queue many ids up front, so a bulk run fills whole batches before its fetches are awaited"""
+        for tweet_id in tweet_ids:
+            if tweet_id not in self._futures and tweet_id not in self._held:
+                self._unclaimed.add(tweet_id)
+                self.submit(tweet_id)
+
+    async def lookup(self, tweet_id: str) -> Optional[Dict[str, Any]]:
+        """Single-tweet payload in the /2/tweets/{id} shape, or None if the API did not return it"""
+        self._unclaimed.discard(tweet_id)
+        held = self._held.pop(tweet_id, None)
+        if held is not None and time.monotonic() - held[0] < self.hold_for:
+            return held[1]
+        # Shielded, so a cancelled caller does not cancel the lookup for others waiting on the same id
+        return await asyncio.shield(self.submit(tweet_id))
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._queued = self._queued, {}
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: Dict[str, asyncio.Future]) -> None:
+        try:
+            payloads = await self.fetch_batch(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            payloads = None
+        else:
+            for tweet_id, future in batch.items():
+                if not future.done():
+                    future.set_result(payloads.get(tweet_id))
+
+        # Waiters already hold their futures; only results nobody has asked for yet are kept, and only
+        # for hold_for seconds. A failed prefetch is not kept, so its lookup simply tries again
+        now = time.monotonic()
+        for tweet_id, future in batch.items():
+            if self._futures.get(tweet_id) is future:
+                del self._futures[tweet_id]
+            if tweet_id in self._unclaimed:
+                self._unclaimed.discard(tweet_id)
+                if payloads is not None:
+                    self._held[tweet_id] = (now, payloads.get(tweet_id))
+        for tweet_id in [tweet_id for tweet_id, (arrived, _) in self._held.items() if now - arrived >= self.hold_for]:
+            del self._held[tweet_id]
+
+def _consume_exception(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+def split_tweet_lookup(payload: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Break a multi-tweet lookup into per-tweet payloads, each with only its own author and place"""
+    includes = payload.get('includes', {})
+    users = {user['id']: user for user in includes.get('users', [])}
+    places = {place['id']: place for place in includes.get('places', [])}
+
+    tweets = {}
+    for tweet in payload.get('data', []):
+        tweet_includes: Dict[str, List[Dict[str, Any]]] = {}
+        if tweet.get('author_id') in users:
+            tweet_includes['users'] = [users[tweet['author_id']]]
+        place_id = tweet.get('geo', {}).get('place_id')
+        if place_id in places:
+            tweet_includes['places'] = [places[place_id]]
+        tweets[str(tweet['id'])] = {'data': tweet, 'includes': tweet_includes}
+    return tweets
@@ -3,8 +3,10 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 import streamlit as st
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
+from app.models.comment_store import CommentView
 from app.utils.constants import COLORS, EMOTION_EMOJIS, SENTIMENT_EMOJIS, THEME_CATEGORIES
+from app.utils.metrics import timed
 
 class Visualizer:
     def __init__(self):
@@ -25,6 +27,7 @@ class Visualizer:
             'staticPlot': False
         }
     
+    @timed('render.sentiment_gauge')
     def create_sentiment_gauge(self, sentiment_data: Dict[str, Any]) -> go.Figure:
         """Create sentiment confidence gauge"""
         confidence = sentiment_data.get('confidence', 0)
@@ -67,6 +70,7 @@ class Visualizer:
         
         return fig
     
+    @timed('render.emotion_radar')
     def create_emotion_radar(self, emotion_data: Dict[str, Any]) -> go.Figure:
         """Create emotion radar chart"""
         emotions = emotion_data.get('all_emotions', {})
@@ -113,6 +117,7 @@ class Visualizer:
         
         return fig
     
+    @timed('render.engagement_metrics')
     def create_engagement_metrics(self, metrics: Dict[str, Any], platform: str) -> go.Figure:
         """Create engagement metrics visualization"""
         if platform == 'twitter':
@@ -154,6 +159,7 @@ class Visualizer:
         
         return fig
     
+    @timed('render.theme_distribution')
     def create_theme_distribution(self, theme_data: Dict[str, Any]) -> go.Figure:
         """Create theme distribution chart"""
         if not theme_data:
@@ -195,7 +201,8 @@ class Visualizer:
         
         return fig
     
-    def create_sentiment_timeline(self, comments: List[Dict[str, Any]]) -> go.Figure:
+    @timed('render.sentiment_timeline')
+    def create_sentiment_timeline(self, comments: Union[CommentView, List[Dict[str, Any]]]) -> go.Figure:
         """Create sentiment timeline for comments"""
         if not comments:
             return self._create_empty_chart("No comment data available")
@@ -205,18 +212,25 @@ class Visualizer:
         sentiments = []
         scores = []
         
-        for comment in sorted(comments, key=lambda x: x.get('created_utc', 0)):
-            timestamps.append(comment.get('time_ago', 'Unknown'))
-            sentiment = comment.get('sentiment', {}).get('sentiment', 'NEUTRAL')
-            sentiments.append(sentiment)
-            
-            # Convert sentiment to score
-            sentiment_score = {
-                'POSITIVE': 1,
-                'NEUTRAL': 0,
-                'NEGATIVE': -1
-            }.get(sentiment, 0)
-            scores.append(sentiment_score)
+        if isinstance(comments, CommentView):
+            # Columnar comments are sorted and scored without building per-comment dicts
+            timeline = comments.timeline()
+            timestamps = timeline['time_ago']
+            sentiments = timeline['sentiments'].tolist()
+            scores = timeline['values'].tolist()
+        else:
+            for comment in sorted(comments, key=lambda x: x.get('created_utc', 0)):
+                timestamps.append(comment.get('time_ago', 'Unknown'))
+                sentiment = comment.get('sentiment', {}).get('sentiment', 'NEUTRAL')
+                sentiments.append(sentiment)
+                
+                # Convert sentiment to score
+                sentiment_score = {
+                    'POSITIVE': 1,
+                    'NEUTRAL': 0,
+                    'NEGATIVE': -1
+                }.get(sentiment, 0)
+                scores.append(sentiment_score)
         
         # Create color mapping
         colors = [
@@ -256,6 +270,7 @@ class Visualizer:
         
         return fig
     
+    @timed('render.metrics_dashboard')
     def create_metrics_dashboard(self, processed_data: Dict[str, Any]) -> go.Figure:
         """Create comprehensive metrics dashboard"""
         metrics = processed_data.get('metrics', {})
@@ -346,6 +361,37 @@ class Visualizer:
         
         return fig
     
+    @timed('render.stage_breakdown')
+    def create_stage_breakdown(self, spans: List[Dict[str, Any]]) -> go.Figure:
+        """Create per-stage timing chart from a trace's spans"""
+        # Top-level stages only; dotted names (fetch.http) are parts of their parent stage
+        stages = [span for span in spans if '.' not in span['name']]
+        if not stages:
+            return self._create_empty_chart("No timing data available")
+        
+        fig = go.Figure(data=[
+            go.Bar(
+                x=[span['seconds'] for span in stages],
+                y=[span['name'] for span in stages],
+                orientation='h',
+                marker_color=self.colors['primary'],
+                text=[f"{span['seconds']:.2f}s" for span in stages],
+                textposition='auto'
+            )
+        ])
+        
+        fig.update_layout(
+            title="⏱️ Time per Stage",
+            xaxis_title="Seconds",
+            yaxis={'autorange': 'reversed'},
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font={'color': 'white', 'size': 12},
+            height=300
+        )
+        
+        return fig
+    
     def _create_empty_chart(self, message: str) -> go.Figure:
         """Create empty chart with message"""
         fig = go.Figure()
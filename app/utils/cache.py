@@ -0,0 +1,142 @@
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+from app.config import Config
+
+def normalize_cache_text(text: str) -> str:
+    """Normalize cleaned text so trivially different copies share a cache entry"""
+    text = unicodedata.normalize('NFKC', text or '')
+    return ' '.join(text.split())
+
+class InferenceCache:
+    """Content-addressed LRU cache for model outputs with an optional SQLite disk tier"""
+
+    def __init__(self, max_size: Optional[int] = None, disk_path: Optional[str] = None):
+        self.max_size = max_size if max_size is not None else Config.CACHE_SIZE
+        self.disk_path = disk_path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        if disk_path:
+            self._open_disk(disk_path)
+
+    @staticmethod
+    def make_key(model_name: str, revision: str, text: str) -> str:
+        """Build a cache key from model identity and the normalized text hash"""
+        digest = hashlib.sha256(normalize_cache_text(text).encode('utf-8')).hexdigest()
+        return f"{model_name}@{revision}:{digest}"
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._memory[key])
+
+            value = self._disk_get(key)
+            if value is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self._memory_set(key, value)
+                return copy.deepcopy(value)
+
+            self.misses += 1
+            return None
+
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._memory_set(key, copy.deepcopy(value))
+            self._disk_set(key, value)
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        with self._lock:
+            for key, value in items.items():
+                self._memory_set(key, copy.deepcopy(value))
+            self._disk_set_many(items)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.disk_hits = self.misses = 0
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM inference_cache")
+                self._disk.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'size': len(self._memory),
+            'max_size': self.max_size,
+            'disk_enabled': self._disk is not None
+        }
+
+    def _memory_set(self, key: str, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def _open_disk(self, path: str) -> None:
+        try:
+            self._disk = sqlite3.connect(path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS inference_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._disk.commit()
+        except sqlite3.Error as e:
+            print(f"❌ Error opening inference cache at {path}: {e}")
+            self._disk = None
+
+    def _disk_get(self, key: str) -> Optional[Any]:
+        if self._disk is None:
+            return None
+        try:
+            row = self._disk.execute("SELECT value FROM inference_cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"❌ Error reading inference cache: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _disk_set(self, key: str, value: Any) -> None:
+        self._disk_set_many({key: value})
+
+    def _disk_set_many(self, items: Dict[str, Any]) -> None:
+        if self._disk is None or not items:
+            return
+        try:
+            self._disk.executemany(
+                "INSERT OR REPLACE INTO inference_cache (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in items.items()]
+            )
+            self._disk.commit()
+        except (sqlite3.Error, TypeError) as e:
+            print(f"❌ Error writing inference cache: {e}")
+
+_shared_cache: Optional[InferenceCache] = None
+_shared_cache_lock = threading.Lock()
+
+def get_inference_cache() -> InferenceCache:
+    """Process-wide cache shared by all model wrappers"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = InferenceCache(Config.CACHE_SIZE, Config.CACHE_DB_PATH)
+        return _shared_cache
@@ -1,7 +1,7 @@
 import re
 from datetime import datetime
-from typing import Optional, Tuple
-import streamlit as st
+from typing import Any, Optional, Tuple
+from app.utils.text_features import URL_PATTERN
 
 def extract_social_url_info(url: str) -> Tuple[Optional[str], Optional[str]]:
     """Extract platform and post ID from social media URL"""
@@ -28,7 +28,8 @@ def extract_social_url_info(url: str) -> Tuple[Optional[str], Optional[str]]:
     for pattern in reddit_patterns:
         match = re.search(pattern, url, re.IGNORECASE)
         if match:
-            return 'reddit', match.group(1)
+            # Reddit ids are lowercase base36; old./np./m. hosts and query strings already drop out above
+            return 'reddit', match.group(1).lower()
     
     return None, None
 
@@ -37,13 +38,8 @@ def clean_text(text: str) -> str:
     if not text:
         return ""
     
-    # Remove URLs
-    text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-    
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    return text
+    # Remove URLs, then extra whitespace (extract_features does the same while collecting entities)
+    return ' '.join(URL_PATTERN.sub('', text).split())
 
 def format_number(num: int) -> str:
     """Format number with K/M suffixes"""
@@ -72,18 +68,10 @@ def get_time_ago(timestamp: int) -> str:
     except:
         return "Unknown"
 
-@st.cache_data
-def load_models():
-    """Load and cache HuggingFace models"""
-    try:
-        from app.models.sentiment_model import SentimentAnalyzer
-        from app.models.emotion_detector import EmotionDetector
-        
-        sentiment_analyzer = SentimentAnalyzer()
-        emotion_detector = EmotionDetector()
-        
-        return sentiment_analyzer, emotion_detector
-    except Exception as e:
-        st.error(f"Error loading models: {str(e)}")
-        return None, None
-
+def json_default(obj: Any) -> Any:
+    """json.dumps fallback for comment views and NumPy values"""
+    if hasattr(obj, 'to_list'):
+        return obj.to_list()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    return str(obj)
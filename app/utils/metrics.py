@@ -0,0 +1,228 @@
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Awaitable, Callable, Iterator, Optional, Tuple, TypeVar
+from app.config import Config
+
+METRIC_PREFIX = "social_analyzer_"
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+T = TypeVar('T')
+
+class Trace:
+    """Spans and counters recorded while one analysis (or one page render) was running"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.seconds: Optional[float] = None
+        self.spans: Dict[str, Dict[str, Any]] = {}
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, offset: float, seconds: float) -> None:
+        with self._lock:
+            span = self.spans.setdefault(name, {'name': name, 'start': offset, 'seconds': 0.0, 'calls': 0})
+            span['seconds'] += seconds
+            span['calls'] += 1
+
+    def add_count(self, name: str, value: float) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def finish(self) -> 'Trace':
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Spans summed by name in order of first start; nested stages use dotted names (fetch.http)"""
+        with self._lock:
+            spans = sorted(self.spans.values(), key=lambda span: span['start'])
+            return {
+                'name': self.name,
+                'seconds': round(self.seconds if self.seconds is not None else time.perf_counter() - self.started, 4),
+                'spans': [{**span, 'start': round(span['start'], 4), 'seconds': round(span['seconds'], 4)} for span in spans],
+                'counters': dict(self.counters)
+            }
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar('social_analyzer_trace', default=None)
+
+class MetricsRegistry:
+    """Process-wide counters and stage-duration histograms, exposed in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Dict[str, Any]] = {}
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted((label, str(label_value)) for label, label_value in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_count(name, value)
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = (name, tuple(sorted((label, str(label_value)) for label, label_value in labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {'buckets': [0] * len(DURATION_BUCKETS), 'sum': 0.0, 'count': 0}
+            index = bisect.bisect_left(DURATION_BUCKETS, seconds)
+            if index < len(DURATION_BUCKETS):
+                histogram['buckets'][index] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+
+        typed = set()
+        for (name, labels), value in counters:
+            metric = f"{METRIC_PREFIX}{name}"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {_format_value(value)}")
+
+        for (name, labels), histogram in histograms:
+            metric = f"{METRIC_PREFIX}{name}"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for edge, count in zip(DURATION_BUCKETS, histogram['buckets']):
+                cumulative += count
+                lines.append(f"{metric}_bucket{_format_labels(labels + (('le', str(edge)),))} {cumulative}")
+            lines.append(f"{metric}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram['count']}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {_format_value(histogram['sum'])}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        f'{label}="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for label, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(round(value, 6))
+
+metrics = MetricsRegistry()
+
+_otel_tracer = None
+_otel_checked = False
+
+def _get_otel_tracer():
+    """OpenTelemetry tracer when OTEL_TRACING is on; exporters are configured the standard OTel way"""
+    global _otel_tracer, _otel_checked
+    if not _otel_checked:
+        _otel_checked = True
+        if Config.OTEL_TRACING:
+            try:
+                from opentelemetry import trace
+                _otel_tracer = trace.get_tracer("social-analyzer")
+            except ImportError:
+                print("❌ OTEL_TRACING needs `pip install opentelemetry-api opentelemetry-sdk`, tracing disabled")
+    return _otel_tracer
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time one pipeline stage into the stage histogram, the current trace and OpenTelemetry if enabled"""
+    tracer = _get_otel_tracer()
+    otel_span = tracer.start_as_current_span(name) if tracer is not None else None
+    if otel_span is not None:
+        otel_span.__enter__()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        metrics.observe('stage_duration_seconds', seconds, stage=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_span(name, started - trace.started, seconds)
+        if otel_span is not None:
+            otel_span.__exit__(None, None, None)
+
+def timed(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator form of span()"""
+    def decorator(function: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@contextmanager
+def trace(name: str) -> Iterator[Trace]:
+    """Collect every span and counter recorded in this context into one Trace"""
+    current = Trace(name)
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        current.finish()
+        _current_trace.reset(token)
+
+def start_trace(name: str) -> Tuple[Trace, contextvars.Token]:
+    """Non-context-manager form for scripts (Streamlit) that cannot wrap the traced code in a block"""
+    current = Trace(name)
+    return current, _current_trace.set(current)
+
+def end_trace(current: Trace, token: contextvars.Token) -> Trace:
+    _current_trace.reset(token)
+    return current.finish()
+
+async def bind_trace(awaitable: Awaitable[T], current: Optional[Trace]) -> T:
+    """Run a coroutine on another thread's event loop while recording into the caller's trace"""
+    token = _current_trace.set(current)
+    try:
+        return await awaitable
+    finally:
+        _current_trace.reset(token)
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics from a daemon thread, for processes without their own HTTP API (Streamlit)"""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = metrics.render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    try:
+        server = ThreadingHTTPServer((host, port), Handler)
+    except OSError as e:
+        print(f"❌ Error starting metrics server on port {port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
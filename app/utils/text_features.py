@@ -0,0 +1,83 @@
+import re
+from collections import Counter
+from typing import Dict, Any, Iterable, List
+
+# The old URL class `[$-_@.&+]` was the range $.._ by accident; these are the RFC 3986 URL characters,
+# and a URL never ends in sentence punctuation. Parentheses only count as part of a URL in balanced pairs,
+# so ".../wiki/Foo_(bar)" keeps its ")" while "(see https://example.com)" does not
+URL_CHARACTER = r"[A-Za-z0-9\-._~:/?#\[\]@!$&'*+,;=]|%[0-9a-fA-F]{2}"
+URL_PATTERN = re.compile(rf"https?://(?:{URL_CHARACTER}|\((?:{URL_CHARACTER})*\))+(?<![.,;:!?])")
+EMOJI_CHARACTERS = r"\U0001F000-\U0001FAFF\u2600-\u27BF\u2B00-\u2BFF"
+
+# One alternation scanned left to right: URLs and emails come first so their '@', '#' and '.' are consumed
+FEATURE_PATTERN = re.compile(
+    rf"(?P<url>{URL_PATTERN.pattern})"
+    r"|(?P<email>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)"
+    r"|@(?P<mention>\w+)"
+    r"|#(?P<hashtag>\w+)"
+    r"|(?P<phone>\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b)"
+    rf"|(?P<emoji>[{EMOJI_CHARACTERS}]\uFE0F?)"
+    r"|(?P<sentence_end>[.!?])"
+)
+
+ENTITY_KEYS = {'url': 'urls', 'email': 'emails', 'mention': 'mentions', 'hashtag': 'hashtags',
+               'phone': 'phone_numbers', 'emoji': 'emojis'}
+EMPTY_READABILITY = {'word_count': 0, 'sentence_count': 0, 'avg_words_per_sentence': 0, 'reading_time': 0}
+
+def extract_features(text: str) -> Dict[str, Any]:
+    """Cleaned text, entities and readability from a single scan of the raw text"""
+    entities: Dict[str, List[str]] = {key: [] for key in ENTITY_KEYS.values()}
+    if not text:
+        return {'cleaned_text': '', 'entities': entities, 'readability': dict(EMPTY_READABILITY)}
+
+    pieces = []
+    position = 0
+    sentence_ends = 0
+    for match in FEATURE_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == 'sentence_end':
+            sentence_ends += 1
+            continue
+        entities[ENTITY_KEYS[kind]].append(match.group(kind))
+        if kind == 'url':
+            # Same output as clean_text: URLs dropped, whitespace collapsed below
+            pieces.append(text[position:match.start()])
+            position = match.end()
+    pieces.append(text[position:])
+
+    words = ''.join(pieces).split()
+    cleaned_text = ' '.join(words)
+    if not cleaned_text:
+        return {'cleaned_text': '', 'entities': entities, 'readability': dict(EMPTY_READABILITY)}
+
+    sentences = max(1, sentence_ends)
+    return {
+        'cleaned_text': cleaned_text,
+        'entities': entities,
+        'readability': {
+            'word_count': len(words),
+            'sentence_count': sentences,
+            'avg_words_per_sentence': round(len(words) / sentences, 1),
+            'character_count': len(cleaned_text),
+            'reading_time': max(1, len(words) // 200)  # Assuming 200 WPM
+        }
+    }
+
+def extract_features_batch(texts: Iterable[str]) -> List[Dict[str, Any]]:
+    """extract_features for a whole comment list; repeated texts (copypasta, bot replies) are scanned once"""
+    texts = list(texts)
+    features = {text: extract_features(text) for text in dict.fromkeys(texts)}
+    return [features[text] for text in texts]
+
+def summarize_entities(features: Iterable[Dict[str, Any]], top_n: int = 10) -> Dict[str, Any]:
+    """Most common hashtags, mentions and emoji across many texts, plus total entity counts"""
+    counters = {key: Counter() for key in ENTITY_KEYS.values()}
+    for feature in features:
+        for key, values in feature['entities'].items():
+            counters[key].update(value.lower() if key in ('hashtags', 'mentions') else value for value in values)
+    return {
+        'counts': {key: sum(counter.values()) for key, counter in counters.items()},
+        'top_hashtags': counters['hashtags'].most_common(top_n),
+        'top_mentions': counters['mentions'].most_common(top_n),
+        'top_emojis': counters['emojis'].most_common(top_n)
+    }
@@ -0,0 +1,119 @@
+import pytest
+
+from app.config import Config
+from app.devtools.fake_api import (
+    FakeAPIServer, FakeRedditThread, check_bulk_lookup, check_more_expansion, check_reply_pagination
+)
+from app.services.api_client import SocialAPIClient
+from app.services.rate_limiter import TokenBucket
+
+MORE_PATH = '/api/morechildren.json'
+
+
+@pytest.fixture
+def reddit_config(monkeypatch):
+    """"More" expansion on with 100-id calls, four in flight; monkeypatch restores Config afterwards"""
+    monkeypatch.setattr(Config, 'REDDIT_EXPAND_MORE', True)
+    monkeypatch.setattr(Config, 'REDDIT_MORE_BATCH_SIZE', 100)
+    monkeypatch.setattr(Config, 'REDDIT_MORE_CONCURRENCY', 4)
+    monkeypatch.setattr(Config, 'REDDIT_MORE_MAX_COMMENTS', 2000)
+    monkeypatch.setattr(Config, 'REDDIT_MORE_TIME_BUDGET', 60)
+    monkeypatch.setattr(Config, 'FETCH_CACHE_DB_PATH', None)
+    return monkeypatch
+
+
+def expand_thread(server, monkeypatch, thread):
+    monkeypatch.setattr(Config, 'REDDIT_BASE_URL', server.base_url)
+    server.reddit_threads[thread.post_id] = thread
+    client = SocialAPIClient()
+    client._limiters['reddit'] = TokenBucket(1000, 1)
+    try:
+        _, content = client.fetch_content(f"https://www.reddit.com/comments/{thread.post_id}")
+    finally:
+        client.close()
+    return content
+
+
+def more_rounds(server, gap):
+    """Group morechildren calls into rounds: calls of one round arrive together, rounds at least `gap` apart"""
+    stamps = [stamp for stamp, path in server.request_log if path == MORE_PATH]
+    rounds = []
+    for stamp in stamps:
+        if rounds and stamp - rounds[-1][-1] < gap:
+            rounds[-1].append(stamp)
+        else:
+            rounds.append([stamp])
+    return [len(calls) for calls in rounds]
+
+
+def test_more_expansion_runs_in_rounds_of_full_batches(reddit_config):
+    # 1050 top-level comments, 50 inline: 1000 hidden ids, so ten calls of 100 in rounds of 4, 4 and 2
+    thread = FakeRedditThread('flat', 1050, inline_limit=50, top_level_ratio=1.0)
+    with FakeAPIServer(rate_limit=1000, latency=0.2) as server:
+        content = expand_thread(server, reddit_config, thread)
+
+        assert len({comment['id'] for comment in content['expanded_comments']}) == 1000
+        assert [size for path, size in server.id_batches if path == MORE_PATH] == [100] * 10
+        assert more_rounds(server, gap=0.1) == [4, 4, 2]
+
+
+def test_more_expansion_never_sends_more_than_100_ids(reddit_config):
+    reddit_config.setattr(Config, 'REDDIT_MORE_BATCH_SIZE', 500)
+    with FakeAPIServer(rate_limit=1000) as server:
+        content = expand_thread(server, reddit_config, FakeRedditThread('nested', 1500))
+
+        sizes = [size for path, size in server.id_batches if path == MORE_PATH]
+        assert max(sizes) == 100
+        assert sum(sizes) == 1450  # every hidden comment asked for exactly once
+        assert len(content['expanded_comments']) == 1450
+
+
+def test_more_expansion_stops_at_the_comment_cap(reddit_config):
+    reddit_config.setattr(Config, 'REDDIT_MORE_MAX_COMMENTS', 250)
+    with FakeAPIServer(rate_limit=1000) as server:
+        content = expand_thread(server, reddit_config, FakeRedditThread('capped', 1050, top_level_ratio=1.0))
+
+        assert len(content['expanded_comments']) == 250
+        assert [size for path, size in server.id_batches if path == MORE_PATH] == [100, 100, 50]
+
+
+def test_more_expansion_stops_at_the_deadline(reddit_config):
+    # One call per round, 0.3 s each: the second round starts inside the 0.45 s budget, the third does not
+    reddit_config.setattr(Config, 'REDDIT_MORE_CONCURRENCY', 1)
+    reddit_config.setattr(Config, 'REDDIT_MORE_TIME_BUDGET', 0.45)
+    with FakeAPIServer(rate_limit=1000, latency=0.3) as server:
+        content = expand_thread(server, reddit_config, FakeRedditThread('slow', 1050, top_level_ratio=1.0))
+
+        assert len(content['expanded_comments']) == 200
+        assert sum(1 for _, path in server.request_log if path == MORE_PATH) == 2
+
+
+def test_check_more_expansion_covers_the_thread():
+    report = check_more_expansion(1500, inline_limit=50)
+
+    assert report['coverage'] == 1.0
+    assert report['inline_comments'] + report['expanded_comments'] == 1500
+
+
+def test_check_bulk_lookup_batches_100_ids_per_call():
+    report = check_bulk_lookup(250, deleted=3)
+
+    assert report['lookup_calls'] == 3
+    assert report['requests'] == 3
+    assert report['fetched'] == 247
+    assert report['not_found'] == 3
+
+
+@pytest.mark.parametrize('check, args', [
+    (check_more_expansion, (200,)),
+    (check_reply_pagination, (30,)),
+    (check_bulk_lookup, (20, 1)),
+])
+def test_checks_restore_config(check, args):
+    names = ['REDDIT_BASE_URL', 'REDDIT_EXPAND_MORE', 'X_API_BASE_URL', 'X_FETCH_REPLIES',
+             'X_REPLIES_MAX_COMMENTS', 'X_BULK_LOOKUP']
+    before = {name: getattr(Config, name) for name in names}
+
+    check(*args)
+
+    assert {name: getattr(Config, name) for name in names} == before
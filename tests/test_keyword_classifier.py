@@ -0,0 +1,28 @@
+from app.models.keyword_classifier import KeywordClassifier
+
+
+def test_words_match_whole_words_only():
+    classifier = KeywordClassifier({'question': ['can', 'how to']})
+
+    assert classifier.matches("Can you explain how to do it?") == {'can', 'how to'}
+    assert classifier.matches("the scanner is broken") == set()
+
+
+def test_emoji_keywords_match_next_to_word_characters():
+    classifier = KeywordClassifier({'funny': ['😂', 'lol'], 'love': ['❤️']})
+
+    assert classifier.matches("hi😂") == {'😂'}
+    assert classifier.matches("😂😂lol") == {'😂', 'lol'}
+    assert classifier.matches("love it❤️so much") == {'❤️'}
+    assert classifier.matches("lolol") == set()
+    assert classifier.classify("great job😂") == 'funny'
+
+
+def test_keywords_mixing_words_and_emoji():
+    classifier = KeywordClassifier({'fire': ['🔥 take', 'hot🔥']})
+
+    # Only the word end of each keyword needs a boundary
+    assert classifier.matches("a🔥 take") == {'🔥 take'}
+    assert classifier.matches("a 🔥 takes") == set()
+    assert classifier.matches("so hot🔥🔥") == {'hot🔥'}
+    assert classifier.matches("shot🔥") == set()
@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from app.services.api_client import SocialAPIClient
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2', 2.0),
+    ('1.5', 1.5),
+    ('0', 0.0),
+    ('-3', 0.0),
+    (None, None),
+    ('', None),
+    ('soon', None),
+    ('inf', None),
+    ('Wed, 21 Oct 2015 07:28:00 GMT', 0.0),  # already past
+])
+def test_retry_after_values(value, expected):
+    assert SocialAPIClient._retry_after_seconds(value) == expected
+
+
+def test_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    seconds = SocialAPIClient._retry_after_seconds(format_datetime(retry_at, usegmt=True))
+
+    assert 28 <= seconds <= 30
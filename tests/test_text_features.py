@@ -0,0 +1,19 @@
+import pytest
+
+from app.utils.helpers import clean_text
+from app.utils.text_features import extract_features
+
+
+@pytest.mark.parametrize('text, url, cleaned', [
+    ("see https://en.wikipedia.org/wiki/Foo_(bar) now", "https://en.wikipedia.org/wiki/Foo_(bar)", "see now"),
+    ("(see https://example.com/a).", "https://example.com/a", "(see )."),
+    ("x https://en.wikipedia.org/wiki/Foo_(bar)).", "https://en.wikipedia.org/wiki/Foo_(bar)", "x )."),
+    ("link: https://a.com/p_(a)_(b)_c!", "https://a.com/p_(a)_(b)_c", "link: !"),
+    ("go to https://a.com/x?q=1, then", "https://a.com/x?q=1", "go to , then"),
+])
+def test_urls_keep_balanced_parentheses_only(text, url, cleaned):
+    features = extract_features(text)
+
+    assert features['entities']['urls'] == [url]
+    assert features['cleaned_text'] == cleaned
+    assert clean_text(text) == cleaned
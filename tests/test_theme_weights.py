@@ -0,0 +1,37 @@
+import numpy as np
+from sklearn.metrics import silhouette_score
+
+from app.models.theme_analyzer import ThemeAnalyzer
+
+
+def random_distances(n, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.normal(size=(n, 8))
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    distances = np.clip(1.0 - embeddings @ embeddings.T, 0.0, 2.0)
+    np.fill_diagonal(distances, 0.0)
+    return distances, rng
+
+
+def test_unit_weights_match_sklearn():
+    distances, rng = random_distances(30)
+    labels = rng.integers(0, 4, 30)
+    labels[:4] = [0, 1, 2, 3]
+    labels[5] = 4  # a singleton scores 0
+
+    score = ThemeAnalyzer._weighted_silhouette(distances, labels, np.ones(30))
+
+    assert np.isclose(score, silhouette_score(distances, labels, metric='precomputed'))
+
+
+def test_weights_match_repeated_representatives():
+    distances, rng = random_distances(30, seed=1)
+    labels = rng.integers(0, 3, 30)
+    labels[:3] = [0, 1, 2]
+    weights = rng.integers(1, 6, 30).astype(np.float64)
+    repeated = np.repeat(np.arange(30), weights.astype(int))
+
+    score = ThemeAnalyzer._weighted_silhouette(distances, labels, weights)
+
+    expected = silhouette_score(distances[np.ix_(repeated, repeated)], labels[repeated], metric='precomputed')
+    assert np.isclose(score, expected)
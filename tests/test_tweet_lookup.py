@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from app.config import Config
+from app.devtools.fake_api import FakeAPIServer
+from app.services.api_client import SocialAPIClient
+from app.services.tweet_lookup import TweetLookupCoalescer
+
+LOOKUP_PATH = '/2/tweets'
+
+
+def make_coalescer(calls, fail_on=None, hold_for=300.0):
+    async def fetch_batch(tweet_ids):
+        calls.append(list(tweet_ids))
+        if fail_on in tweet_ids:
+            raise RuntimeError("lookup failed")
+        return {tweet_id: {'data': {'id': tweet_id}} for tweet_id in tweet_ids}
+
+    return TweetLookupCoalescer(fetch_batch, window=0.01, hold_for=hold_for)
+
+
+def test_concurrent_lookups_share_one_call():
+    calls = []
+
+    async def run():
+        coalescer = make_coalescer(calls)
+        return await asyncio.gather(*(coalescer.lookup(str(i)) for i in range(250)))
+
+    results = asyncio.run(run())
+    assert [result['data']['id'] for result in results] == [str(i) for i in range(250)]
+    assert [len(call) for call in calls] == [100, 100, 50]
+
+
+def test_late_claims_are_served_from_the_prefetched_batch():
+    calls = []
+
+    async def run():
+        coalescer = make_coalescer(calls)
+        coalescer.prefetch(['1', '2', '3'])
+        first = await coalescer.lookup('1')
+        await asyncio.sleep(0.05)
+        in_flight = dict(coalescer._futures)
+        late = [await coalescer.lookup(tweet_id) for tweet_id in ('2', '3')]
+        return first, in_flight, late, dict(coalescer._held)
+
+    first, in_flight, late, held = asyncio.run(run())
+    assert first == {'data': {'id': '1'}}
+    assert in_flight == {}
+    assert late == [{'data': {'id': '2'}}, {'data': {'id': '3'}}]
+    assert held == {}  # claimed results are released
+    assert calls == [['1', '2', '3']]
+
+
+def test_unclaimed_prefetches_expire():
+    calls = []
+
+    async def run():
+        coalescer = make_coalescer(calls, hold_for=0.01)
+        coalescer.prefetch(['1', '2'])
+        await asyncio.sleep(0.05)
+        # Too old to serve: looked up again, and the expired entry is purged when that batch returns
+        result = await coalescer.lookup('1')
+        return result, dict(coalescer._held)
+
+    result, held = asyncio.run(run())
+    assert result == {'data': {'id': '1'}}
+    assert held == {}
+    assert calls == [['1', '2'], ['1']]
+
+
+def test_failed_batch_reaches_waiters_and_is_released():
+    calls = []
+
+    async def run():
+        coalescer = make_coalescer(calls, fail_on='bad')
+        coalescer.prefetch(['bad', 'other'])
+        with pytest.raises(RuntimeError):
+            await coalescer.lookup('other')
+        await asyncio.sleep(0.05)
+        return dict(coalescer._futures), dict(coalescer._held)
+
+    assert asyncio.run(run()) == ({}, {})  # a failed prefetch is not held, so its lookup tries again
+
+
+def test_client_prefetch_sends_full_lookup_batches(monkeypatch):
+    monkeypatch.setattr(Config, 'X_FETCH_REPLIES', False)
+    monkeypatch.setattr(Config, 'X_BULK_LOOKUP', True)
+    monkeypatch.setattr(Config, 'FETCH_CACHE_DB_PATH', None)
+    with FakeAPIServer(default_comments=0, rate_limit=1000) as server:
+        monkeypatch.setattr(Config, 'X_API_BASE_URL', server.base_url)
+        client = SocialAPIClient()
+        client.x_bearer = 'fake-token'
+        urls = [f"https://x.com/fake/status/{1800000000000000000 + i}" for i in range(250)]
+
+        async def fetch_all():
+            client.prefetch_tweets(urls)
+            return [await client.fetch_content_async(url) for url in urls]
+
+        try:
+            results = client.run(fetch_all())
+        finally:
+            client.close()
+
+    assert all(data for _, data in results)
+    assert [size for path, size in server.id_batches if path == LOOKUP_PATH] == [100, 100, 50]
@@ -0,0 +1,99 @@
+from collections import Counter
+
+import pytest
+
+from app.config import Config
+from app.devtools.fake_api import FakeAPIServer, FakeXConversation
+from app.services.api_client import SocialAPIClient
+from app.services.rate_limiter import TokenBucket
+
+SEARCH_PATH = '/2/tweets/search/recent'
+
+
+@pytest.fixture
+def x_config(monkeypatch):
+    """Replies on, 50-reply pages and an in-memory fetch cache; monkeypatch restores Config afterwards"""
+    monkeypatch.setattr(Config, 'X_FETCH_REPLIES', True)
+    monkeypatch.setattr(Config, 'X_BULK_LOOKUP', True)
+    monkeypatch.setattr(Config, 'X_REPLIES_PAGE_SIZE', 50)
+    monkeypatch.setattr(Config, 'X_REPLIES_MAX_COMMENTS', 1000)
+    monkeypatch.setattr(Config, 'X_REPLIES_TIME_BUDGET', 60)
+    monkeypatch.setattr(Config, 'HTTP_MAX_RETRIES', 2)
+    monkeypatch.setattr(Config, 'FETCH_CACHE_DB_PATH', None)
+    return monkeypatch
+
+
+def fetch_conversation(server, monkeypatch, conversation_id='42'):
+    monkeypatch.setattr(Config, 'X_API_BASE_URL', server.base_url)
+    client = SocialAPIClient()
+    client.x_bearer = 'fake-token'
+    # The real X budget refills one request every few seconds; the fake server allows far more
+    client._limiters['twitter'] = TokenBucket(1000, 1)
+    try:
+        _, content = client.fetch_content(f"https://x.com/fake/status/{conversation_id}")
+    finally:
+        client.close()
+    return content
+
+
+def search_requests(server):
+    return sum(1 for _, path in server.request_log if path == SEARCH_PATH)
+
+
+def test_every_reply_is_fetched_exactly_once(x_config):
+    with FakeAPIServer(default_comments=230, rate_limit=1000) as server:
+        content = fetch_conversation(server, x_config)
+
+        ids = Counter(reply['id'] for reply in content['replies'])
+        expected = {f"42{i:06d}" for i in range(230)}
+        assert set(ids) == expected
+        assert max(ids.values()) == 1
+        assert content['replies_meta'] == {'pages': 5, 'truncated': False}
+        assert search_requests(server) == 5
+
+
+def test_throttled_pages_are_retried(x_config):
+    with FakeAPIServer(default_comments=230, rate_limit=1000, throttle_every=3) as server:
+        content = fetch_conversation(server, x_config)
+
+        assert server.throttled >= 2
+        assert len(server.request_log) == 6 + server.throttled  # tweet lookup and five pages, plus one retry each
+        assert len({reply['id'] for reply in content['replies']}) == len(content['replies']) == 230
+        assert content['replies_meta'] == {'pages': 5, 'truncated': False}
+
+
+def test_stops_and_marks_truncated_at_the_reply_cap(x_config):
+    x_config.setattr(Config, 'X_REPLIES_MAX_COMMENTS', 120)
+    with FakeAPIServer(default_comments=500, rate_limit=1000) as server:
+        content = fetch_conversation(server, x_config)
+
+        assert len(content['replies']) == 120
+        assert content['replies_meta'] == {'pages': 3, 'truncated': True}
+        assert search_requests(server) == 3  # no page is requested past the cap
+
+
+def test_exactly_max_comments_replies_is_not_truncated(x_config):
+    x_config.setattr(Config, 'X_REPLIES_MAX_COMMENTS', 150)
+    with FakeAPIServer(default_comments=150, rate_limit=1000) as server:
+        content = fetch_conversation(server, x_config)
+
+        assert len(content['replies']) == 150
+        assert content['replies_meta'] == {'pages': 3, 'truncated': False}
+
+
+def test_root_tweet_is_not_counted_as_a_reply(x_config):
+    with FakeAPIServer(rate_limit=1000) as server:
+        server.x_conversations['42'] = FakeXConversation('42', 30, include_root=True)
+        content = fetch_conversation(server, x_config)
+
+        assert len(content['replies']) == 30
+        assert '42' not in {reply['id'] for reply in content['replies']}
+
+
+def test_conversation_without_replies(x_config):
+    with FakeAPIServer(default_comments=0, rate_limit=1000) as server:
+        content = fetch_conversation(server, x_config)
+
+        assert content['replies'] == []
+        assert content['replies_meta'] == {'pages': 0, 'truncated': False}  # an empty page is not counted
+        assert search_requests(server) == 1